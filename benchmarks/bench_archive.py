@@ -0,0 +1,63 @@
+"""
+Compare hydrating a fresh database from frame archives, with and without PNG strips, with re-ingesting the CSV.
+
+Usage: python -m benchmarks.bench_archive [rows] [columns] [tile_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from core.archive import export_archive, import_archive
+from core.database import Database
+from core.image_processor import ImageProcessor
+from core.ingest import IngestManager
+from benchmarks.synthetic import write_csv
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def database_size_mb(path: str) -> float:
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal')
+               if os.path.exists(path + suffix)) / 1e6
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tile_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 4096
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'img.csv')
+        write_csv(csv_path, rows, columns, nan_rate=0.01)
+        processor = ImageProcessor(csv_path)
+
+        ingested = Database(database_url=f"sqlite:///{directory}/ingested.db")
+        ingested.init_db()
+        with ingested.get_db() as session:
+            ingest_seconds = timed(lambda: IngestManager(processor, 10000).run(session))
+        print(f"{rows} rows x {columns} columns")
+        print(f"CSV: {os.path.getsize(csv_path) / 1e6:.1f} MB, re-ingest {ingest_seconds:.2f} s, "
+              f"database {database_size_mb(f'{directory}/ingested.db'):.1f} MB")
+
+        for include_images in (False, True):
+            name = 'with-images' if include_images else 'rows-only'
+            archive_path = os.path.join(directory, f'{name}.ifa')
+            with ingested.get_db(read_only=True) as session:
+                export_seconds = timed(lambda: export_archive(
+                    session, processor, archive_path, tile_rows, include_images=include_images))
+            hydrated = Database(database_url=f"sqlite:///{directory}/{name}.db")
+            hydrated.init_db()
+            with hydrated.get_db() as session:
+                import_seconds = timed(lambda: import_archive(session, processor, archive_path))
+            print(f"archive {name}: {os.path.getsize(archive_path) / 1e6:.1f} MB, "
+                  f"export {export_seconds:.2f} s, hydrate {import_seconds:.2f} s "
+                  f"({ingest_seconds / import_seconds:.1f}x faster than re-ingest)")
+
+
+if __name__ == '__main__':
+    main()
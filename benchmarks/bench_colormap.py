@@ -0,0 +1,47 @@
+"""
+Compare cold import time and per-row color mapping cost of matplotlib and the precomputed LUTs.
+
+Usage: python -m benchmarks.bench_colormap [rows] [width]
+"""
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from core.colormap import apply_colormap
+
+
+def cold_import_seconds(module: str) -> float:
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return float(output.stdout)
+
+
+def per_row_microseconds(color_map, frame: np.ndarray) -> float:
+    start = time.perf_counter()
+    for row in frame:
+        color_map(row[np.newaxis, :])
+    return (time.perf_counter() - start) / len(frame) * 1e6
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    import matplotlib.cm as cm
+
+    frame = np.random.default_rng(0).integers(0, 256, (rows, width), dtype=np.uint8)
+    print(f"cold import matplotlib.cm: {cold_import_seconds('matplotlib.cm') * 1000:.1f} ms")
+    print(f"cold import core.colormap: {cold_import_seconds('core.colormap') * 1000:.1f} ms")
+    matplotlib_us = per_row_microseconds(
+        lambda row: (cm.viridis(row) * 255).astype(np.uint8), frame)
+    lut_us = per_row_microseconds(apply_colormap, frame)
+    print(f"cm.viridis per row: {matplotlib_us:.1f} us")
+    print(f"LUT per row: {lut_us:.1f} us ({matplotlib_us / lut_us:.1f}x)")
+    start = time.perf_counter()
+    apply_colormap(frame)
+    print(f"LUT whole frame: {(time.perf_counter() - start) * 1000:.2f} ms for {rows} rows")
+
+
+if __name__ == '__main__':
+    main()
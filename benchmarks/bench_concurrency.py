@@ -0,0 +1,87 @@
+"""
+Compare sync and async routes at 10/100/1000 concurrent clients.
+
+Starts uvicorn in-process against a temporary SQLite database filled with
+synthetic images, then drives it with httpx.
+
+Usage: python -m benchmarks.bench_concurrency [rows] [requests_per_level]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+import main as service
+from benchmarks.synthetic import generate_frame
+from core.database import Database
+
+PORT = 4181
+CONCURRENCY_LEVELS = (10, 100, 1000)
+
+
+async def drive(url: str, concurrency: int, requests: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def fetch():
+            async with semaphore:
+                response = await client.get(url)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+
+        bench_db = Database(
+            database_url=f"sqlite:///{path}",
+            read_pool_size=service.settings.read_pool_size,
+            async_pool_size=service.settings.async_pool_size,
+            async_max_overflow=service.settings.async_max_overflow)
+        bench_db.init_db()
+        processor = service.image_processor
+        processor.range_cache = None
+        with bench_db.get_db() as session:
+            processor.save_images_to_db(session, processor.iter_frame_images(generate_frame(rows)))
+
+        def get_db():
+            with bench_db.get_db(read_only=True) as session:
+                yield session
+
+        async def get_async_db():
+            async with bench_db.get_async_db() as session:
+                yield session
+
+        service.app.dependency_overrides[service.get_db] = get_db
+        service.app.dependency_overrides[service.get_async_db] = get_async_db
+        service.app.router.on_startup.clear()
+        server = uvicorn.Server(uvicorn.Config(
+            service.app, host='127.0.0.1', port=PORT, log_level='warning'))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+
+        query = "depth_min=9000&depth_max=9002"
+        base = f"http://127.0.0.1:{PORT}"
+        for concurrency in CONCURRENCY_LEVELS:
+            for name, route in [("sync  /images/batch", "/images/batch"),
+                                ("async /async/images/batch", "/async/images/batch")]:
+                rate = asyncio.run(drive(f"{base}{route}?{query}", concurrency, requests))
+                print(f"{concurrency:5d} clients  {name:28s} {rate:8.1f} req/sec")
+        server.should_exit = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare per-row save_image_to_db against bulk upserts at several batch sizes.
+
+Usage: python -m benchmarks.bench_db_write [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.image_processor import ImageProcessor
+from models import Base
+
+PNG_BYTES = b'\x89PNG' + b'\x00' * 400
+
+
+def new_session(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    processor = ImageProcessor('unused.csv')
+    images = [(9000.0 + i * 0.1, PNG_BYTES) for i in range(rows)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        session = new_session(directory, 'per_row.db')
+        start = time.perf_counter()
+        for depth, image in images:
+            processor.save_image_to_db(session, depth, image)
+        seconds = time.perf_counter() - start
+        print(f"per-row commit:     {rows / seconds:10.0f} rows/sec")
+
+        for batch_size in (100, 1000, 10000):
+            session = new_session(directory, f"bulk_{batch_size}.db")
+            start = time.perf_counter()
+            timings = processor.save_images_to_db(session, images, batch_size)
+            seconds = time.perf_counter() - start
+            print(f"batch_size {batch_size:6d}: {rows / seconds:10.0f} rows/sec, "
+                  f"{len(timings)} batches, slowest {max(timings) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare p50/p99 range-query latency of the ORM query and the in-memory DepthIndex.
+
+Usage: python -m benchmarks.bench_depth_index [rows] [queries] [range_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.depth_index import DepthIndex
+from core.image_processor import ImageProcessor
+from models import Base
+
+PNG_BYTES = b'\x89PNG' + b'\x00' * 400
+PIXELS = bytes(150)
+
+
+def percentiles(latencies):
+    return np.percentile(np.array(latencies) * 1000, [50, 99])
+
+
+def measure(query, ranges):
+    latencies = []
+    for depth_min, depth_max in ranges:
+        start = time.perf_counter()
+        query(depth_min, depth_max)
+        latencies.append(time.perf_counter() - start)
+    return percentiles(latencies)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    range_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    rng = np.random.default_rng(0)
+    starts = 9000.0 + rng.integers(0, rows - range_rows, queries) * 0.1
+    ranges = [(start, start + (range_rows - 1) * 0.1 + 0.01) for start in starts]
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        processor = ImageProcessor('unused.csv')
+        processor.save_images_to_db(session, (
+            (round(9000.0 + i * 0.1, 1), PNG_BYTES, PIXELS) for i in range(rows)), 10000)
+
+        p50, p99 = measure(
+            lambda low, high: processor.get_image_bytes_by_depth_range(session, low, high), ranges)
+        print(f"{rows} depths, {range_rows} per query")
+        print(f"ORM BETWEEN query:  p50 {p50:8.3f} ms  p99 {p99:8.3f} ms")
+
+        index = DepthIndex()
+        start = time.perf_counter()
+        index.load(session)
+        print(f"index load:         {time.perf_counter() - start:8.3f} s")
+        processor.depth_index = index
+        p50, p99 = measure(
+            lambda low, high: processor.get_image_bytes_by_depth_range(session, low, high), ranges)
+        print(f"DepthIndex range:   p50 {p50:8.3f} ms  p99 {p99:8.3f} ms")
+        p50, p99 = measure(index.pixels_range, ranges)
+        print(f"DepthIndex pixels:  p50 {p50:8.3f} ms  p99 {p99:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Measure the cold import time of the service module with ``python -X importtime``.
+
+Exits non-zero if the median exceeds the budget or an ingest-only dependency
+is imported, so it can guard cold start in CI.
+
+Usage: python -m benchmarks.bench_import [module] [runs] [budget_ms]
+"""
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+# Dependencies that only ingest or plotting need; importing them on the serving path is a regression.
+LAZY_MODULES = ('pandas', 'matplotlib', 'uvicorn')
+
+
+def import_times(module: str) -> Tuple[Dict[str, int], set]:
+    code = f"import sys, {module}; print(','.join(sys.modules))"
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(total)
+    return cumulative, set(output.stdout.strip().split(','))
+
+
+def main() -> None:
+    module = sys.argv[1] if len(sys.argv) > 1 else 'main'
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    budget_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 1000.0
+
+    totals = []
+    for _ in range(runs):
+        cumulative, modules = import_times(module)
+        totals.append(cumulative[module] / 1000)
+    median = statistics.median(totals)
+    print(f"import {module}: median {median:.1f} ms over {runs} runs (budget {budget_ms:.0f} ms)")
+    top_level = sorted(((total, name) for name, total in cumulative.items() if '.' not in name and name != module),
+                       reverse=True)[:10]
+    for total, name in top_level:
+        print(f"  {total / 1000:8.1f} ms  {name}")
+
+    loaded = [name for name in LAZY_MODULES if name in modules]
+    if loaded:
+        print(f"FAIL: imported lazily loaded modules: {', '.join(loaded)}")
+    if median > budget_ms:
+        print("FAIL: import time over budget")
+    if loaded or median > budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare rows/sec of the per-row and batched render paths.
+
+Usage: python -m benchmarks.bench_ingest [rows] [chunk_size]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import generate_frame
+from core.image_processor import ImageProcessor
+
+
+def bench_row_path(processor: ImageProcessor, data) -> float:
+    start = time.perf_counter()
+    for _, row in data.iterrows():
+        processor.process_row(row)
+    return time.perf_counter() - start
+
+
+def bench_batched_path(processor: ImageProcessor, data, chunk_size: int) -> float:
+    start = time.perf_counter()
+    for _ in processor.iter_frame_images(data, chunk_size):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    processor = ImageProcessor('unused.csv')
+    data = generate_frame(rows)
+
+    row_seconds = bench_row_path(processor, data.copy())
+    batched_seconds = bench_batched_path(processor, data, chunk_size)
+
+    print(f"rows: {rows}, chunk_size: {chunk_size}")
+    print(f"per-row path: {rows / row_seconds:10.0f} rows/sec")
+    print(f"batched path: {rows / batched_seconds:10.0f} rows/sec")
+    print(f"speedup:      {row_seconds / batched_seconds:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
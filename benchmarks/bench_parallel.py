@@ -0,0 +1,35 @@
+"""
+Measure how the rendering stage scales from 1 to N worker processes.
+
+Usage: python -m benchmarks.bench_parallel [rows] [max_workers]
+"""
+import os
+import sys
+import time
+
+from benchmarks.synthetic import generate_frame
+from core.image_processor import ImageProcessor
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    processor = ImageProcessor('unused.csv')
+    data = generate_frame(rows)
+
+    worker_counts = sorted({2 ** i for i in range(max_workers.bit_length())} | {max_workers})
+    baseline = None
+    for workers in worker_counts:
+        with processor.create_executor(workers) as executor:
+            start = time.perf_counter()
+            for _ in processor.iter_frame_images(
+                    data, 1024, executor=executor, max_in_flight=2 * workers):
+                pass
+            seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"workers {workers:3d}: {rows / seconds:10.0f} rows/sec, "
+              f"speedup {baseline / seconds:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare resampling a zoomed-out view from the database every time and from cached pyramid tiles.
+
+Usage: python -m benchmarks.bench_resample [rows] [columns] [depth_step] [width]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.cache import RangeCache
+from core.image_processor import ImageProcessor
+from models import Base
+
+PNG_BYTES = b'\x89PNG' + b'\x00' * 400
+
+
+def milliseconds(render, repeats: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        render()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    depth_step = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+    width = int(sys.argv[4]) if len(sys.argv) > 4 else 150
+    rng = np.random.default_rng(0)
+    depth_max = round(9000.0 + (rows - 1) * 0.1, 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        processor = ImageProcessor('unused.csv')
+        processor.save_images_to_db(session, (
+            (round(9000.0 + i * 0.1, 1), PNG_BYTES, bytes(150),
+             rng.integers(0, 256, columns, dtype=np.uint8).tobytes()) for i in range(rows)), 10000)
+        cached = ImageProcessor('unused.csv', range_cache=RangeCache(256 * 1024 * 1024))
+
+        def resample(target):
+            return target.get_resampled_frame(
+                session, 9000.0, depth_max, width=width, depth_step=depth_step)
+
+        np.testing.assert_array_equal(resample(processor), resample(cached))
+        uncached_ms = milliseconds(lambda: resample(processor))
+        cached_ms = milliseconds(lambda: resample(cached))
+        composite_ms = milliseconds(lambda: cached.get_composite_image(
+            session, 9000.0, depth_max, width=width, depth_step=depth_step))
+        print(f"{rows} rows x {columns} columns -> width {width}, depth_step {depth_step}")
+        print(f"resample from database: {uncached_ms:.1f} ms")
+        print(f"cached pyramid tiles: {cached_ms:.1f} ms ({uncached_ms / cached_ms:.1f}x)")
+        print(f"composite PNG from cached tiles, including color map and encode: {composite_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Load-test the /images/ route against the raw PNG routes.
+
+Runs against a temporary SQLite database filled with synthetic images.
+
+Usage: python -m benchmarks.bench_serving [rows] [range_rows] [concurrency] [requests]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main as service
+from benchmarks.synthetic import generate_frame
+from models import Base
+
+
+def load(client: TestClient, url: str, concurrency: int, requests: int) -> float:
+    def fetch(_):
+        assert client.get(url).status_code == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    range_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    requests = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_local = sessionmaker(bind=engine)
+        processor = service.image_processor
+        processor.image_directory = os.path.join(directory, 'images')
+        with session_local() as session:
+            processor.save_images_to_db(
+                session, processor.iter_frame_images(generate_frame(rows)))
+
+        def get_db():
+            with session_local() as session:
+                yield session
+
+        service.app.dependency_overrides[service.get_db] = get_db
+        client = TestClient(service.app)
+        depth_min, depth_max = 9000.1, 9000.1 + (range_rows - 1) * 0.1 + 0.01
+        query = f"depth_min={depth_min}&depth_max={depth_max}"
+
+        print(f"{range_rows} images per range, {concurrency} concurrent clients")
+        for name, url in [
+            ("/images/ (decode, re-encode, write file)", f"/images/?{query}"),
+            ("/images/batch (stored bytes)", f"/images/batch?{query}"),
+            ("/images/{depth}.png (single image)", "/images/9000.1.png"),
+        ]:
+            print(f"{name:45s} {load(client, url, concurrency, requests):8.1f} req/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure read latency while a writer is ingesting, with and without the SQLite profile.
+
+Pass a directory on tmpfs (e.g. /dev/shm) to take the disk out of the picture.
+
+Usage: python -m benchmarks.bench_sqlite_profile [rows] [directory]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from core.database import Database
+from core.image_processor import ImageProcessor
+
+PNG_BYTES = b'\x89PNG' + b'\x00' * 400
+
+
+def run(directory: str, name: str, pragmas, rows: int) -> None:
+    database = Database(database_url=f"sqlite:///{os.path.join(directory, name)}", pragmas=pragmas)
+    database.init_db()
+    processor = ImageProcessor('unused.csv')
+    with database.get_db() as session:
+        processor.save_images_to_db(session, ((9000.0 + i * 0.1, PNG_BYTES) for i in range(rows)))
+
+    done = threading.Event()
+
+    def write():
+        # Many small transactions, as a streaming ingest does.
+        with database.get_db() as session:
+            for start in range(0, rows, 500):
+                processor.save_images_to_db(session, (
+                    (9000.0 + i * 0.1, PNG_BYTES) for i in range(start, start + 500)))
+        done.set()
+
+    latencies = []
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not done.is_set():
+        start = time.perf_counter()
+        with database.get_db(read_only=True) as session:
+            processor.get_image_bytes_by_depth_range(session, 9000.0, 9010.0)
+        latencies.append(time.perf_counter() - start)
+    writer.join()
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    print(f"{name:12s} reads during ingest: {len(latencies):6d}, p50 {p50:7.3f} ms, p99 {p99:7.3f} ms")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    directory = sys.argv[2] if len(sys.argv) > 2 else None
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        run(tmp, 'default.db', {}, rows)
+        run(tmp, 'profile.db', None, rows)
+
+
+if __name__ == '__main__':
+    main()
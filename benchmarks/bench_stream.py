@@ -0,0 +1,63 @@
+"""
+Compare building a whole depth range as one multipart body with streaming it page by page.
+
+Usage: python -m benchmarks.bench_stream [rows] [page_size]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.image_processor import ImageProcessor
+from core.responses import iter_multipart_png, multipart_png_response
+from models import Base
+
+PNG_BYTES = b'\x89PNG' + b'\x00' * 4000
+
+
+def measure(produce):
+    """Returns seconds to the first chunk, total seconds and peak traced MB."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    for _ in produce():
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        processor = ImageProcessor('unused.csv')
+        processor.save_images_to_db(session, (
+            (round(9000.0 + i * 0.1, 1), PNG_BYTES) for i in range(rows)), 10000)
+        depth_max = round(9000.0 + (rows - 1) * 0.1, 1)
+
+        def batch():
+            images = processor.get_image_bytes_by_depth_range(session, 9000.0, depth_max)
+            yield multipart_png_response(images).body
+
+        def stream():
+            return iter_multipart_png(processor.iter_image_pages(session, 9000.0, depth_max, page_size))
+
+        print(f"{rows} rows of {len(PNG_BYTES)} byte PNGs, page size {page_size}")
+        for name, produce in (('batch', batch), ('stream', stream)):
+            first, total, peak = measure(produce)
+            print(f"{name}: first byte {first * 1000:.1f} ms, total {total * 1000:.0f} ms, peak {peak:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Run the end-to-end benchmark suite on a synthetic depth log and emit JSON results.
+
+Measures ingest throughput, peak RSS, database size, range-query latency and
+endpoint throughput. Results include the git commit and configuration so runs
+can be compared over time.
+
+Usage: python -m benchmarks.run [--rows N] [--columns N] [--nan-rate F]
+                                [--non-numeric-rate F] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import write_csv
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': round(p50, 3), 'p95_ms': round(p95, 3), 'p99_ms': round(p99, 3)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def random_ranges(args: argparse.Namespace, count: int, seed: int) -> List[tuple]:
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, max(args.rows - args.range_rows, 1), count)
+    return [(round(9000.1 + start * 0.1, 1), round(9000.1 + (start + args.range_rows - 1) * 0.1, 1) + 0.01)
+            for start in starts]
+
+
+def bench_ingest(args: argparse.Namespace, csv_path: str, database) -> Dict[str, Any]:
+    from core.image_processor import ImageProcessor
+    from core.ingest import IngestManager
+
+    rss_before = peak_rss_mb()
+    manager = IngestManager(ImageProcessor(csv_path), args.chunk_size, args.batch_size, args.workers)
+    start = time.perf_counter()
+    with database.get_db() as session:
+        manager.run(session)
+    seconds = time.perf_counter() - start
+    if manager.progress.error:
+        raise RuntimeError(f"Ingest failed: {manager.progress.error}")
+    return {
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(args.rows / seconds, 1),
+        'csv_mb_per_sec': round(os.path.getsize(csv_path) / seconds / 1e6, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_rss_before_mb': rss_before,
+    }
+
+
+def bench_range_queries(args: argparse.Namespace, database) -> Dict[str, Any]:
+    from core.image_processor import ImageProcessor
+
+    processor = ImageProcessor('unused.csv')
+    latencies = []
+    with database.get_db(read_only=True) as session:
+        for depth_min, depth_max in random_ranges(args, args.queries, seed=1):
+            start = time.perf_counter()
+            processor.get_image_bytes_by_depth_range(session, depth_min, depth_max)
+            latencies.append(time.perf_counter() - start)
+    return {'queries': args.queries, 'range_rows': args.range_rows, **latency_summary(latencies)}
+
+
+def bench_endpoints(args: argparse.Namespace, database) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    import main as service
+
+    def get_db():
+        with database.get_db(read_only=True) as session:
+            yield session
+
+    service.app.dependency_overrides[service.get_db] = get_db
+    if service.image_processor.range_cache is not None:
+        service.image_processor.range_cache.invalidate()
+    client = TestClient(service.app)
+    ranges = random_ranges(args, args.requests, seed=2)
+    routes = {
+        'batch': lambda r: f"/images/batch?depth_min={r[0]}&depth_max={r[1]}",
+        'composite': lambda r: f"/images/composite.png?depth_min={r[0]}&depth_max={r[1]}",
+        'single': lambda r: f"/images/{r[0]}.png",
+    }
+    results = {}
+    try:
+        for name, url in routes.items():
+            latencies = []
+
+            def fetch(depth_range):
+                start = time.perf_counter()
+                response = client.get(url(depth_range))
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(fetch, ranges))
+            results[name] = {
+                'requests_per_sec': round(args.requests / (time.perf_counter() - start), 1),
+                **latency_summary(latencies),
+            }
+    finally:
+        service.app.dependency_overrides.clear()
+    return {'concurrency': args.concurrency, 'requests': args.requests, 'routes': results}
+
+
+def database_size_mb(path: str) -> float:
+    size = sum(os.path.getsize(path + suffix) for suffix in ('', '-wal')
+               if os.path.exists(path + suffix))
+    return round(size / 1e6, 2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--columns', type=int, default=200)
+    parser.add_argument('--nan-rate', type=float, default=0.01)
+    parser.add_argument('--non-numeric-rate', type=float, default=0.0)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--range-rows', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--directory', help='Where to put the CSV and database. Defaults to a temporary directory.')
+    parser.add_argument('--output', help='Write the JSON results to this file as well as stdout.')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    from core.database import Database
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        csv_path = os.path.join(directory, 'img.csv')
+        db_path = os.path.join(directory, 'bench.db')
+        start = time.perf_counter()
+        write_csv(csv_path, args.rows, args.columns, nan_rate=args.nan_rate,
+                  non_numeric_rate=args.non_numeric_rate)
+        generate_seconds = time.perf_counter() - start
+
+        database = Database(database_url=f"sqlite:///{db_path}")
+        database.init_db()
+        results = {
+            'generate_seconds': round(generate_seconds, 3),
+            'csv_mb': round(os.path.getsize(csv_path) / 1e6, 2),
+            'ingest': bench_ingest(args, csv_path, database),
+            'db_size_mb': database_size_mb(db_path),
+            'range_query': bench_range_queries(args, database),
+            'endpoints': bench_endpoints(args, database),
+        }
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'directory')},
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Synthetic depth logs in the ``depth`` + ``col1``..``colN`` layout ImageProcessor expects.
+
+Usage: python -m benchmarks.synthetic path rows [columns] [nan_rate] [non_numeric_rate]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Written in place of a pixel value to exercise the non-numeric conversion path.
+NON_NUMERIC_VALUE = 'bad'
+
+
+def generate_frame(rows: int, columns: int = 200, start_depth: float = 9000.1, seed: int = 0,
+                   nan_rate: float = 0.0, non_numeric_rate: float = 0.0) -> pd.DataFrame:
+    """
+    Generate a synthetic depth log in the layout ImageProcessor expects.
+
+    Args:
+        rows (int): Number of depth rows.
+        columns (int, optional): Number of pixel columns. Defaults to 200.
+        start_depth (float, optional): Depth of the first row. Defaults to 9000.1.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        nan_rate (float, optional): Fraction of pixel values left missing. Defaults to 0.
+        non_numeric_rate (float, optional): Fraction of pixel values replaced with
+            ``NON_NUMERIC_VALUE``. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: A frame with a ``depth`` column followed by ``col1``..``colN``.
+    """
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(rows, columns)).astype(np.float64)
+    if nan_rate:
+        pixels[rng.random((rows, columns)) < nan_rate] = np.nan
+    data = pd.DataFrame(
+        pixels, columns=[f"col{i}" for i in range(1, columns + 1)])
+    if non_numeric_rate:
+        mask = rng.random((rows, columns)) < non_numeric_rate
+        for i in np.flatnonzero(mask.any(axis=0)):
+            column = data.columns[i]
+            data[column] = data[column].astype(object)
+            data.loc[mask[:, i], column] = NON_NUMERIC_VALUE
+    data.insert(0, 'depth', np.round(start_depth + np.arange(rows) * 0.1, 1))
+    return data
+
+
+def write_csv(path: str, rows: int, columns: int = 200, seed: int = 0, nan_rate: float = 0.0,
+              non_numeric_rate: float = 0.0, chunk_rows: int = 100000) -> None:
+    """
+    Write a synthetic depth log to a CSV file, a chunk at a time.
+
+    Args:
+        path (str): The CSV file to write.
+        rows (int): Number of depth rows.
+        columns (int, optional): Number of pixel columns. Defaults to 200.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        nan_rate (float, optional): Fraction of pixel values left missing. Defaults to 0.
+        non_numeric_rate (float, optional): Fraction of pixel values that are not numbers. Defaults to 0.
+        chunk_rows (int, optional): Rows generated and written at a time. Defaults to 100000.
+    """
+    with open(path, 'w', newline='') as csv_file:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate_frame(
+                min(chunk_rows, rows - start), columns,
+                start_depth=round(9000.1 + start * 0.1, 1), seed=seed + start,
+                nan_rate=nan_rate, non_numeric_rate=non_numeric_rate)
+            chunk.to_csv(csv_file, index=False, header=start == 0, float_format='%.10g')
+
+
+def main() -> None:
+    path = sys.argv[1]
+    rows = int(sys.argv[2])
+    columns = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    nan_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    non_numeric_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+    write_csv(path, rows, columns, nan_rate=nan_rate, non_numeric_rate=non_numeric_rate)
+    print(f"Wrote {rows} rows x {columns} columns to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Compressed, tiled archives of processed frames, for hydrating a store without re-ingesting the CSV.
+
+An archive is one file: a magic number, a JSON metadata block, a depth index
+with one record per tile, then the tiles. Each tile holds up to ``tile_rows``
+consecutive depths and is zlib-compressed on its own, so a reader can mmap
+the file and decompress only the tiles a depth range touches.
+
+Tiles hold the raw uint8 rows, and PNG strips are re-encoded from them on
+import. Exporting with ``include_images`` stores the strips as well, which
+makes the archive larger but turns a hydrate into plain sequential writes.
+
+Usage: python -m core.archive export|import path [--dataset NAME] [--include-images]
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.image_processor import ImageProcessor
+from core.metrics import metrics
+from models import Image as ImageModel
+from models import IngestState
+
+MAGIC = b'IMGFRAM1'
+VERSION = 1
+
+# One record per tile, stored right after the metadata block.
+TILE_INDEX_DTYPE = np.dtype([
+    ('depth_min', '<f8'),
+    ('depth_max', '<f8'),
+    ('rows', '<u4'),
+    ('offset', '<u8'),
+    ('length', '<u8'),
+])
+
+# IngestState columns carried in the metadata, so an incremental ingest of the
+# same CSV on the hydrated node only has to hash its chunks.
+INGEST_STATE_COLUMNS = ('source', 'file_size', 'file_mtime', 'chunk_size',
+                        'statistics', 'chunk_hashes', 'content_hash')
+
+logger = logging.getLogger('FrameArchive')
+
+
+class Tile(NamedTuple):
+    """The decompressed rows of one archive tile."""
+    depths: np.ndarray
+    pixels: np.ndarray
+    source_pixels: Optional[np.ndarray]
+    images: Optional[List[bytes]]
+
+
+class FrameArchive:
+    """Read-only, memory-mapped view of an archive file."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an archive and read its metadata and depth index.
+
+        Args:
+            path (str): The archive file.
+        """
+        self.path = path
+        with open(path, 'rb') as archive_file:
+            self._mmap = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a frame archive: {path}")
+        offset = len(MAGIC)
+        (metadata_length,) = struct.unpack_from('<I', self._mmap, offset)
+        offset += 4
+        self.metadata: Dict[str, Any] = json.loads(self._mmap[offset:offset + metadata_length])
+        if self.metadata['version'] != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported frame archive version: {self.metadata['version']}")
+        offset += metadata_length
+        self.tiles = np.frombuffer(self._mmap, dtype=TILE_INDEX_DTYPE,
+                                   count=self.metadata['tiles'], offset=offset).copy()
+
+    def __enter__(self) -> 'FrameArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    @property
+    def rows(self) -> int:
+        return self.metadata['rows']
+
+    def read_tile(self, tile: int) -> Tile:
+        """
+        Decompress one tile.
+
+        Args:
+            tile (int): The tile number.
+
+        Returns:
+            Tile: The depths and resized grayscale rows, plus the original-resolution
+            rows and PNG strips if the archive stores them.
+        """
+        record = self.tiles[tile]
+        rows = int(record['rows'])
+        start = int(record['offset'])
+        with memoryview(self._mmap)[start:start + int(record['length'])] as payload:
+            data = zlib.decompress(payload)
+        width, source_width = self.metadata['width'], self.metadata['source_width']
+        depths = np.frombuffer(data, dtype='<f8', count=rows)
+        offset = depths.nbytes
+        pixels = np.frombuffer(data, dtype=np.uint8, count=rows * width, offset=offset)
+        offset += pixels.nbytes
+        source = images = None
+        if source_width:
+            source = np.frombuffer(data, dtype=np.uint8, count=rows * source_width,
+                                   offset=offset).reshape((rows, source_width))
+            offset += source.nbytes
+        if self.metadata['images']:
+            lengths = np.frombuffer(data, dtype='<u4', count=rows, offset=offset).astype(np.int64)
+            ends = (np.cumsum(lengths) + offset + 4 * rows).tolist()
+            images = [data[end - length:end] for end, length in zip(ends, lengths.tolist())]
+        return Tile(depths, pixels.reshape((rows, width)), source, images)
+
+    def tiles_in_range(self, depth_min: float, depth_max: float) -> np.ndarray:
+        """
+        Find the tiles holding depths within a range from the index alone.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            np.ndarray: The tile numbers, in depth order.
+        """
+        first = np.searchsorted(self.tiles['depth_max'], depth_min, side='left')
+        last = np.searchsorted(self.tiles['depth_min'], depth_max, side='right')
+        return np.arange(first, last)
+
+    def iter_images(self, processor: ImageProcessor) -> Iterator[Tuple]:
+        """
+        Re-render every row as the tuples ``ImageProcessor.save_images_to_db`` accepts.
+
+        Unless the archive stores them, PNG strips are encoded from the stored
+        grayscale rows with the same lookup table the ingest uses, so they match
+        the exported bytes.
+
+        Args:
+            processor (ImageProcessor): The processor whose colormap and encoder to use.
+
+        Yields:
+            Tuple: Depth, PNG bytes and raw row bytes, plus the original row bytes if stored.
+        """
+        for tile in range(len(self)):
+            depths, pixels, source, images = self.read_tile(tile)
+            if images is None:
+                with metrics.timer('colormap', len(pixels)):
+                    color_mapped = processor.apply_color_map_lut(pixels)
+                with metrics.timer('encode', len(pixels)):
+                    images = processor.convert_frame_to_binary(color_mapped)
+            rows = zip(depths.tolist(), images, (row.tobytes() for row in pixels))
+            if source is None:
+                yield from rows
+            else:
+                yield from (row + (source_row.tobytes(),) for row, source_row in zip(rows, source))
+
+
+def export_archive(db: Session, processor: ImageProcessor, path: str, tile_rows: int = 4096,
+                   compression_level: int = 6, include_images: bool = False) -> Dict[str, Any]:
+    """
+    Write every row of the processor's dataset to an archive file.
+
+    The file is written next to ``path`` and renamed into place once complete.
+
+    Args:
+        db (Session): The database session to read images from.
+        processor (ImageProcessor): The processor whose dataset to export.
+        path (str): The archive file to write.
+        tile_rows (int, optional): Depths per tile. Defaults to 4096.
+        compression_level (int, optional): The zlib compression level. Defaults to 6.
+        include_images (bool, optional): Also store the PNG strips. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The archive metadata.
+    """
+    dataset = processor.dataset
+    rows = db.query(func.count()).select_from(ImageModel).filter(
+        ImageModel.dataset == dataset).scalar()
+    if not rows:
+        raise ValueError(f"No images stored for dataset: {dataset}")
+    first = db.query(ImageModel.pixels, ImageModel.source_pixels).filter(
+        ImageModel.dataset == dataset).order_by(ImageModel.depth).first()
+    if first.pixels is None:
+        raise ValueError(f"Dataset {dataset} has rows without raw pixels; re-ingest it before exporting.")
+    has_source = db.query(func.count()).select_from(ImageModel).filter(
+        ImageModel.dataset == dataset, ImageModel.source_pixels.is_(None)).scalar() == 0
+    state = db.get(IngestState, dataset)
+    metadata = {
+        'version': VERSION,
+        'dataset': dataset,
+        'rows': rows,
+        'tiles': -(-rows // tile_rows),
+        'tile_rows': tile_rows,
+        'width': len(first.pixels),
+        'source_width': len(first.source_pixels) if has_source else 0,
+        'images': include_images,
+        'compression': 'zlib',
+        'ingest_state': None if state is None else {
+            column: getattr(state, column) for column in INGEST_STATE_COLUMNS},
+    }
+    encoded = json.dumps(metadata).encode()
+    index = np.zeros(metadata['tiles'], dtype=TILE_INDEX_DTYPE)
+
+    result = db.execute(select(
+        ImageModel.depth, ImageModel.image, ImageModel.pixels, ImageModel.source_pixels).where(
+        ImageModel.dataset == dataset).order_by(ImageModel.depth).execution_options(yield_per=tile_rows))
+    temporary_path = f"{path}.tmp"
+    try:
+        with open(temporary_path, 'wb') as archive_file:
+            archive_file.write(MAGIC + struct.pack('<I', len(encoded)) + encoded)
+            index_offset = archive_file.tell()
+            archive_file.write(index.tobytes())
+            for tile, batch in enumerate(result.partitions(tile_rows)):
+                payload = encode_tile(batch, metadata, compression_level)
+                index[tile] = (batch[0].depth, batch[-1].depth, len(batch),
+                               archive_file.tell(), len(payload))
+                archive_file.write(payload)
+            archive_file.seek(index_offset)
+            archive_file.write(index.tobytes())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    logger.info(f"Exported {rows} rows of dataset {dataset} to {path} in {len(index)} tiles.")
+    return metadata
+
+
+def encode_tile(rows: List[Any], metadata: Dict[str, Any], compression_level: int = 6) -> bytes:
+    """
+    Pack and compress the rows of one tile.
+
+    Args:
+        rows (List[Any]): Rows with ``depth``, ``image``, ``pixels`` and ``source_pixels``.
+        metadata (Dict[str, Any]): The archive metadata, for the row widths.
+        compression_level (int, optional): The zlib compression level. Defaults to 6.
+
+    Returns:
+        bytes: Depths as float64, then the raw rows, then the original-resolution rows
+        and the PNG strips, each preceded by its uint32 length, if stored.
+    """
+    parts = [np.array([row.depth for row in rows], dtype='<f8').tobytes()]
+    for column, width in (('pixels', metadata['width']), ('source_pixels', metadata['source_width'])):
+        if not width:
+            continue
+        values = [getattr(row, column) for row in rows]
+        if any(value is None or len(value) != width for value in values):
+            raise ValueError(f"Rows of {column} must all be {width} bytes wide to be archived.")
+        parts.append(b''.join(values))
+    if metadata['images']:
+        parts.append(np.array([len(row.image) for row in rows], dtype='<u4').tobytes())
+        parts.extend(row.image for row in rows)
+    with metrics.timer('compress', len(rows)):
+        return zlib.compress(b''.join(parts), compression_level)
+
+
+def import_archive(db: Session, processor: ImageProcessor, path: str, batch_size: int = 1000) -> int:
+    """
+    Hydrate the processor's dataset from an archive file.
+
+    Rows are upserted like an ingest would, and the exported ingest state is
+    restored so a later ingest of the same CSV skips unchanged chunks.
+
+    Args:
+        db (Session): The database session to write images to.
+        processor (ImageProcessor): The processor whose dataset to hydrate.
+        path (str): The archive file to read.
+        batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+
+    Returns:
+        int: The number of rows imported.
+    """
+    with FrameArchive(path) as archive:
+        processor.save_images_to_db(db, archive.iter_images(processor), batch_size)
+        state = archive.metadata['ingest_state']
+        if state is not None:
+            db.merge(IngestState(dataset=processor.dataset, **state))
+            db.commit()
+        logger.info(f"Imported {archive.rows} rows from {path} into dataset {processor.dataset}.")
+        return archive.rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=('export', 'import'))
+    parser.add_argument('path')
+    parser.add_argument('--dataset', help='Defaults to the default dataset.')
+    parser.add_argument('--tile-rows', type=int, default=4096)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--include-images', action='store_true',
+                        help='Also store the PNG strips, so importing does not re-encode them.')
+    args = parser.parse_args()
+
+    from core.database import Database
+    from settings import settings
+
+    logging.basicConfig(level=settings.log_level)
+    dataset = args.dataset or settings.default_dataset
+    database = Database(database_url=settings.database_url)
+    database.init_db()
+    processor = ImageProcessor(settings.datasets.get(dataset, ''), dataset=dataset)
+    with database.get_db() as session:
+        if args.command == 'export':
+            metadata = export_archive(session, processor, args.path, args.tile_rows,
+                                      include_images=args.include_images)
+            print(f"Wrote {metadata['rows']} rows in {metadata['tiles']} tiles to {args.path} "
+                  f"({os.path.getsize(args.path) / 1e6:.1f} MB)")
+        else:
+            rows = import_archive(session, processor, args.path, args.batch_size)
+            print(f"Imported {rows} rows from {args.path} into dataset {dataset}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class RangeCache:
+    """
+    Least-recently-used cache bounded by the bytes of its values.
+
+    Keys carry the current generation, and ``invalidate`` starts a new one,
+    so writers can drop every cached result with a single call, or only the
+    results under one namespace. Readers take ``current_generation`` before
+    reading and pass it to ``put``, so a result read before a write and
+    stored after its invalidation is dropped instead of cached.
+    """
+
+    # Rough bookkeeping cost of one entry, so many tiny values still count.
+    ENTRY_OVERHEAD = 128
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Initialize the RangeCache.
+
+        Args:
+            max_bytes (int): Upper bound on the bytes held by cached values.
+            ttl_seconds (float, optional): Age after which an entry is treated as missing. Defaults to no expiry.
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self.generation = 0
+        self._namespace_generations: Dict[Hashable, int] = {}
+        self.current_bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.stale_puts = 0
+
+    def current_generation(self, namespace: Optional[Hashable] = None) -> Tuple[int, int]:
+        """
+        Take the generation to pass to ``put`` for a value about to be read.
+
+        Args:
+            namespace (Hashable, optional): The first element of the value's key.
+
+        Returns:
+            Tuple[int, int]: The cache-wide and namespace generations.
+        """
+        with self._lock:
+            return self.generation, self._namespace_generations.get(namespace, 0)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key (Hashable): The cache key, without the generation.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get((self.generation, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove((self.generation, key))
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((self.generation, key))
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int, generation: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within ``max_bytes``.
+
+        Args:
+            key (Hashable): The cache key, without the generation.
+            value (Any): The value to cache.
+            size (int): The size of the value in bytes.
+            generation (Tuple[int, int], optional): ``current_generation`` taken before the
+                value was read. The value is dropped if its key was invalidated since.
+        """
+        size += self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        namespace = key[0] if isinstance(key, tuple) and key else None
+        with self._lock:
+            if generation is not None and generation != (
+                    self.generation, self._namespace_generations.get(namespace, 0)):
+                self.stale_puts += 1
+                return
+            full_key = (self.generation, key)
+            if full_key in self._entries:
+                self._remove(full_key)
+            while self.current_bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[full_key] = (value, size, time.monotonic())
+            self.current_bytes += size
+
+    def invalidate(self, namespace: Optional[Hashable] = None) -> None:
+        """
+        Start a new generation, dropping every cached entry.
+
+        Args:
+            namespace (Hashable, optional): Only drop entries whose key is a tuple
+                starting with this value, such as one dataset's ranges.
+        """
+        with self._lock:
+            if namespace is not None:
+                self._namespace_generations[namespace] = self._namespace_generations.get(namespace, 0) + 1
+            if namespace is None:
+                self.generation += 1
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            for full_key in [full_key for full_key in self._entries
+                             if isinstance(full_key[1], tuple) and full_key[1][:1] == (namespace,)]:
+                self._remove(full_key)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache metrics.
+
+        Returns:
+            Dict[str, int]: Hit, miss, eviction, expiration and stale put counts, plus current size.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale_puts': self.stale_puts,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'generation': self.generation,
+            }
+
+    def _remove(self, full_key: Hashable) -> None:
+        _, size, _ = self._entries.pop(full_key)
+        self.current_bytes -= size
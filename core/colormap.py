@@ -0,0 +1,91 @@
+"""
+Precomputed 256-entry RGBA lookup tables for the colormaps the service can render.
+
+The tables live in ``core/colormap_data.py`` so serving never imports
+matplotlib. Regenerate them with ``python -m core.colormap``.
+"""
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+
+from core.colormap_data import LUTS
+
+DEFAULT_COLORMAP = 'viridis'
+
+
+class ColormapName(str, Enum):
+    viridis = 'viridis'
+    plasma = 'plasma'
+    inferno = 'inferno'
+    magma = 'magma'
+    cividis = 'cividis'
+    turbo = 'turbo'
+    gray = 'gray'
+
+
+@lru_cache(maxsize=None)
+def get_lut(name: str = DEFAULT_COLORMAP) -> np.ndarray:
+    """
+    Return the lookup table of a colormap.
+
+    Args:
+        name (str, optional): The colormap name. Defaults to 'viridis'.
+
+    Returns:
+        np.ndarray: A read-only uint8 array of shape (256, 4).
+    """
+    if name not in LUTS:
+        raise ValueError(f"Unknown colormap: {name}")
+    lut = np.frombuffer(bytes.fromhex(LUTS[name]), dtype=np.uint8).reshape((256, 4))
+    lut.flags.writeable = False
+    return lut
+
+
+def apply_colormap(gray: np.ndarray, name: str = DEFAULT_COLORMAP) -> np.ndarray:
+    """
+    Color map a grayscale array by indexing its lookup table.
+
+    Gives the same bytes as ``(matplotlib.cm.get_cmap(name)(gray) * 255).astype(np.uint8)``.
+
+    Args:
+        gray (np.ndarray): A uint8 array of any shape.
+        name (str, optional): The colormap name. Defaults to 'viridis'.
+
+    Returns:
+        np.ndarray: A uint8 RGBA array with a trailing axis of 4.
+    """
+    return get_lut(name)[gray]
+
+
+def generate_luts() -> str:
+    """
+    Render ``core/colormap_data.py`` from matplotlib's colormaps.
+
+    Returns:
+        str: The module source.
+    """
+    import matplotlib
+
+    lines = [
+        '"""Generated by ``python -m core.colormap``; do not edit."""',
+        '',
+        'LUTS = {',
+    ]
+    for name in ColormapName:
+        colormap = matplotlib.colormaps[name.value]
+        lut = (colormap(np.arange(256)) * 255).astype(np.uint8).tobytes().hex()
+        lines.append(f"    '{name.value}': (")
+        lines.extend(f"        '{lut[i:i + 64]}'" for i in range(0, len(lut), 64))
+        lines.append('    ),')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    import os
+
+    path = os.path.join(os.path.dirname(__file__), 'colormap_data.py')
+    with open(path, 'w') as data_file:
+        data_file.write(generate_luts())
+    print(f"Wrote {path}")
@@ -0,0 +1,242 @@
+"""Generated by ``python -m core.colormap``; do not edit."""
+
+LUTS = {
+    'viridis': (
+        '440154ff440255ff440357ff450558ff45065aff45085bff46095cff460b5eff'
+        '460c5fff460e61ff470f62ff471163ff471265ff471466ff471567ff471669ff'
+        '47186aff48196bff481a6cff481c6eff481d6fff481e70ff482071ff482172ff'
+        '482273ff482374ff472575ff472676ff472777ff472878ff472a79ff472b7aff'
+        '472c7bff462d7cff462f7cff46307dff46317eff45327fff45347fff453580ff'
+        '453681ff443781ff443982ff433a83ff433b83ff433c84ff423d84ff423e85ff'
+        '424085ff414186ff414286ff404387ff404487ff3f4587ff3f4788ff3e4888ff'
+        '3e4989ff3d4a89ff3d4b89ff3d4c89ff3c4d8aff3c4e8aff3b508aff3b518aff'
+        '3a528bff3a538bff39548bff39558bff38568bff38578cff37588cff37598cff'
+        '365a8cff365b8cff355c8cff355d8cff345e8dff345f8dff33608dff33618dff'
+        '32628dff32638dff31648dff31658dff31668dff30678dff30688dff2f698dff'
+        '2f6a8dff2e6b8eff2e6c8eff2e6d8eff2d6e8eff2d6f8eff2c708eff2c718eff'
+        '2c728eff2b738eff2b748eff2a758eff2a768eff2a778eff29788eff29798eff'
+        '287a8eff287a8eff287b8eff277c8eff277d8eff277e8eff267f8eff26808eff'
+        '26818eff25828eff25838dff24848dff24858dff24868dff23878dff23888dff'
+        '23898dff22898dff228a8dff228b8dff218c8dff218d8cff218e8cff208f8cff'
+        '20908cff20918cff1f928cff1f938bff1f948bff1f958bff1f968bff1e978aff'
+        '1e988aff1e998aff1e998aff1e9a89ff1e9b89ff1e9c89ff1e9d88ff1e9e88ff'
+        '1e9f88ff1ea087ff1fa187ff1fa286ff1fa386ff20a485ff20a585ff21a685ff'
+        '21a784ff22a784ff23a883ff23a982ff24aa82ff25ab81ff26ac81ff27ad80ff'
+        '28ae7fff29af7fff2ab07eff2bb17dff2cb17dff2eb27cff2fb37bff30b47aff'
+        '32b57aff33b679ff35b778ff36b877ff38b976ff39b976ff3bba75ff3dbb74ff'
+        '3ebc73ff40bd72ff42be71ff44be70ff45bf6fff47c06eff49c16dff4bc26cff'
+        '4dc26bff4fc369ff51c468ff53c567ff55c666ff57c665ff59c764ff5bc862ff'
+        '5ec961ff60c960ff62ca5fff64cb5dff67cc5cff69cc5bff6bcd59ff6dce58ff'
+        '70ce56ff72cf55ff74d054ff77d052ff79d151ff7cd24fff7ed24eff81d34cff'
+        '83d34bff86d449ff88d547ff8bd546ff8dd644ff90d643ff92d741ff95d73fff'
+        '97d83eff9ad83cff9dd93aff9fd938ffa2da37ffa5da35ffa7db33ffaadb32ff'
+        'addc30ffafdc2effb2dd2cffb5dd2bffb7dd29ffbade27ffbdde26ffbfdf24ff'
+        'c2df22ffc5df21ffc7e01fffcae01effcde01dffcfe11cffd2e11bffd4e11aff'
+        'd7e219ffdae218ffdce218ffdfe318ffe1e318ffe4e318ffe7e419ffe9e419ff'
+        'ece41affeee51bfff1e51cfff3e51efff6e61ffff8e621fffae622fffde724ff'
+    ),
+    'plasma': (
+        '0c0786ff100787ff130689ff15068aff18068bff1b068cff1d068dff1f058eff'
+        '21058fff230590ff250591ff270592ff290593ff2b0594ff2d0494ff2f0495ff'
+        '310496ff330497ff340498ff360498ff380499ff3a049aff3b039aff3d039bff'
+        '3f039cff40039cff42039dff44039eff45039eff47029fff49029fff4a02a0ff'
+        '4c02a1ff4e02a1ff4f02a2ff5101a2ff5201a3ff5401a3ff5601a3ff5701a4ff'
+        '5901a4ff5a00a5ff5c00a5ff5e00a5ff5f00a6ff6100a6ff6200a6ff6400a7ff'
+        '6500a7ff6700a7ff6800a7ff6a00a7ff6c00a8ff6d00a8ff6f00a8ff7000a8ff'
+        '7200a8ff7300a8ff7500a8ff7601a8ff7801a8ff7901a8ff7b02a8ff7c02a7ff'
+        '7e03a7ff7f03a7ff8104a7ff8204a7ff8405a6ff8506a6ff8607a6ff8807a5ff'
+        '8908a5ff8b09a4ff8c0aa4ff8e0ca4ff8f0da3ff900ea3ff920fa2ff9310a1ff'
+        '9511a1ff9612a0ff9713a0ff99149fff9a159eff9b179eff9d189dff9e199cff'
+        '9f1a9bffa01b9bffa21c9affa31d99ffa41e98ffa51f97ffa72197ffa82296ff'
+        'a92395ffaa2494ffac2593ffad2692ffae2791ffaf2890ffb02a8fffb12b8fff'
+        'b22c8effb42d8dffb52e8cffb62f8bffb7308affb83289ffb93388ffba3487ff'
+        'bb3586ffbc3685ffbd3784ffbe3883ffbf3982ffc03b81ffc13c80ffc23d80ff'
+        'c33e7fffc43f7effc5407dffc6417cffc7427bffc8447affc94579ffca4678ff'
+        'cb4777ffcc4876ffcd4975ffce4a75ffcf4b74ffd04d73ffd14e72ffd14f71ff'
+        'd25070ffd3516fffd4526effd5536dffd6556dffd7566cffd7576bffd8586aff'
+        'd95969ffda5a68ffdb5b67ffdc5d66ffdc5e66ffdd5f65ffde6064ffdf6163ff'
+        'df6262ffe06461ffe16560ffe26660ffe3675fffe3685effe46a5dffe56b5cff'
+        'e56c5bffe66d5affe76e5affe87059ffe87158ffe97257ffea7356ffea7455ff'
+        'eb7654ffec7754ffec7853ffed7952ffed7b51ffee7c50ffef7d4fffef7e4eff'
+        'f0804dfff0814dfff1824cfff2844bfff2854afff38649fff38748fff48947ff'
+        'f48a47fff58b46fff58d45fff68e44fff68f43fff69142fff79241fff79341ff'
+        'f89540fff8963ffff8983efff9993dfff99a3cfffa9c3bfffa9d3afffa9f3aff'
+        'faa039fffba238fffba337fffba436fffca635fffca735fffca934fffcaa33ff'
+        'fcac32fffcad31fffdaf31fffdb030fffdb22ffffdb32efffdb52dfffdb62dff'
+        'fdb82cfffdb92bfffdbb2bfffdbc2afffdbe29fffdc029fffdc128fffdc328ff'
+        'fdc427fffdc626fffcc726fffcc926fffccb25fffccc25fffcce25fffbd024ff'
+        'fbd124fffbd324fffad524fffad624fffad824fff9d924fff9db24fff8dd24ff'
+        'f8df24fff7e024fff7e225fff6e425fff6e525fff5e726fff5e926fff4ea26ff'
+        'f3ec26fff3ee26fff2f026fff2f126fff1f326fff0f525fff0f623ffeff821ff'
+    ),
+    'inferno': (
+        '000003ff000004ff000006ff010007ff010109ff01010bff02010eff020210ff'
+        '030212ff040314ff040316ff050418ff06041bff07051dff08061fff090621ff'
+        '0a0723ff0b0726ff0d0828ff0e082aff0f092dff10092fff120a32ff130a34ff'
+        '140b36ff160b39ff170b3bff190b3eff1a0b40ff1c0c43ff1d0c45ff1f0c47ff'
+        '200c4aff220b4cff240b4eff260b50ff270b52ff290b54ff2b0a56ff2d0a58ff'
+        '2e0a5aff300a5cff32095dff34095fff350960ff370961ff390962ff3b0964ff'
+        '3c0965ff3e0966ff400966ff410967ff430a68ff450a69ff460a69ff480b6aff'
+        '4a0b6aff4b0c6bff4d0c6bff4f0d6cff500d6cff520e6cff530e6dff550f6dff'
+        '570f6dff58106dff5a116dff5b116eff5d126eff5f126eff60136eff62146eff'
+        '63146eff65156eff66156eff68166eff6a176eff6b176eff6d186eff6e186eff'
+        '70196eff72196dff731a6dff751b6dff761b6dff781c6dff7a1c6dff7b1d6cff'
+        '7d1d6cff7e1e6cff801f6bff811f6bff83206bff85206aff86216aff88216aff'
+        '892269ff8b2269ff8d2369ff8e2468ff902468ff912567ff932567ff952666ff'
+        '962666ff982765ff992864ff9b2864ff9c2963ff9e2963ffa02a62ffa12b61ff'
+        'a32b61ffa42c60ffa62c5fffa72d5fffa92e5effab2e5dffac2f5cffae305bff'
+        'af315bffb1315affb23259ffb43358ffb53357ffb73456ffb83556ffba3655ff'
+        'bb3754ffbd3753ffbe3852ffbf3951ffc13a50ffc23b4fffc43c4effc53d4dff'
+        'c73e4cffc83e4bffc93f4affcb4049ffcc4148ffcd4247ffcf4446ffd04544ff'
+        'd14643ffd24742ffd44841ffd54940ffd64a3fffd74b3effd94d3dffda4e3bff'
+        'db4f3affdc5039ffdd5238ffde5337ffdf5436ffe05634ffe25733ffe35832ff'
+        'e45a31ffe55b30ffe65c2effe65e2dffe75f2cffe8612bffe9622affea6428ff'
+        'eb6527ffec6726ffed6825ffed6a23ffee6c22ffef6d21fff06f1ffff0701eff'
+        'f1721dfff2741cfff2751afff37719fff37918fff47a16fff57c15fff57e14ff'
+        'f68012fff68111fff78310fff7850efff8870dfff8880cfff88a0bfff98c09ff'
+        'f98e08fff99008fffa9107fffa9306fffa9506fffa9706fffb9906fffb9b06ff'
+        'fb9d06fffb9e07fffba007fffba208fffba40afffba60bfffba80dfffbaa0eff'
+        'fbac10fffbae12fffbb014fffbb116fffbb318fffbb51afffbb71cfffbb91eff'
+        'fabb21fffabd23fffabf25fffac128fff9c32afff9c52cfff9c72ffff8c931ff'
+        'f8cb34fff8cd37fff7cf3afff7d13cfff6d33ffff6d542fff5d745fff5d948ff'
+        'f4db4bfff4dc4ffff3de52fff3e056fff3e259fff2e45dfff2e660fff1e864ff'
+        'f1e968fff1eb6cfff1ed70fff1ee74fff1f079fff1f27dfff2f381fff2f485ff'
+        'f3f689fff4f78dfff5f891fff6fa95fff7fb99fff9fc9dfffafda0fffcfea4ff'
+    ),
+    'magma': (
+        '000003ff000004ff000006ff010007ff010109ff01010bff02020dff02020fff'
+        '030311ff040313ff040415ff050417ff060519ff07051bff08061dff09071fff'
+        '0a0722ff0b0824ff0c0926ff0d0a28ff0e0a2aff0f0b2cff100c2fff110c31ff'
+        '120d33ff140d35ff150e38ff160e3aff170f3cff180f3fff1a1041ff1b1044ff'
+        '1c1046ff1e1049ff1f114bff20114dff221150ff231152ff251155ff261157ff'
+        '281159ff2a115cff2b115eff2d1060ff2f1062ff301065ff321067ff341068ff'
+        '350f6aff370f6cff390f6eff3b0f6fff3c0f71ff3e0f72ff400f73ff420f74ff'
+        '430f75ff450f76ff470f77ff481078ff4a1079ff4b1079ff4d117aff4f117bff'
+        '50127bff52127cff53137cff55137dff57147dff58157eff5a157eff5b167eff'
+        '5d177eff5e177fff60187fff61187fff63197fff651a80ff661a80ff681b80ff'
+        '691c80ff6b1c80ff6c1d80ff6e1e81ff6f1e81ff711f81ff731f81ff742081ff'
+        '762181ff772181ff792281ff7a2281ff7c2381ff7e2481ff7f2481ff812581ff'
+        '822581ff842681ff852681ff872781ff892881ff8a2881ff8c2980ff8d2980ff'
+        '8f2a80ff912a80ff922b80ff942b80ff952c80ff972c7fff992d7fff9a2d7fff'
+        '9c2e7fff9e2e7eff9f2f7effa12f7effa3307effa4307dffa6317dffa7317dff'
+        'a9327cffab337cffac337bffae347bffb0347bffb1357affb3357affb53679ff'
+        'b63679ffb83778ffb93778ffbb3877ffbd3977ffbe3976ffc03a75ffc23a75ff'
+        'c33b74ffc53c74ffc63c73ffc83d72ffca3e72ffcb3e71ffcd3f70ffce4070ff'
+        'd0416fffd1426effd3426dffd4436dffd6446cffd7456bffd9466affda4769ff'
+        'dc4869ffdd4968ffde4a67ffe04b66ffe14c66ffe24d65ffe44e64ffe55063ff'
+        'e65162ffe75262ffe85461ffea5560ffeb5660ffec585fffed595fffee5b5eff'
+        'ee5d5dffef5e5dfff0605dfff1615cfff2635cfff3655cfff3675bfff4685bff'
+        'f56a5bfff56c5bfff66e5bfff6705bfff7715bfff7735cfff8755cfff8775cff'
+        'f9795cfff97b5dfff97d5dfffa7f5efffa805efffa825ffffb8460fffb8660ff'
+        'fb8861fffb8a62fffc8c63fffc8e63fffc9064fffc9265fffc9366fffd9567ff'
+        'fd9768fffd9969fffd9b6afffd9d6bfffd9f6cfffda16efffda26ffffda470ff'
+        'fea671fffea873fffeaa74fffeac75fffeae76fffeaf78fffeb179fffeb37bff'
+        'feb57cfffeb77dfffeb97ffffebb80fffebc82fffebe83fffec085fffec286ff'
+        'fec488fffec689fffec78bfffec98dfffecb8efffdcd90fffdcf92fffdd193ff'
+        'fdd295fffdd497fffdd698fffdd89afffdda9cfffddc9dfffddd9ffffddfa1ff'
+        'fde1a3fffce3a5fffce5a6fffce6a8fffce8aafffceaacfffcecaefffceeb0ff'
+        'fcf0b1fffcf1b3fffcf3b5fffcf5b7fffbf7b9fffbf9bbfffbfabdfffbfcbfff'
+    ),
+    'cividis': (
+        '00224dff00234fff002350ff002452ff002554ff002655ff002657ff002759ff'
+        '00285bff00285cff00295eff002a60ff002a62ff002b64ff002c66ff002c67ff'
+        '002d69ff002e6bff002f6dff002f6fff003070ff003070ff003170ff003170ff'
+        '043270ff083370ff0b3370ff0e3470ff11356fff14366fff16366fff18376fff'
+        '1a386fff1c386eff1d396eff1f3a6eff213b6eff223b6eff243c6eff253d6dff'
+        '273d6dff283e6dff2a3f6dff2b3f6dff2c406dff2e416cff2f426cff30426cff'
+        '31436cff32446cff34446cff35456cff36466cff37466cff38476cff39486cff'
+        '3a486bff3b496bff3d4a6bff3e4b6bff3f4b6bff404c6bff414d6bff424d6bff'
+        '434e6bff444f6bff454f6bff46506bff47516bff48516bff49526bff4a536bff'
+        '4b546cff4c546cff4d556cff4e566cff4e566cff4f576cff50586cff51586cff'
+        '52596cff535a6cff545a6cff555b6dff565c6dff575d6dff585d6dff595e6dff'
+        '595f6dff5a5f6dff5b606eff5c616eff5d616eff5e626eff5f636eff60646eff'
+        '61646fff61656fff62666fff63666fff64676fff656870ff666970ff676970ff'
+        '686a70ff686b71ff696b71ff6a6c71ff6b6d71ff6c6d72ff6d6e72ff6e6f72ff'
+        '6e7073ff6f7073ff707173ff717273ff727374ff737374ff747475ff747575ff'
+        '757575ff767676ff777776ff787876ff797877ff797977ff7a7a77ff7b7b77ff'
+        '7c7b78ff7d7c78ff7e7d78ff7f7d78ff807e78ff817f78ff828078ff838078ff'
+        '848178ff858278ff858378ff868378ff878478ff888578ff898678ff8a8678ff'
+        '8b8778ff8c8878ff8d8978ff8e8978ff8f8a77ff908b77ff918c77ff928c77ff'
+        '938d77ff948e77ff958f77ff968f77ff979076ff989176ff999276ff9a9376ff'
+        '9b9376ff9c9476ff9d9575ff9e9675ff9f9675ffa09775ffa19874ffa29974ff'
+        'a39a74ffa49a74ffa59b73ffa69c73ffa79d73ffa89e73ffa99e72ffaa9f72ff'
+        'aba072ffaca171ffada271ffaea271ffafa370ffb0a470ffb1a570ffb2a66fff'
+        'b3a66fffb4a76fffb5a86effb6a96effb7aa6dffb8ab6dffb9ab6dffbaac6cff'
+        'bbad6cffbcae6bffbdaf6bffbeb06affbfb06affc1b169ffc2b269ffc3b368ff'
+        'c4b468ffc5b567ffc6b567ffc7b666ffc8b765ffc9b865ffcab964ffcbba64ff'
+        'ccbb63ffcdbc62ffcebc62ffcfbd61ffd0be60ffd2bf60ffd3c05fffd4c15eff'
+        'd5c25effd6c35dffd7c35cffd8c45bffd9c55affdac65affdbc759ffdcc858ff'
+        'dec957ffdfca56ffe0cb55ffe1cc54ffe2cc53ffe3cd52ffe4ce51ffe5cf50ff'
+        'e6d04fffe8d14effe9d24dffead34cffebd44bffecd54affedd648ffeed747ff'
+        'efd846fff1d944fff2da43fff3da42fff4db40fff5dc3ffff6dd3dfff8de3bff'
+        'f9df3afffae038fffbe136fffde234fffde333fffde534fffde636fffde737ff'
+    ),
+    'turbo': (
+        '30123bff311542ff32184aff341b51ff351e58ff36215fff372365ff38266cff'
+        '392972ff3a2c79ff3b2f7fff3c3285ff3c358bff3d3791ff3e3a96ff3f3d9cff'
+        '4040a1ff4043a6ff4145abff4148b0ff424bb5ff434ebaff4350beff4353c2ff'
+        '4456c7ff4458cbff455bceff455ed2ff4560d6ff4563d9ff4666ddff4668e0ff'
+        '466be3ff466de6ff4670e8ff4673ebff4675edff4678f0ff467af2ff467df4ff'
+        '467ff6ff4682f8ff4584f9ff4587fbff4589fcff448cfdff438efdff4291feff'
+        '4193feff4096feff3f98feff3e9bfeff3c9dfdff3ba0fcff39a2fcff38a5fbff'
+        '36a8f9ff34aaf8ff33acf6ff31aff5ff2fb1f3ff2db4f1ff2bb6efff2ab9edff'
+        '28bbebff26bde9ff25c0e6ff23c2e4ff21c4e1ff20c6dfff1ec9dcff1dcbdaff'
+        '1ccdd7ff1bcfd4ff1ad1d2ff19d3cfff18d5ccff18d7caff17d9c7ff17dac4ff'
+        '17dcc2ff17debfff18e0bdff18e1baff19e3b8ff1ae4b6ff1be5b4ff1de7b1ff'
+        '1ee8afff20e9acff22eba9ff24eca6ff27eda3ff29eea0ff2cef9dff2ff09aff'
+        '32f197ff35f394ff38f491ff3bf48dff3ff58aff42f687ff46f783ff4af880ff'
+        '4df97cff51f979ff55fa76ff59fb72ff5dfb6fff61fc6cff65fc68ff69fd65ff'
+        '6dfd62ff71fd5fff74fe5cff78fe59ff7cfe56ff80fe53ff84fe50ff87fe4dff'
+        '8bfe4bff8efe48ff92fe46ff95fe44ff98fe42ff9bfd40ff9efd3effa1fc3dff'
+        'a4fc3bffa6fb3affa9fb39ffacfa37ffaef937ffb1f836ffb3f835ffb6f735ff'
+        'b9f534ffbbf434ffbef334ffc0f233ffc3f133ffc5ef33ffc8ee33ffcaed33ff'
+        'cdeb34ffcfea34ffd1e834ffd4e735ffd6e535ffd8e335ffdae236ffdde036ff'
+        'dfde36ffe1dc37ffe3da37ffe5d838ffe7d738ffe8d538ffead339ffecd139ff'
+        'edcf39ffefcd39fff0cb3afff2c83afff3c63afff4c43afff6c23afff7c039ff'
+        'f8be39fff9bc39fff9ba38fffab737fffbb537fffbb336fffcb035fffcae34ff'
+        'fdab33fffda932fffda631fffda330fffea12ffffe9e2efffe9b2dfffe982cff'
+        'fd952bfffd9229fffd8f28fffd8c27fffc8926fffc8624fffb8323fffb8022ff'
+        'fa7d20fffa7a1ffff9771efff8741cfff7711bfff76e1afff66b18fff56817ff'
+        'f46516fff36315fff26014fff15d13ffef5a11ffee5810ffed550fffec520eff'
+        'ea500dffe94d0dffe84b0cffe6490bffe5460affe3440affe24209ffe04008ff'
+        'de3e08ffdd3c07ffdb3a07ffd93806ffd73606ffd63405ffd43205ffd23005ff'
+        'd02f04ffce2d04ffcb2b03ffc92903ffc72803ffc52602ffc32402ffc02302ff'
+        'be2102ffbb1f01ffb91e01ffb61c01ffb41b01ffb11901ffae1801ffac1601ff'
+        'a91501ffa61401ffa31201ffa01101ff9d1001ff9a0e01ff970d01ff940c01ff'
+        '910b01ff8e0a01ff8b0901ff870801ff840701ff810602ff7d0502ff7a0402ff'
+    ),
+    'gray': (
+        '000000ff010101ff020202ff030303ff040404ff050505ff060606ff070707ff'
+        '080808ff090909ff0a0a0aff0b0b0bff0c0c0cff0d0d0dff0e0e0eff0f0f0fff'
+        '101010ff111111ff121212ff131313ff141414ff151515ff161616ff171717ff'
+        '181818ff191919ff1a1a1aff1b1b1bff1c1c1cff1d1d1dff1e1e1eff1f1f1fff'
+        '202020ff202020ff222222ff232323ff242424ff242424ff262626ff272727ff'
+        '282828ff282828ff2a2a2aff2b2b2bff2c2c2cff2c2c2cff2e2e2eff2f2f2fff'
+        '303030ff303030ff323232ff333333ff343434ff343434ff363636ff373737ff'
+        '383838ff383838ff3a3a3aff3b3b3bff3c3c3cff3c3c3cff3e3e3eff3f3f3fff'
+        '404040ff414141ff414141ff434343ff444444ff454545ff464646ff474747ff'
+        '484848ff494949ff494949ff4b4b4bff4c4c4cff4d4d4dff4e4e4eff4f4f4fff'
+        '505050ff515151ff515151ff535353ff545454ff555555ff565656ff575757ff'
+        '585858ff595959ff595959ff5b5b5bff5c5c5cff5d5d5dff5e5e5eff5f5f5fff'
+        '606060ff616161ff616161ff636363ff646464ff656565ff666666ff676767ff'
+        '686868ff696969ff696969ff6b6b6bff6c6c6cff6d6d6dff6e6e6eff6f6f6fff'
+        '707070ff717171ff717171ff737373ff747474ff757575ff767676ff777777ff'
+        '787878ff797979ff797979ff7b7b7bff7c7c7cff7d7d7dff7e7e7eff7f7f7fff'
+        '808080ff818181ff828282ff838383ff838383ff858585ff868686ff878787ff'
+        '888888ff898989ff8a8a8aff8b8b8bff8c8c8cff8d8d8dff8e8e8eff8f8f8fff'
+        '909090ff919191ff929292ff939393ff939393ff959595ff969696ff979797ff'
+        '989898ff999999ff9a9a9aff9b9b9bff9c9c9cff9d9d9dff9e9e9eff9f9f9fff'
+        'a0a0a0ffa1a1a1ffa2a2a2ffa3a3a3ffa3a3a3ffa5a5a5ffa6a6a6ffa7a7a7ff'
+        'a8a8a8ffa9a9a9ffaaaaaaffabababffacacacffadadadffaeaeaeffafafafff'
+        'b0b0b0ffb1b1b1ffb2b2b2ffb3b3b3ffb3b3b3ffb5b5b5ffb6b6b6ffb7b7b7ff'
+        'b8b8b8ffb9b9b9ffbababaffbbbbbbffbcbcbcffbdbdbdffbebebeffbfbfbfff'
+        'c0c0c0ffc1c1c1ffc2c2c2ffc3c3c3ffc3c3c3ffc5c5c5ffc6c6c6ffc7c7c7ff'
+        'c8c8c8ffc9c9c9ffcacacaffcbcbcbffccccccffcdcdcdffcececeffcfcfcfff'
+        'd0d0d0ffd1d1d1ffd2d2d2ffd3d3d3ffd3d3d3ffd5d5d5ffd6d6d6ffd7d7d7ff'
+        'd8d8d8ffd9d9d9ffdadadaffdbdbdbffdcdcdcffddddddffdededeffdfdfdfff'
+        'e0e0e0ffe1e1e1ffe2e2e2ffe3e3e3ffe3e3e3ffe5e5e5ffe6e6e6ffe7e7e7ff'
+        'e8e8e8ffe9e9e9ffeaeaeaffebebebffecececffedededffeeeeeeffefefefff'
+        'f0f0f0fff1f1f1fff2f2f2fff3f3f3fff3f3f3fff5f5f5fff6f6f6fff7f7f7ff'
+        'f8f8f8fff9f9f9fffafafafffbfbfbfffcfcfcfffdfdfdfffefefeffffffffff'
+    ),
+}
@@ -1,36 +1,201 @@
 import logging
-from sqlalchemy import create_engine
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, delete, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
-from models import Base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from contextlib import asynccontextmanager, contextmanager
+from models import Base, Image, IngestState
 
 logger = logging.getLogger(__name__)
 
 
 class Database:
     SQLALCHEMY_DATABASE_URL = "sqlite:///./image_data.db"
+    # Applied to every new SQLite connection. WAL lets readers run while an
+    # ingest is writing; NORMAL sync is durable across crashes in WAL mode.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
 
-    def __init__(self):
-        logger.info("Initializing database engine.")
+    def __init__(self, database_url: Optional[str] = None, pragmas: Optional[Dict[str, Any]] = None,
+                 read_pool_size: int = 8, async_pool_size: int = 20, async_max_overflow: int = 80):
+        self.database_url = database_url or self.SQLALCHEMY_DATABASE_URL
+        self.pragmas = self.SQLITE_PRAGMAS if pragmas is None else pragmas
+        self.is_sqlite = self.database_url.startswith("sqlite")
+        logger.info(f"Initializing database engines for {self.database_url}.")
+        connect_args = {"check_same_thread": False} if self.is_sqlite else {}
+
+        # SQLite allows one writer at a time, so the write engine keeps a
+        # small pool and reads get a separate, larger one.
+        if self.is_memory_database():
+            pool_args = {"poolclass": StaticPool}
+        else:
+            pool_args = {"poolclass": QueuePool, "pool_size": 1, "max_overflow": 4}
         self.engine = create_engine(
-            self.SQLALCHEMY_DATABASE_URL,
-            connect_args={"check_same_thread": False},
-            echo=False
+            self.database_url,
+            connect_args=connect_args,
+            echo=False,
+            **pool_args
         )
+        if self.is_sqlite and not self.is_memory_database():
+            self.read_engine = create_engine(
+                self.database_url,
+                connect_args=connect_args,
+                poolclass=QueuePool,
+                pool_size=read_pool_size,
+                max_overflow=read_pool_size,
+                echo=False
+            )
+        else:
+            self.read_engine = self.engine
         self.session_local = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=self.engine
         )
+        self.read_session_local = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self.read_engine
+        )
+        # The async engine is created on first use, so URLs it cannot serve
+        # only fail the async routes.
+        self.async_pool_size = async_pool_size
+        self.async_max_overflow = async_max_overflow
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_local: Optional[async_sessionmaker] = None
+        self._async_lock = threading.Lock()
+
+        if self.is_sqlite:
+            event.listen(self.engine, "connect", self.apply_pragmas)
+            if self.read_engine is not self.engine:
+                event.listen(self.read_engine, "connect", self.apply_pragmas)
+
+    def is_memory_database(self) -> bool:
+        """Whether the URL points at a private in-memory SQLite database."""
+        return self.database_url in ("sqlite://", "sqlite:///:memory:")
+
+    def async_database_url(self) -> str:
+        """
+        Returns the URL with the aiosqlite driver for SQLite databases, or a URL that already names an async driver.
+
+        Raises:
+            ValueError: If the URL is an in-memory SQLite database, which an async
+                connection would see as a separate, empty database, or names no async driver.
+        """
+        if self.is_memory_database():
+            raise ValueError(
+                f"The async routes need a file-backed SQLite database; {self.database_url} is in memory.")
+        if self.database_url.startswith("sqlite:"):
+            return "sqlite+aiosqlite:" + self.database_url[len("sqlite:"):]
+        if not make_url(self.database_url).get_dialect().is_async:
+            raise ValueError(
+                f"The async routes need a file-backed SQLite database or a URL with an async driver, "
+                f"such as postgresql+asyncpg://; got {self.database_url}.")
+        return self.database_url
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """The async engine, created on first use. Raises ValueError if the URL has no async driver."""
+        if self._async_engine is None:
+            with self._async_lock:
+                if self._async_engine is None:
+                    # aiosqlite defaults to NullPool, which opens a connection and
+                    # its worker thread per session; a queue pool reuses them.
+                    engine = create_async_engine(
+                        self.async_database_url(),
+                        poolclass=AsyncAdaptedQueuePool,
+                        pool_size=self.async_pool_size,
+                        max_overflow=self.async_max_overflow,
+                        echo=False
+                    )
+                    if self.is_sqlite:
+                        event.listen(engine.sync_engine, "connect", self.apply_pragmas)
+                    self._async_engine = engine
+        return self._async_engine
+
+    @property
+    def async_session_local(self) -> async_sessionmaker:
+        """The async session factory, bound to ``async_engine``."""
+        if self._async_session_local is None:
+            self._async_session_local = async_sessionmaker(
+                autoflush=False,
+                expire_on_commit=False,
+                bind=self.async_engine
+            )
+        return self._async_session_local
+
+    def apply_pragmas(self, dbapi_connection, connection_record):
+        """Applies the SQLite performance profile to a new connection."""
+        cursor = dbapi_connection.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
     def init_db(self):
         logger.info("Creating database tables.")
         Base.metadata.create_all(bind=self.engine)
+        self.rebuild_changed_tables()
+        self.add_missing_columns()
+
+    def rebuild_changed_tables(self):
+        """Rebuilds tables whose primary key changed, copying over the rows they already had."""
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            primary_key = [column.name for column in table.primary_key.columns]
+            if inspector.get_pk_constraint(table.name)['constrained_columns'] == primary_key:
+                continue
+            existing = {column['name']
+                        for column in inspector.get_columns(table.name)}
+            # New key columns are filled from their server defaults, and rows
+            # that collapse onto the same new key keep the first copy.
+            columns = ', '.join(column.name for column in table.columns
+                                if column.name in existing)
+            logger.info(f"Rebuilding {table.name} with primary key ({', '.join(primary_key)}).")
+            with self.engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_old"))
+                table.create(connection)
+                connection.execute(text(
+                    f"INSERT OR IGNORE INTO {table.name} ({columns}) "
+                    f"SELECT {columns} FROM {table.name}_old"))
+                connection.execute(text(f"DROP TABLE {table.name}_old"))
+                if table.name == Image.__tablename__ and any(
+                        column.name not in existing for column in table.columns):
+                    # As in add_missing_columns: copied rows lack the new
+                    # columns, so the next ingest must not skip them.
+                    connection.execute(delete(IngestState))
+
+    def add_missing_columns(self):
+        """Adds nullable columns introduced after a table was first created."""
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column['name']
+                            for column in inspector.get_columns(table.name)}
+                missing = [column for column in table.columns
+                           if column.name not in existing]
+                for column in missing:
+                    logger.info(f"Adding column {table.name}.{column.name}.")
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                if missing and table.name == Image.__tablename__:
+                    # Existing rows lack the new columns, so fingerprints must
+                    # not let the next ingest skip them.
+                    connection.execute(delete(IngestState))
 
     @contextmanager
-    def get_db(self):
+    def get_db(self, read_only: bool = False):
         logger.debug("Creating a new database session.")
-        session = self.session_local()
+        session = self.read_session_local() if read_only else self.session_local()
         try:
             yield session
             session.commit()
@@ -41,5 +206,17 @@ class Database:
             session.close()
             logger.debug("Database session closed.")
 
+    @asynccontextmanager
+    async def get_async_db(self):
+        logger.debug("Creating a new async database session.")
+        session = self.async_session_local()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+            logger.debug("Async database session closed.")
 
-SessionLocal = Database().session_local
@@ -0,0 +1,251 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import DEFAULT_DATASET
+from models import Image as ImageModel
+
+
+class DepthIndex:
+    """
+    Sorted in-memory copy of the images table for read-mostly range queries.
+
+    Depths live in a sorted float64 array. Each depth points at its PNG bytes
+    inside one of a few immutable blob segments, and raw grayscale rows sit in
+    one 2-D uint8 array in depth order, so a range query is two
+    ``searchsorted`` calls and a slice. Writes are buffered and merged with
+    vectorized NumPy operations on the next read.
+    """
+
+    # Merge blob segments back into one once this many have accumulated.
+    MAX_SEGMENTS = 64
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger('DepthIndex')
+        self._clear()
+
+    def _clear(self) -> None:
+        self._pending: Dict[float, Tuple[bytes, Optional[bytes]]] = {}
+        self.depths = np.empty(0, dtype=np.float64)
+        self.segment_ids = np.empty(0, dtype=np.int64)
+        self.starts = np.empty(0, dtype=np.int64)
+        self.stops = np.empty(0, dtype=np.int64)
+        self.segments: List[bytes] = []
+        self.pixels: Optional[np.ndarray] = None
+        self.has_pixels = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._snapshot()['depths'])
+
+    def load(self, db: Session, dataset: str = DEFAULT_DATASET) -> None:
+        """
+        Replace the index contents with one dataset's rows of the images table.
+
+        Args:
+            db (Session): The database session to read images from.
+            dataset (str, optional): The dataset to index. Defaults to 'default'.
+        """
+        rows = db.query(ImageModel.depth, ImageModel.image, ImageModel.pixels).filter(
+            ImageModel.dataset == dataset).order_by(ImageModel.depth).all()
+        with self._lock:
+            self._clear()
+            self._pending = {float(depth): (image, pixels) for depth, image, pixels in rows}
+            self._merge_pending()
+        self.logger.info(f"Loaded {len(rows)} depths into the depth index.")
+
+    def update(self, images: Iterable[Tuple]) -> None:
+        """
+        Record committed upserts; they become visible on the next read.
+
+        Like the upsert, an update without a raw row keeps the row already indexed.
+
+        Args:
+            images (Iterable[Tuple]): Tuples of depth and binary image data,
+                optionally followed by the raw grayscale row.
+        """
+        with self._lock:
+            for image in images:
+                depth = float(image[0])
+                pixels = image[2] if len(image) > 2 else None
+                if pixels is None and depth in self._pending:
+                    pixels = self._pending[depth][1]
+                self._pending[depth] = (image[1], pixels)
+
+    def get(self, depth: float) -> Optional[bytes]:
+        """
+        Look up the PNG bytes at an exact depth.
+
+        Args:
+            depth (float): The depth of the image.
+
+        Returns:
+            Optional[bytes]: The binary image data, or None if the depth is not indexed.
+        """
+        snapshot = self._snapshot()
+        depths = snapshot['depths']
+        position = int(np.searchsorted(depths, depth))
+        if position == len(depths) or depths[position] != depth:
+            return None
+        return self._image(snapshot, position)
+
+    def count(self, depth_min: float, depth_max: float) -> int:
+        """
+        Count the depths within an inclusive depth range.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            int: The number of indexed depths in the range.
+        """
+        start, stop = self._bounds(self._snapshot()['depths'], depth_min, depth_max)
+        return stop - start
+
+    def range(self, depth_min: float, depth_max: float) -> List[Tuple[float, bytes]]:
+        """
+        Return the PNG bytes within an inclusive depth range, ordered by depth.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            List[Tuple[float, bytes]]: A list of tuples containing image depth and binary image data.
+        """
+        snapshot = self._snapshot()
+        start, stop = self._bounds(snapshot['depths'], depth_min, depth_max)
+        depths = snapshot['depths'][start:stop].tolist()
+        return [(depth, self._image(snapshot, start + i)) for i, depth in enumerate(depths)]
+
+    def page(self, depth_min: float, depth_max: float, limit: Optional[int] = None,
+             after_depth: Optional[float] = None) -> List[Tuple[float, bytes]]:
+        """
+        Return one keyset page of a depth range, ordered by depth.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            limit (int, optional): The most depths to return. Defaults to no limit.
+            after_depth (float, optional): Only return depths greater than this one.
+
+        Returns:
+            List[Tuple[float, bytes]]: A list of tuples containing image depth and binary image data.
+        """
+        snapshot = self._snapshot()
+        start, stop = self._bounds(snapshot['depths'], depth_min, depth_max)
+        if after_depth is not None:
+            start = max(start, int(np.searchsorted(snapshot['depths'], after_depth, side='right')))
+        if limit is not None:
+            stop = min(stop, start + limit)
+        depths = snapshot['depths'][start:stop].tolist()
+        return [(depth, self._image(snapshot, start + i)) for i, depth in enumerate(depths)]
+
+    def pixels_range(self, depth_min: float, depth_max: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return the raw grayscale rows within an inclusive depth range as views.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: The depths and a uint8 array of shape
+            (depths, width), or None if any row in the range has no raw pixels.
+        """
+        snapshot = self._snapshot()
+        start, stop = self._bounds(snapshot['depths'], depth_min, depth_max)
+        if snapshot['pixels'] is None or not snapshot['has_pixels'][start:stop].all():
+            return None
+        return snapshot['depths'][start:stop], snapshot['pixels'][start:stop]
+
+    def _image(self, snapshot: dict, position: int) -> bytes:
+        segment = snapshot['segments'][snapshot['segment_ids'][position]]
+        return segment[snapshot['starts'][position]:snapshot['stops'][position]]
+
+    def _bounds(self, depths: np.ndarray, depth_min: float, depth_max: float) -> Tuple[int, int]:
+        return (int(np.searchsorted(depths, depth_min, side='left')),
+                int(np.searchsorted(depths, depth_max, side='right')))
+
+    def _snapshot(self) -> dict:
+        # Arrays are replaced, never mutated, so readers can use them unlocked.
+        with self._lock:
+            if self._pending:
+                self._merge_pending()
+            return {
+                'depths': self.depths,
+                'segment_ids': self.segment_ids,
+                'starts': self.starts,
+                'stops': self.stops,
+                'segments': self.segments,
+                'pixels': self.pixels,
+                'has_pixels': self.has_pixels,
+            }
+
+    def _merge_pending(self) -> None:
+        pending_depths = np.fromiter(self._pending, dtype=np.float64, count=len(self._pending))
+        images = [image for image, _ in self._pending.values()]
+        rows = [row for _, row in self._pending.values()]
+        self._pending = {}
+
+        lengths = np.fromiter((len(image) for image in images), dtype=np.int64, count=len(images))
+        stops = np.cumsum(lengths)
+        segments = self.segments + [b''.join(images)]
+        keep = ~np.isin(self.depths, pending_depths)
+
+        depths = np.concatenate([self.depths[keep], pending_depths])
+        order = np.argsort(depths, kind='stable')
+        old_depths = self.depths
+        self.depths = depths[order]
+        self.segment_ids = np.concatenate([
+            self.segment_ids[keep],
+            np.full(len(images), len(segments) - 1, dtype=np.int64)])[order]
+        self.starts = np.concatenate([self.starts[keep], stops - lengths])[order]
+        self.stops = np.concatenate([self.stops[keep], stops])[order]
+        self.segments = segments
+        self._merge_pixels(old_depths, keep, pending_depths, rows, order)
+
+        if len(self.segments) > self.MAX_SEGMENTS:
+            self._compact_segments()
+
+    def _merge_pixels(self, old_depths: np.ndarray, keep: np.ndarray, pending_depths: np.ndarray,
+                      rows: List[Optional[bytes]], order: np.ndarray) -> None:
+        width = self.pixels.shape[1] if self.pixels is not None else next(
+            (len(row) for row in rows if row is not None), None)
+        present = np.fromiter((row is not None for row in rows), dtype=bool, count=len(rows))
+        if width is None:
+            self.has_pixels = np.concatenate([self.has_pixels[keep], present])[order]
+            return
+        filler = bytes(width)
+        new_rows = np.frombuffer(
+            b''.join(row if row is not None else filler for row in rows),
+            dtype=np.uint8).reshape((len(rows), width)).copy()
+        old_rows = self.pixels if self.pixels is not None \
+            else np.zeros((len(old_depths), width), dtype=np.uint8)
+
+        # Rows updated without pixels keep the pixels they already had.
+        positions = np.minimum(np.searchsorted(old_depths, pending_depths), max(len(old_depths) - 1, 0))
+        inherit = ~present
+        if len(old_depths):
+            inherit &= (old_depths[positions] == pending_depths) & self.has_pixels[positions]
+        else:
+            inherit[:] = False
+        new_rows[inherit] = old_rows[positions[inherit]]
+        present |= inherit
+
+        self.has_pixels = np.concatenate([self.has_pixels[keep], present])[order]
+        self.pixels = np.concatenate([old_rows[keep], new_rows])[order]
+
+    def _compact_segments(self) -> None:
+        images = [self._image({'segments': self.segments, 'segment_ids': self.segment_ids,
+                               'starts': self.starts, 'stops': self.stops}, i)
+                  for i in range(len(self.depths))]
+        lengths = np.fromiter((len(image) for image in images), dtype=np.int64, count=len(images))
+        self.stops = np.cumsum(lengths)
+        self.starts = self.stops - lengths
+        self.segment_ids = np.zeros(len(images), dtype=np.int64)
+        self.segments = [b''.join(images)]
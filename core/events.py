@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+from typing import List, NamedTuple, Tuple
+
+
+class FrameEvent(NamedTuple):
+    """Depths committed by one write, with their PNG strips."""
+    dataset: str
+    depths: List[float]
+    images: List[bytes]
+
+
+class FrameEvents:
+    """
+    Fans committed frames out to subscribers waiting on asyncio queues.
+
+    Writers publish from any thread; each event is handed to a subscriber's
+    own event loop. A subscriber that falls more than ``max_queued`` events
+    behind loses its oldest events rather than slowing down the writer.
+    """
+
+    def __init__(self, max_queued: int = 100) -> None:
+        """
+        Initialize the FrameEvents.
+
+        Args:
+            max_queued (int, optional): Events buffered per subscriber. Defaults to 100.
+        """
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.dropped = 0
+        self.logger = logging.getLogger('FrameEvents')
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Start receiving events on the running event loop.
+
+        Returns:
+            asyncio.Queue: The queue events are put on.
+        """
+        queue: asyncio.Queue = asyncio.Queue(self.max_queued)
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Stop delivering events to a queue returned by ``subscribe``.
+
+        Args:
+            queue (asyncio.Queue): The subscriber's queue.
+        """
+        with self._lock:
+            self._subscribers = [
+                subscriber for subscriber in self._subscribers if subscriber[1] is not queue]
+
+    def publish(self, event: FrameEvent) -> None:
+        """
+        Deliver an event to every subscriber. Safe to call from any thread.
+
+        Args:
+            event (FrameEvent): The committed frames.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has closed without unsubscribing.
+                self.unsubscribe(queue)
+
+    def _put(self, queue: asyncio.Queue, event: FrameEvent) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+            self.logger.debug("Dropped an event for a slow subscriber.")
+        queue.put_nowait(event)
@@ -0,0 +1,104 @@
+import io
+from enum import Enum
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+
+class PoolingMethod(str, Enum):
+    mean = 'mean'
+    max = 'max'
+
+
+def decode_png_rows(images: Iterable[bytes]) -> np.ndarray:
+    """
+    Decode one-pixel-high PNG strips and stack them into a single frame.
+
+    Args:
+        images (Iterable[bytes]): Binary PNG data, one strip per depth.
+
+    Returns:
+        np.ndarray: A uint8 array of shape (strips, width, channels).
+    """
+    return np.concatenate(
+        [np.asarray(PILImage.open(io.BytesIO(image))) for image in images])
+
+
+def downsample_rows(frame: np.ndarray, height: Optional[int] = None) -> np.ndarray:
+    """
+    Reduce a frame to at most ``height`` rows by averaging runs of adjacent rows.
+
+    Args:
+        frame (np.ndarray): An array whose first axis is depth.
+        height (int, optional): The requested number of rows. Defaults to keeping every row.
+
+    Returns:
+        np.ndarray: The downsampled frame, with the input dtype.
+    """
+    rows = len(frame)
+    if not height or height >= rows:
+        return frame
+    starts = np.linspace(0, rows, height + 1).astype(np.intp)[:-1]
+    counts = np.diff(np.append(starts, rows))
+    sums = np.add.reduceat(frame.astype(np.float64), starts, axis=0)
+    means = sums / counts.reshape((-1,) + (1,) * (frame.ndim - 1))
+    return np.rint(means).astype(frame.dtype)
+
+
+def depth_bins(depths: np.ndarray, depth_step: float) -> np.ndarray:
+    """
+    Assign depths to bins of ``depth_step`` aligned to multiples of the step.
+
+    Args:
+        depths (np.ndarray): The depths to assign.
+        depth_step (float): The bin size.
+
+    Returns:
+        np.ndarray: The int64 bin number of every depth.
+    """
+    # Rounding first keeps depths such as 9000.3 with a step of 0.1 out of the
+    # bin below, which float division alone would put them in.
+    return np.floor(np.round(np.asarray(depths, dtype=np.float64) / depth_step, 6)).astype(np.int64)
+
+
+def pool_rows(frame: np.ndarray, bins: np.ndarray,
+              method: str = PoolingMethod.mean.value) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate a frame along depth by pooling the rows that fall in the same bin.
+
+    Args:
+        frame (np.ndarray): An array whose first axis is depth.
+        bins (np.ndarray): The sorted bin number of every row.
+        method (str, optional): 'mean' or 'max'. Defaults to 'mean'.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The bin numbers that hold at least one row and
+        one pooled row per bin, with the input dtype.
+    """
+    if len(frame) == 0:
+        return bins[:0], frame
+    starts = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+    if method == PoolingMethod.max:
+        return bins[starts], np.maximum.reduceat(frame, starts, axis=0)
+    if method != PoolingMethod.mean:
+        raise ValueError(f"Unknown pooling method: {method}")
+    counts = np.diff(np.append(starts, len(frame)))
+    sums = np.add.reduceat(frame.astype(np.float64), starts, axis=0)
+    means = sums / counts.reshape((-1,) + (1,) * (frame.ndim - 1))
+    return bins[starts], np.rint(means).astype(frame.dtype)
+
+
+def encode_png(frame: np.ndarray) -> bytes:
+    """
+    Encode a uint8 array as a PNG.
+
+    Args:
+        frame (np.ndarray): An array of shape (height, width) or (height, width, channels).
+
+    Returns:
+        bytes: The binary image data.
+    """
+    with io.BytesIO() as byte_io:
+        PILImage.fromarray(np.ascontiguousarray(frame)).save(byte_io, format='PNG')
+        return byte_io.getvalue()
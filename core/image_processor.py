@@ -1,44 +1,596 @@
+from __future__ import annotations
+
+import hashlib
 import os
-import pandas as pd
+import sys
 import numpy as np
 from PIL import Image as PILImage
 import io
 import logging
-from typing import List, Tuple
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 
+from core.cache import RangeCache
+from core.colormap import DEFAULT_COLORMAP, apply_colormap
+from core.depth_index import DepthIndex
+from core.events import FrameEvent, FrameEvents
+from core.frames import PoolingMethod, decode_png_rows, depth_bins, downsample_rows, encode_png, pool_rows
+from core.metrics import metrics
+from models import DEFAULT_DATASET
 from models import Image as ImageModel
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from core.ingest import IngestProgress
+
+# Column order of the tuples accepted by ImageProcessor.save_images_to_db.
+IMAGE_COLUMNS = ('depth', 'image', 'pixels', 'source_pixels')
+
+
+class ColumnStatistics(NamedTuple):
+    """Whole-file statistics of one CSV column, gathered chunk by chunk."""
+    numeric: bool
+    null_count: int
+    mean: float
+
 
 class ImageProcessor:
-    def __init__(self, csv_file_path: str, image_directory: str = 'data/images') -> None:
+    # Rows between progress log lines of the row-by-row ingest.
+    PROGRESS_LOG_INTERVAL = 10000
+    # Output rows per cached tile of a resampled pyramid level.
+    PYRAMID_TILE_ROWS = 256
+    # Requests spanning more tiles than this are resampled in one pass without caching.
+    MAX_PYRAMID_TILES = 64
+    # Memory a cached (depth, image) row takes beyond its PNG bytes: the tuple,
+    # the float, the bytes object header and the list slot pointing at the tuple.
+    CACHED_ROW_OVERHEAD = sys.getsizeof((0.0, b'')) + sys.getsizeof(0.0) + sys.getsizeof(b'') + 8
+
+    def __init__(self, csv_file_path: str, image_directory: str = 'data/images',
+                 depth_index: Optional[DepthIndex] = None,
+                 range_cache: Optional[RangeCache] = None, dataset: str = DEFAULT_DATASET,
+                 events: Optional[FrameEvents] = None) -> None:
         """
         Initialize the ImageProcessor.
 
         Args:
             csv_file_path (str): The path to the CSV file containing image data.
             image_directory (str, optional): The directory to save processed images. Defaults to 'data/images'.
+            depth_index (DepthIndex, optional): In-memory index that answers reads and is kept in sync with writes.
+            range_cache (RangeCache, optional): Cache for depth-range reads, invalidated by every write.
+            dataset (str, optional): The dataset, such as one well, whose rows this processor reads and writes.
+            events (FrameEvents, optional): Broadcaster that every committed write is published to.
         """
         self.csv_file_path = csv_file_path
         self.image_directory = image_directory
+        self.depth_index = depth_index
+        self.range_cache = range_cache
+        self.dataset = dataset
+        self.events = events
         self.logger = logging.getLogger('ImageProcessor')
         self.logger.info(
             f"Initialized ImageProcessor with CSV file path: {csv_file_path}")
 
+    def __getstate__(self) -> dict:
+        # Render methods are pickled with the processor to reach worker
+        # processes. The index, cache and event broadcaster hold locks and only
+        # mean anything in this process, so workers get a processor without them.
+        state = self.__dict__.copy()
+        state.update(depth_index=None, range_cache=None, events=None)
+        del state['logger']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger('ImageProcessor')
+
     def process_images(self, db: Session) -> None:
+        import pandas as pd
+
         try:
-            img_data = pd.read_csv(self.csv_file_path)
-            preprocessed_data = self.preprocess_data(img_data)
+            with metrics.timer('read_csv'):
+                img_data = pd.read_csv(self.csv_file_path)
+            with metrics.timer('preprocess', len(img_data)):
+                preprocessed_data = self.preprocess_data(img_data)
+            saved = 0
             for _, row in preprocessed_data.iterrows():
                 depth, image = self.process_row(row)
                 try:
                     self.save_image_to_db(db, depth, image)
+                    saved += 1
                 except Exception as e:
                     self.logger.error(f"Error saving image to database: {e}")
+                if saved and saved % self.PROGRESS_LOG_INTERVAL == 0:
+                    self.logger.info(f"Saved {saved} of {len(preprocessed_data)} images")
+            self.logger.info(f"Saved {saved} of {len(preprocessed_data)} images")
+        except Exception as e:
+            self.logger.error(f"Error processing images: {e}")
+
+    def process_images_batched(self, db: Session, chunk_size: int = 1024, batch_size: int = 1000,
+                               workers: int = 1, progress: Optional[IngestProgress] = None) -> Optional[int]:
+        """
+        Process the CSV file as whole frames instead of row by row.
+
+        Produces the same PNG bytes as ``process_images``. With more than one
+        worker, chunks are rendered in a process pool while this process stays
+        the only writer to the session. A last line without its line ending is
+        still being written and is left out.
+
+        Args:
+            db (Session): The database session to use for saving images.
+            chunk_size (int, optional): Number of depth rows rendered per batch. Defaults to 1024.
+            batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+            workers (int, optional): Number of rendering processes. Defaults to 1.
+            progress (IngestProgress, optional): Advanced every ``chunk_size`` rows as they are written.
+
+        Returns:
+            Optional[int]: The offset just past the last line ingested, or None if the ingest failed.
+        """
+        import pandas as pd
+
+        try:
+            end = self.complete_lines_end()
+            with metrics.timer('read_csv'):
+                with open(self.csv_file_path, 'rb') as csv_file:
+                    raw = csv_file.read(end)
+                img_data = pd.read_csv(io.BytesIO(raw))
+            data_bytes = end - (raw.find(b'\n') + 1)
+            del raw
+            self.log_incomplete_last_line(end)
+            with metrics.timer('preprocess', len(img_data)):
+                preprocessed_data = self.preprocess_data(img_data)
+            with self.create_executor(workers) as executor:
+                images = self.iter_frame_images(
+                    preprocessed_data, chunk_size, executor=executor,
+                    max_in_flight=2 * workers, include_pixels=True)
+                if progress is not None:
+                    # Rows are spread evenly over the data lines for the byte count.
+                    images = self.iter_with_progress(
+                        images, progress, chunk_size, data_bytes / max(len(preprocessed_data), 1))
+                self.save_images_to_db(db, images, batch_size)
+            return end
+        except Exception as e:
+            self.logger.error(f"Error processing images: {e}")
+            return None
+
+    def process_images_streaming(self, db: Session, chunk_size: int = 10000, batch_size: int = 1000,
+                                 workers: int = 1, progress: Optional[IngestProgress] = None) -> Optional[int]:
+        """
+        Process the CSV file in fixed-size chunks so memory stays bounded by the chunk size.
+
+        A last line without its line ending is still being written and is left out.
+
+        Args:
+            db (Session): The database session to use for saving images.
+            chunk_size (int, optional): Number of CSV rows held in memory at once. Defaults to 10000.
+            batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+            workers (int, optional): Number of rendering processes. Defaults to 1.
+            progress (IngestProgress, optional): Advanced after every committed chunk.
+
+        Returns:
+            Optional[int]: The offset just past the last line ingested, or None if the ingest failed.
+        """
+        try:
+            statistics = self.compute_column_statistics(chunk_size)
+            header = self.read_csv_header()
+            offset = len(header)
+            render_chunk_size = max(1, chunk_size // max(workers, 1))
+            with self.create_executor(workers) as executor:
+                for raw in self.iter_csv_blocks(chunk_size, complete_lines_only=True):
+                    chunk = self.parse_csv_chunk(header, raw)
+                    with metrics.timer('preprocess', len(chunk)):
+                        chunk = self.preprocess_chunk(chunk, statistics)
+                    self.save_images_to_db(db, self.iter_frame_images(
+                        chunk, render_chunk_size, executor=executor,
+                        max_in_flight=2 * workers, include_pixels=True), batch_size)
+                    offset += len(raw)
+                    if progress is not None:
+                        progress.advance(len(chunk), len(raw))
+            self.log_incomplete_last_line(offset)
+            return offset
         except Exception as e:
             self.logger.error(f"Error processing images: {e}")
+            return None
+
+    def iter_with_progress(self, images: Iterable[Tuple], progress: IngestProgress, step: int,
+                           bytes_per_row: float) -> Iterator[Tuple]:
+        """
+        Pass rendered rows through, advancing progress every ``step`` rows once they are taken.
+
+        Args:
+            images (Iterable[Tuple]): The rendered rows.
+            progress (IngestProgress): The progress to advance.
+            step (int): Rows between updates.
+            bytes_per_row (float): CSV bytes counted for each row.
+
+        Yields:
+            Tuple: The rows, unchanged.
+        """
+        rows = reported_rows = reported_bytes = 0
+        for image in images:
+            yield image
+            rows += 1
+            if rows - reported_rows >= step:
+                nbytes = round(rows * bytes_per_row)
+                progress.advance(rows - reported_rows, nbytes - reported_bytes)
+                reported_rows, reported_bytes = rows, nbytes
+        if rows > reported_rows:
+            progress.advance(rows - reported_rows, round(rows * bytes_per_row) - reported_bytes)
+
+    def iter_preprocessed_chunks(self, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Read and preprocess the CSV file chunk by chunk.
+
+        Missing values are filled with whole-file column means, so this takes a
+        statistics pass over the file before yielding the first chunk.
+
+        Args:
+            chunk_size (int, optional): Number of CSV rows per chunk. Defaults to 10000.
+
+        Yields:
+            pd.DataFrame: Preprocessed chunks in file order.
+        """
+        import pandas as pd
+
+        statistics = self.compute_column_statistics(chunk_size)
+        for chunk in metrics.timed_iter('read_csv', pd.read_csv(self.csv_file_path, chunksize=chunk_size)):
+            with metrics.timer('preprocess', len(chunk)):
+                chunk = self.preprocess_chunk(chunk, statistics)
+            yield chunk
+
+    def compute_column_statistics(self, chunk_size: int = 10000) -> Dict[str, ColumnStatistics]:
+        """
+        Gather the column statistics ``preprocess_data`` would see on the whole file.
+
+        A column counts as numeric only if every chunk parses as numeric, which
+        is how pandas types the column when the file is read in one go. Means
+        are accumulated from per-chunk sums; for the integer-valued pixel data
+        in our logs those sums are exact, so the fill values match
+        ``preprocess_data``.
+
+        Args:
+            chunk_size (int, optional): Number of CSV rows per chunk. Defaults to 10000.
+
+        Returns:
+            Dict[str, ColumnStatistics]: Statistics for every column, in file order.
+        """
+        import pandas as pd
+
+        columns = numeric = null_counts = sums = counts = None
+        for chunk in metrics.timed_iter('read_csv', pd.read_csv(self.csv_file_path, chunksize=chunk_size)):
+            chunk_numeric, chunk_nulls, chunk_sums, chunk_counts = self.column_sums(chunk)
+            if columns is None:
+                columns = list(chunk.columns)
+                numeric, null_counts = chunk_numeric, chunk_nulls
+                sums, counts = chunk_sums, chunk_counts
+                continue
+            numeric &= chunk_numeric
+            null_counts += chunk_nulls
+            sums += chunk_sums
+            counts += chunk_counts
+
+        if columns is None:
+            return {}
+        statistics = self.build_column_statistics(columns, numeric, null_counts, sums, counts)
+        for column, column_statistics in statistics.items():
+            self.log_column_statistics(column, column_statistics)
+        return statistics
+
+    def column_sums(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute per-column type, null counts and sums of a chunk in one vectorized pass.
+
+        Args:
+            data (pd.DataFrame): A raw chunk of the CSV file.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Whether each column is
+            numeric, its null count, and the sum and count of its non-null values.
+        """
+        numeric = self.numeric_columns(data)
+        null_counts = np.zeros(data.shape[1], dtype=np.int64)
+        sums = np.zeros(data.shape[1], dtype=np.float64)
+        counts = np.zeros(data.shape[1], dtype=np.int64)
+
+        positions = np.flatnonzero(numeric)
+        if len(positions):
+            values = self.float_matrix(data, positions)
+            mask = np.isnan(values)
+            null_counts[positions] = mask.sum(axis=0)
+            counts[positions] = len(data) - null_counts[positions]
+            sums[positions] = self.column_nansums(values, mask)
+        for position in np.flatnonzero(~numeric):
+            null_counts[position] = data.iloc[:, position].isnull().sum()
+        return numeric, null_counts, sums, counts
+
+    def numeric_columns(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Flag the columns pandas considers numeric.
+
+        Args:
+            data (pd.DataFrame): The frame to inspect.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per column.
+        """
+        import pandas as pd
+
+        return np.fromiter((pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes),
+                           dtype=bool, count=data.shape[1])
+
+    def float_matrix(self, data: pd.DataFrame, positions: np.ndarray) -> np.ndarray:
+        """
+        Read numeric columns of a frame as one float64 matrix.
+
+        A frame whose columns are all float64 is returned as a view of its
+        storage, so the result must not be modified.
+
+        Args:
+            data (pd.DataFrame): The frame to read.
+            positions (np.ndarray): Positions of the numeric columns to read.
+
+        Returns:
+            np.ndarray: An array of shape (rows, len(positions)).
+        """
+        if len(positions) == data.shape[1]:
+            return data.to_numpy(dtype=np.float64)
+        if all(dtype.kind in 'biuf' for dtype in data.dtypes):
+            # Converting the whole frame and dropping columns in NumPy is much
+            # cheaper than selecting the columns in pandas first.
+            return data.to_numpy(dtype=np.float64)[:, positions]
+        return data.iloc[:, positions].to_numpy(dtype=np.float64)
+
+    def column_nansums(self, values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Sum each column of a matrix, skipping the masked values.
+
+        Each column is summed as one contiguous run, which is the same
+        pairwise summation pandas uses for ``Series.mean``, so dividing by the
+        count gives the pandas mean bit for bit.
+
+        Args:
+            values (np.ndarray): A float64 matrix.
+            mask (np.ndarray): True where a value is missing.
+
+        Returns:
+            np.ndarray: The sum of every column.
+        """
+        return np.asfortranarray(np.where(mask, 0.0, values)).sum(axis=0)
+
+    def fill_missing_values(self, data: pd.DataFrame, positions: np.ndarray,
+                            means: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Replace missing values in numeric columns with a fill value per column, in place.
+
+        Only the columns that have gaps are copied and written back, so the
+        others keep their dtype.
+
+        Args:
+            data (pd.DataFrame): The frame to fill.
+            positions (np.ndarray): Positions of the numeric columns to fill.
+            means (np.ndarray, optional): The fill value of each column. Defaults to
+                the mean of the column's own non-missing values.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The null count and fill value of each column.
+        """
+        compute_means = means is None
+        if compute_means:
+            means = np.full(len(positions), np.nan)
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64), means
+        values = self.float_matrix(data, positions)
+        mask = np.isnan(values)
+        null_counts = mask.sum(axis=0)
+        gaps = np.flatnonzero(null_counts)
+        if len(gaps):
+            gap_values = np.asfortranarray(values[:, gaps])
+            gap_mask = mask[:, gaps]
+            if compute_means:
+                # Zero the gaps in the copy and sum it in Fortran order, as
+                # column_nansums does, before filling the same copy.
+                np.copyto(gap_values, 0.0, where=gap_mask)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    means[gaps] = gap_values.sum(axis=0) / (len(data) - null_counts[gaps])
+            np.copyto(gap_values, means[gaps], where=gap_mask)
+            data.iloc[:, positions[gaps]] = gap_values
+        return null_counts, means
+
+    def build_column_statistics(self, columns: List[str], numeric: np.ndarray, null_counts: np.ndarray,
+                                sums: np.ndarray, counts: np.ndarray) -> Dict[str, ColumnStatistics]:
+        """
+        Turn the arrays from ``column_sums`` into statistics per column.
+
+        Args:
+            columns (List[str]): The column names, in file order.
+            numeric (np.ndarray): Whether each column is numeric.
+            null_counts (np.ndarray): Null count of each column.
+            sums (np.ndarray): Sum of the non-null values of each column.
+            counts (np.ndarray): Count of the non-null values of each column.
+
+        Returns:
+            Dict[str, ColumnStatistics]: Statistics for every column, in file order.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(numeric & (counts > 0), sums / counts, np.nan)
+        return {column: ColumnStatistics(bool(is_numeric), int(null_count), mean)
+                for column, is_numeric, null_count, mean
+                in zip(columns, numeric, null_counts, means)}
+
+    def log_column_statistics(self, column: str, statistics: ColumnStatistics) -> None:
+        """
+        Log the fill and conversion decisions for a column, as ``preprocess_data`` does.
+
+        Args:
+            column (str): The column name.
+            statistics (ColumnStatistics): The whole-file statistics of the column.
+        """
+        if statistics.null_count:
+            if statistics.numeric:
+                self.logger.info(
+                    f"Missing values in column {column} replaced with {statistics.mean}.")
+            else:
+                self.logger.info(
+                    f"Missing non-numeric values in column {column} replaced with 'CustomValue'.")
+        if not statistics.numeric:
+            self.logger.warning(
+                f"Non-numeric data found in column {column}. Converting to numeric.")
+
+    def preprocess_chunk(self, chunk: pd.DataFrame, statistics: Dict[str, ColumnStatistics]) -> pd.DataFrame:
+        """
+        Preprocess one chunk using whole-file column statistics.
+
+        Args:
+            chunk (pd.DataFrame): A raw chunk of the CSV file.
+            statistics (Dict[str, ColumnStatistics]): Statistics from ``compute_column_statistics``.
+
+        Returns:
+            pd.DataFrame: The preprocessed chunk.
+        """
+        import pandas as pd
+
+        for column, is_numeric in zip(chunk.columns, self.numeric_columns(chunk)):
+            if statistics[column].numeric and not is_numeric:
+                # Only a chunk read apart from the file, such as appended lines,
+                # can hold values that did not parse in a numeric column. Like
+                # preprocess_data, they become 0; missing values are filled below.
+                values = pd.to_numeric(chunk[column], errors='coerce')
+                chunk[column] = values.mask(values.isna() & chunk[column].notna(), 0)
+        positions = np.flatnonzero([
+            statistics[column].numeric and statistics[column].null_count > 0
+            for column in chunk.columns])
+        self.fill_missing_values(chunk, positions, np.array(
+            [statistics[chunk.columns[position]].mean for position in positions], dtype=np.float64))
+        return self.convert_non_numeric_columns(chunk, [
+            column for column in chunk.columns if not statistics[column].numeric])
+
+    def convert_non_numeric_columns(self, data: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """
+        Coerce columns to numbers, turning anything unparseable or missing into 0.
+
+        Args:
+            data (pd.DataFrame): The frame to convert, in place.
+            columns (Iterable[str]): The non-numeric columns.
+
+        Returns:
+            pd.DataFrame: The converted frame.
+        """
+        import pandas as pd
+
+        for column in columns:
+            # 'CustomValue' placeholders for missing values coerce to NaN and
+            # then to 0, so missing values end up as 0 either way.
+            data[column] = pd.to_numeric(data[column], errors='coerce').fillna(0)
+        return data
+
+    def iter_csv_chunks(self, chunk_size: int = 10000,
+                        complete_lines_only: bool = False) -> Iterator[Tuple[str, bytes]]:
+        """
+        Read the CSV file as hashed raw blocks of data lines, without parsing them.
+
+        Args:
+            chunk_size (int, optional): Number of data lines per block. Defaults to 10000.
+            complete_lines_only (bool, optional): Leave out a last line that has no line
+                ending yet, as in a file that is still being written. Defaults to False.
+
+        Yields:
+            Tuple[str, bytes]: The SHA-256 hex digest and the raw bytes of each block.
+        """
+        for raw in self.iter_csv_blocks(chunk_size, complete_lines_only):
+            yield hashlib.sha256(raw).hexdigest(), raw
+
+    def iter_csv_blocks(self, chunk_size: int = 10000, complete_lines_only: bool = False) -> Iterator[bytes]:
+        """
+        Read the CSV file as raw blocks of data lines, without parsing them.
+
+        Blocks line up with the chunks of ``pd.read_csv(chunksize=chunk_size)``.
+
+        Args:
+            chunk_size (int, optional): Number of data lines per block. Defaults to 10000.
+            complete_lines_only (bool, optional): Leave out a last line that has no line
+                ending yet. Defaults to False.
+
+        Yields:
+            bytes: The raw bytes of each block.
+        """
+        with open(self.csv_file_path, 'rb') as csv_file:
+            csv_file.readline()
+            while True:
+                raw = b''.join(islice(csv_file, chunk_size))
+                if complete_lines_only and not raw.endswith(b'\n'):
+                    # Only the block at the end of the file can end mid-line.
+                    raw = raw[:raw.rfind(b'\n') + 1]
+                if not raw:
+                    break
+                yield raw
+
+    def log_incomplete_last_line(self, offset: int) -> None:
+        """
+        Log that an ingest stopped before a last line that has no line ending yet.
+
+        Args:
+            offset (int): The offset just past the last line ingested.
+        """
+        if offset < os.path.getsize(self.csv_file_path):
+            self.logger.info(
+                f"The last line of {self.csv_file_path} is incomplete, "
+                f"leaving it until it ends with a line break.")
+
+    def complete_lines_end(self, scan_bytes: int = 64 * 1024) -> int:
+        """
+        Find the end of the last complete line of the CSV file.
+
+        Args:
+            scan_bytes (int, optional): Bytes read at a time when scanning back from
+                the end of the file. Defaults to 64 KiB.
+
+        Returns:
+            int: The offset just past the last line ending, or 0 if there is none.
+        """
+        with open(self.csv_file_path, 'rb') as csv_file:
+            end = csv_file.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(end - scan_bytes, 0)
+                csv_file.seek(start)
+                newline = csv_file.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    return start + newline + 1
+                end = start
+        return 0
+
+    def read_csv_header(self) -> bytes:
+        """
+        Read the header line of the CSV file.
+
+        Returns:
+            bytes: The raw header line, including its line ending.
+        """
+        with open(self.csv_file_path, 'rb') as csv_file:
+            return csv_file.readline()
+
+    def parse_csv_chunk(self, header: bytes, raw: bytes) -> pd.DataFrame:
+        """
+        Parse a raw block from ``iter_csv_chunks``.
+
+        Args:
+            header (bytes): The header line of the CSV file.
+            raw (bytes): The raw data lines.
+
+        Returns:
+            pd.DataFrame: The parsed chunk.
+        """
+        import pandas as pd
+
+        with metrics.timer('read_csv'):
+            return pd.read_csv(io.BytesIO(header + raw))
 
     def read_csv_data(self) -> pd.DataFrame:
         """
@@ -47,37 +599,42 @@ class ImageProcessor:
         Returns:
             pd.DataFrame: A DataFrame containing image data.
         """
-        return pd.read_csv(self.csv_file_path)
+        import pandas as pd
+
+        with metrics.timer('read_csv'):
+            return pd.read_csv(self.csv_file_path)
 
     def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Preprocess the image data from the CSV file.
 
+        Missing numeric values are replaced with their column mean, computed
+        for all columns in one vectorized pass, and non-numeric columns are
+        coerced to numbers with anything unparseable becoming 0.
+
         Args:
             data (pd.DataFrame): The raw DataFrame containing image data.
 
         Returns:
             pd.DataFrame: The preprocessed DataFrame.
         """
-        for column in data.columns:
-            if data[column].isnull().any():
-                if pd.api.types.is_numeric_dtype(data[column]):
-                    replacement_value = data[column].mean()
-                    data[column].fillna(replacement_value, inplace=True)
-                    self.logger.info(
-                        f"Missing values in column {column} replaced with {replacement_value}.")
-                else:
-                    data[column].fillna('CustomValue', inplace=True)
-                    self.logger.info(
-                        f"Missing non-numeric values in column {column} replaced with 'CustomValue'.")
+        numeric = self.numeric_columns(data)
+        positions = np.flatnonzero(numeric)
+        null_counts, means = self.fill_missing_values(data, positions)
 
-            if not pd.api.types.is_numeric_dtype(data[column]):
-                self.logger.warning(
-                    f"Non-numeric data found in column {column}. Converting to numeric.")
-                data[column] = pd.to_numeric(
-                    data[column], errors='coerce').fillna(0)
-
-        return data
+        statistics = {}
+        numeric_statistics = iter(zip(null_counts, means))
+        for column, is_numeric in zip(data.columns, numeric):
+            if is_numeric:
+                null_count, mean = next(numeric_statistics)
+                statistics[column] = ColumnStatistics(True, int(null_count), mean)
+            else:
+                statistics[column] = ColumnStatistics(
+                    False, int(data[column].isnull().sum()), np.float64('nan'))
+            self.log_column_statistics(column, statistics[column])
+        return self.convert_non_numeric_columns(data, [
+            column for column, column_statistics in statistics.items()
+            if not column_statistics.numeric])
 
     def process_row(self, row: pd.Series) -> Tuple[float, bytes]:
         """
@@ -90,9 +647,179 @@ class ImageProcessor:
             Tuple[float, bytes]: A tuple containing the image depth and binary image data.
         """
         depth = row.pop('depth')
-        resized_img = self.create_resized_image(row)
-        color_mapped_img = self.apply_color_map(resized_img)
-        return depth, self.convert_image_to_binary(color_mapped_img)
+        with metrics.timer('resize', 1):
+            resized_img = self.create_resized_image(row)
+        with metrics.timer('colormap', 1):
+            color_mapped_img = self.apply_color_map(resized_img)
+        with metrics.timer('encode', 1):
+            return depth, self.convert_image_to_binary(color_mapped_img)
+
+    def iter_frame_images(self, data: pd.DataFrame, chunk_size: int = 1024, new_width: int = 150,
+                          executor: Optional[Executor] = None, max_in_flight: int = 4,
+                          include_pixels: bool = False) -> Iterator[Tuple]:
+        """
+        Render a preprocessed frame chunk by chunk.
+
+        Args:
+            data (pd.DataFrame): The preprocessed DataFrame with a ``depth`` column.
+            chunk_size (int, optional): Number of rows rendered per batch. Defaults to 1024.
+            new_width (int, optional): The width of the resized images. Defaults to 150.
+            executor (Executor, optional): Pool to render chunks on. Defaults to rendering in this process.
+            max_in_flight (int, optional): Chunks submitted to the executor ahead of the consumer. Defaults to 4.
+            include_pixels (bool, optional): Also yield the raw resized grayscale row and the
+                original-resolution row. Defaults to False.
+
+        Yields:
+            Tuple: The image depth and binary image data, plus the raw and original row
+            bytes if ``include_pixels`` is set, in row order.
+        """
+        # A single to_numpy() call upcasts to the same common dtype iterrows() uses,
+        # so depths and pixel values match the per-row path exactly.
+        values = data.to_numpy()
+        depth_column = data.columns.get_loc('depth')
+        depths = values[:, depth_column]
+        pixels = np.delete(values, depth_column, axis=1)
+        chunks = ((depths[start:start + chunk_size],
+                   pixels[start:start + chunk_size].astype(np.uint8))
+                  for start in range(0, len(values), chunk_size))
+
+        if executor is None:
+            for chunk_depths, chunk_pixels in chunks:
+                yield from self.render_chunk(
+                    chunk_depths, chunk_pixels, new_width, include_pixels)
+            return
+
+        # Keep only a few chunks in flight so results stream to the writer in
+        # order without the whole frame piling up in memory.
+        pending = deque()
+        for chunk_depths, chunk_pixels in chunks:
+            pending.append(executor.submit(
+                self.render_chunk_recorded, chunk_depths, chunk_pixels, new_width, include_pixels))
+            if len(pending) >= max_in_flight:
+                yield from self.collect_rendered_chunk(pending.popleft())
+        while pending:
+            yield from self.collect_rendered_chunk(pending.popleft())
+
+    def render_chunk(self, depths: np.ndarray, pixels: np.ndarray, new_width: int = 150,
+                     include_pixels: bool = False) -> List[Tuple]:
+        """
+        Resize, color map and encode one chunk of rows.
+
+        This is the unit of work handed to ingest worker processes.
+
+        Args:
+            depths (np.ndarray): The depth of every row in the chunk.
+            pixels (np.ndarray): An array of shape (rows, columns) with pixel values.
+            new_width (int, optional): The width of the resized images. Defaults to 150.
+            include_pixels (bool, optional): Also return the raw resized grayscale row and the
+                original-resolution row. Defaults to False.
+
+        Returns:
+            List[Tuple]: The image depth and binary image data for every row, plus
+            the raw and original row bytes if ``include_pixels`` is set.
+        """
+        with metrics.timer('resize', len(pixels)):
+            resized = self.create_resized_frame(pixels, new_width)
+        with metrics.timer('colormap', len(pixels)):
+            color_mapped = self.apply_color_map_lut(resized)
+        with metrics.timer('encode', len(pixels)):
+            images = self.convert_frame_to_binary(color_mapped)
+        if include_pixels:
+            source = pixels.astype(np.uint8, copy=False)
+            return list(zip(depths, images, (row.tobytes() for row in resized),
+                            (row.tobytes() for row in source)))
+        return list(zip(depths, images))
+
+    def render_chunk_recorded(self, depths: np.ndarray, pixels: np.ndarray, new_width: int = 150,
+                              include_pixels: bool = False) -> Tuple[List[Tuple], List[Tuple[str, float, int]]]:
+        """
+        Render one chunk and return its stage timings with it.
+
+        Worker processes have their own metrics registry, so the timings travel
+        back with the result and are recorded by ``collect_rendered_chunk``.
+
+        Returns:
+            Tuple[List[Tuple], List[Tuple[str, float, int]]]: The output of ``render_chunk``
+            and the stage observations.
+        """
+        with metrics.recording() as observations:
+            images = self.render_chunk(depths, pixels, new_width, include_pixels)
+        return images, observations
+
+    def collect_rendered_chunk(self, future: Future) -> List[Tuple]:
+        """
+        Wait for a chunk submitted with ``render_chunk_recorded`` and record its timings.
+
+        Args:
+            future (Future): The pending result.
+
+        Returns:
+            List[Tuple]: The rendered rows.
+        """
+        images, observations = future.result()
+        metrics.observe_stages(observations)
+        return images
+
+    def create_executor(self, workers: int):
+        """
+        Create a process pool for rendering, or a no-op context for a single worker.
+
+        Args:
+            workers (int): Number of worker processes.
+
+        Returns:
+            A context manager yielding an ``Executor`` or ``None``.
+        """
+        if workers > 1:
+            self.logger.info(f"Rendering images with {workers} worker processes")
+            return ProcessPoolExecutor(max_workers=workers)
+        return nullcontext()
+
+    def create_resized_frame(self, pixels: np.ndarray, new_width: int = 150) -> np.ndarray:
+        """
+        Resize every row of a 2-D pixel array in one call.
+
+        Pillow only resamples along an axis whose size changes, so resizing an
+        ``N x W`` image to ``N x new_width`` matches N one-row resizes byte for byte.
+
+        Args:
+            pixels (np.ndarray): An array of shape (rows, columns) with pixel values.
+            new_width (int, optional): The width of the resized rows. Defaults to 150.
+
+        Returns:
+            np.ndarray: A uint8 array of shape (rows, new_width).
+        """
+        if len(pixels) == 0:
+            return np.empty((0, new_width), dtype=np.uint8)
+        img = PILImage.fromarray(
+            np.ascontiguousarray(pixels.astype(np.uint8)), 'L')
+        return np.asarray(img.resize((new_width, len(pixels)), PILImage.BILINEAR))
+
+    def apply_color_map_lut(self, gray: np.ndarray, colormap: str = DEFAULT_COLORMAP) -> np.ndarray:
+        """
+        Apply a color map to a grayscale array through its lookup table.
+
+        Args:
+            gray (np.ndarray): A uint8 array of any shape.
+            colormap (str, optional): The colormap name. Defaults to 'viridis'.
+
+        Returns:
+            np.ndarray: A uint8 RGBA array with a trailing axis of 4.
+        """
+        return apply_colormap(gray, colormap)
+
+    def convert_frame_to_binary(self, frame: np.ndarray) -> List[bytes]:
+        """
+        Encode each row of an RGBA frame as its own one-pixel-high PNG.
+
+        Args:
+            frame (np.ndarray): A uint8 array of shape (rows, width, 4).
+
+        Returns:
+            List[bytes]: The binary image data for every row.
+        """
+        return [self.convert_image_to_binary(PILImage.fromarray(row[np.newaxis]))
+                for row in frame]
 
     def create_resized_image(self, data_row: pd.Series, new_width: int = 150) -> PILImage.Image:
         """
@@ -119,9 +846,7 @@ class ImageProcessor:
         Returns:
             PILImage.Image: The color-mapped image.
         """
-        gray_image_array = np.array(image)
-        colored_array = cm.viridis(gray_image_array)
-        return PILImage.fromarray((colored_array * 255).astype(np.uint8))
+        return PILImage.fromarray(self.apply_color_map_lut(np.array(image)))
 
     def convert_image_to_binary(self, image: PILImage.Image) -> bytes:
         """
@@ -147,24 +872,94 @@ class ImageProcessor:
             binary_image (bytes): The binary image data.
         """
         try:
-            existing_image = db.query(ImageModel).filter(
-                ImageModel.depth == depth).first()
+            with metrics.timer('db_write', 1):
+                existing_image = db.query(ImageModel).filter(
+                    ImageModel.dataset == self.dataset, ImageModel.depth == depth).first()
 
-            if existing_image:
-                existing_image.image = binary_image
-                self.logger.info(f"Updated image at depth: {depth}")
-            else:
-                new_image = ImageModel(depth=depth, image=binary_image)
-                db.add(new_image)
-                self.logger.info(f"Saved new image at depth: {depth}")
+                if existing_image:
+                    existing_image.image = binary_image
+                    self.logger.debug(f"Updated image at depth: {depth}")
+                else:
+                    new_image = ImageModel(dataset=self.dataset, depth=depth, image=binary_image)
+                    db.add(new_image)
+                    self.logger.debug(f"Saved new image at depth: {depth}")
 
-            db.commit()
+                db.commit()
+            self.notify_images_saved([(depth, binary_image)])
         except Exception as e:
             db.rollback()
             self.logger.error(
                 f"Error in saving/updating image to database: {e}")
             raise e
 
+    def save_images_to_db(self, db: Session, images: Iterable[Tuple], batch_size: int = 1000) -> List[float]:
+        """
+        Upsert many images in a single transaction.
+
+        Rows are written with ``INSERT ... ON CONFLICT(dataset, depth) DO UPDATE`` in
+        batches of ``batch_size`` and committed once at the end.
+
+        Args:
+            db (Session): The database session to use for saving the images.
+            images (Iterable[Tuple]): Tuples of depth and binary image data,
+                optionally followed by the raw grayscale row.
+            batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+
+        Returns:
+            List[float]: The time in seconds spent writing each batch.
+        """
+        batch_timings = []
+        saved = []
+        images = iter(images)
+        try:
+            while True:
+                rows = list(islice(images, batch_size))
+                if not rows:
+                    break
+                if self.depth_index is not None or (self.events is not None and self.events.subscribers):
+                    saved.extend(rows)
+                batch = [dict(zip(IMAGE_COLUMNS, image), dataset=self.dataset) for image in rows]
+                statement = insert(ImageModel)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[ImageModel.dataset, ImageModel.depth],
+                    set_={column: statement.excluded[column]
+                          for column in batch[0] if column not in ('dataset', 'depth')})
+                start = time.perf_counter()
+                db.execute(statement, batch)
+                batch_timings.append(time.perf_counter() - start)
+                metrics.observe_stages([('db_write', batch_timings[-1], len(batch))])
+                self.logger.debug(
+                    f"Upserted batch of {len(batch)} images in {batch_timings[-1]:.4f}s")
+            with metrics.timer('db_commit'):
+                start = time.perf_counter()
+                db.commit()
+            self.logger.info(
+                f"Saved images in {len(batch_timings)} batches, "
+                f"commit took {time.perf_counter() - start:.4f}s")
+            self.notify_images_saved(saved)
+        except Exception as e:
+            db.rollback()
+            self.logger.error(
+                f"Error in bulk saving images to database: {e}")
+            raise e
+        return batch_timings
+
+    def notify_images_saved(self, images: List[Tuple]) -> None:
+        """
+        Propagate committed writes to the depth index and event subscribers, and invalidate
+        this dataset's cached ranges.
+
+        Args:
+            images (List[Tuple]): The rows that were committed.
+        """
+        if self.depth_index is not None:
+            self.depth_index.update(images)
+        if self.range_cache is not None:
+            self.range_cache.invalidate(self.dataset)
+        if self.events is not None and images:
+            self.events.publish(FrameEvent(
+                self.dataset, [float(image[0]) for image in images], [image[1] for image in images]))
+
     def get_images_by_depth_range(self, db: Session, depth_min: float, depth_max: float) -> List[Tuple[float, PILImage.Image]]:
         """
         Retrieve images from the database within a specified depth range.
@@ -177,13 +972,468 @@ class ImageProcessor:
         Returns:
             List[Tuple[float, PILImage.Image]]: A list of tuples containing image depth and PIL images.
         """
-        images = db.query(ImageModel).filter(
-            ImageModel.depth.between(depth_min, depth_max)).all()
+        if self.depth_index is not None or self.range_cache is not None:
+            images = self.get_image_bytes_by_depth_range(db, depth_min, depth_max)
+            return [(depth, PILImage.open(io.BytesIO(image))) for depth, image in images]
+        with metrics.timer('range_query'):
+            images = db.query(ImageModel).filter(
+                ImageModel.dataset == self.dataset,
+                ImageModel.depth.between(depth_min, depth_max)).order_by(ImageModel.depth).all()
         if not images:
             raise ValueError(
                 f"No images found within the depth range: {depth_min} - {depth_max}")
         return [(image.depth, PILImage.open(io.BytesIO(image.image))) for image in images]
 
+    def get_image_bytes(self, db: Session, depth: float, colormap: str = DEFAULT_COLORMAP) -> bytes:
+        """
+        Retrieve the stored PNG bytes for a single depth, without decoding them.
+
+        Stored strips are viridis; any other colormap is rendered from the raw
+        grayscale row.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth (float): The depth of the image.
+            colormap (str, optional): The colormap name. Defaults to 'viridis'.
+
+        Returns:
+            bytes: The binary image data.
+        """
+        if colormap != DEFAULT_COLORMAP:
+            pixels = self.get_pixels_by_depth_range(db, depth, depth)
+            if pixels is None:
+                raise ValueError(f"No raw pixels stored at depth: {depth}")
+            return encode_png(self.apply_color_map_lut(pixels[1], colormap))
+        with metrics.timer('depth_query'):
+            if self.depth_index is not None:
+                image = self.depth_index.get(depth)
+            else:
+                image = db.query(ImageModel.image).filter(
+                    ImageModel.dataset == self.dataset, ImageModel.depth == depth).scalar()
+        if image is None:
+            raise ValueError(f"No image found at depth: {depth}")
+        return image
+
+    def get_image_bytes_by_depth_range(self, db: Session, depth_min: float, depth_max: float) -> List[Tuple[float, bytes]]:
+        """
+        Retrieve the stored PNG bytes within a depth range, ordered by depth.
+
+        Only the two columns are selected, so no ORM objects are built. Results
+        are served from the range cache when one is attached.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            List[Tuple[float, bytes]]: A list of tuples containing image depth and binary image data.
+        """
+        generation = self.cache_generation()
+        images = self.get_cached_range(depth_min, depth_max)
+        if images is not None:
+            return images
+        with metrics.timer('range_query'):
+            if self.depth_index is not None:
+                images = self.depth_index.range(depth_min, depth_max)
+            else:
+                images = db.query(ImageModel.depth, ImageModel.image).filter(
+                    ImageModel.dataset == self.dataset,
+                    ImageModel.depth.between(depth_min, depth_max)).order_by(ImageModel.depth).all()
+        return self.cache_range(depth_min, depth_max, images, generation)
+
+    def get_image_page(self, db: Session, depth_min: float, depth_max: float, limit: Optional[int] = None,
+                       after_depth: Optional[float] = None) -> List[Tuple[float, bytes]]:
+        """
+        Retrieve one page of the stored PNG bytes within a depth range, ordered by depth.
+
+        Pages are keyed on depth rather than an offset, so each one is a seek
+        on the primary key no matter how deep into the range it starts. An
+        empty page is not an error; it marks the end of the range.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            limit (int, optional): The most depths to return. Defaults to no limit.
+            after_depth (float, optional): Only return depths greater than this one,
+                usually the last depth of the previous page.
+
+        Returns:
+            List[Tuple[float, bytes]]: A list of tuples containing image depth and binary image data.
+        """
+        with metrics.timer('range_query'):
+            if self.depth_index is not None:
+                return self.depth_index.page(depth_min, depth_max, limit, after_depth)
+            # One lower bound, so SQLite seeks to the cursor instead of
+            # filtering every row between depth_min and the cursor.
+            if after_depth is not None and after_depth >= depth_min:
+                lower = ImageModel.depth > after_depth
+            else:
+                lower = ImageModel.depth >= depth_min
+            images = db.query(ImageModel.depth, ImageModel.image).filter(
+                ImageModel.dataset == self.dataset, lower, ImageModel.depth <= depth_max).order_by(
+                ImageModel.depth).limit(limit).all()
+        return [(depth, image) for depth, image in images]
+
+    def iter_image_pages(self, db: Session, depth_min: float, depth_max: float, page_size: int = 500,
+                         after_depth: Optional[float] = None, limit: Optional[int] = None) -> Iterator[List[Tuple[float, bytes]]]:
+        """
+        Page through the stored PNG bytes within a depth range, so only one page is held at a time.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            page_size (int, optional): Depths fetched per query. Defaults to 500.
+            after_depth (float, optional): Only return depths greater than this one.
+            limit (int, optional): The most depths to return in total. Defaults to no limit.
+
+        Yields:
+            List[Tuple[float, bytes]]: Non-empty pages of image depth and binary image data.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = self.get_image_page(db, depth_min, depth_max, size, after_depth)
+            if page:
+                yield page
+            if len(page) < size:
+                return
+            after_depth = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def get_image_bytes_async(self, db: AsyncSession, depth: float) -> bytes:
+        """
+        Async version of ``get_image_bytes``.
+
+        Args:
+            db (AsyncSession): The async database session to use for querying images.
+            depth (float): The depth of the image.
+
+        Returns:
+            bytes: The binary image data.
+        """
+        with metrics.timer('depth_query'):
+            if self.depth_index is not None:
+                image = self.depth_index.get(depth)
+            else:
+                image = await db.scalar(
+                    select(ImageModel.image).where(
+                        ImageModel.dataset == self.dataset, ImageModel.depth == depth))
+        if image is None:
+            raise ValueError(f"No image found at depth: {depth}")
+        return image
+
+    async def get_image_bytes_by_depth_range_async(self, db: AsyncSession, depth_min: float, depth_max: float) -> List[Tuple[float, bytes]]:
+        """
+        Async version of ``get_image_bytes_by_depth_range``.
+
+        Args:
+            db (AsyncSession): The async database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            List[Tuple[float, bytes]]: A list of tuples containing image depth and binary image data.
+        """
+        generation = self.cache_generation()
+        images = self.get_cached_range(depth_min, depth_max)
+        if images is not None:
+            return images
+        with metrics.timer('range_query'):
+            if self.depth_index is not None:
+                images = self.depth_index.range(depth_min, depth_max)
+            else:
+                result = await db.execute(
+                    select(ImageModel.depth, ImageModel.image).where(
+                        ImageModel.dataset == self.dataset,
+                        ImageModel.depth.between(depth_min, depth_max)).order_by(ImageModel.depth))
+                images = result.all()
+        return self.cache_range(depth_min, depth_max, images, generation)
+
+    def cache_generation(self) -> Optional[Tuple[int, int]]:
+        """
+        Take the range cache generation of this dataset before reading rows to cache.
+
+        Returns:
+            Optional[Tuple[int, int]]: The generation to pass to the cache, or None without a cache.
+        """
+        if self.range_cache is None:
+            return None
+        return self.range_cache.current_generation(self.dataset)
+
+    def get_cached_range(self, depth_min: float, depth_max: float) -> Optional[List[Tuple[float, bytes]]]:
+        """
+        Look up a depth range in the range cache.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            Optional[List[Tuple[float, bytes]]]: The cached images, or None on a miss or without a cache.
+        """
+        if self.range_cache is None:
+            return None
+        return self.range_cache.get((self.dataset, 'images', float(depth_min), float(depth_max)))
+
+    def cache_range(self, depth_min: float, depth_max: float, rows: Iterable[Tuple[float, bytes]],
+                    generation: Optional[Tuple[int, int]] = None) -> List[Tuple[float, bytes]]:
+        """
+        Validate the rows of a depth-range read and store them in the range cache.
+
+        Args:
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            rows (Iterable[Tuple[float, bytes]]): The depth and binary image data read for the range.
+            generation (Tuple[int, int], optional): ``cache_generation`` taken before the read,
+                so rows read before a write are not cached after it.
+
+        Returns:
+            List[Tuple[float, bytes]]: The rows as a list of tuples.
+        """
+        images = [(depth, image) for depth, image in rows]
+        if not images:
+            raise ValueError(
+                f"No images found within the depth range: {depth_min} - {depth_max}")
+        if self.range_cache is not None:
+            self.range_cache.put(
+                (self.dataset, 'images', float(depth_min), float(depth_max)), images,
+                sum(len(image) for _, image in images) + len(images) * self.CACHED_ROW_OVERHEAD,
+                generation)
+        return images
+
+    def get_composite_image(self, db: Session, depth_min: float, depth_max: float, height: Optional[int] = None,
+                            colormap: str = DEFAULT_COLORMAP, width: Optional[int] = None,
+                            depth_step: Optional[float] = None, pooling: str = PoolingMethod.mean.value) -> bytes:
+        """
+        Render every strip within a depth range as one stacked PNG, one row per depth.
+
+        Rows are built from the stored raw grayscale rows and color mapped once
+        for the whole frame. Rows ingested before raw rows were stored fall
+        back to decoding their PNG strips. Given a ``width`` or ``depth_step``,
+        the frame is resampled from the original-resolution rows instead.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            height (int, optional): Downsample to this many rows by averaging adjacent depths.
+            colormap (str, optional): The colormap name. Defaults to 'viridis'.
+            width (int, optional): Resample every row to this many pixels.
+            depth_step (float, optional): Pool rows into one row per ``depth_step`` of depth.
+            pooling (str, optional): How rows are pooled, 'mean' or 'max'. Defaults to 'mean'.
+
+        Returns:
+            bytes: The binary image data of the composite.
+        """
+        if width is not None or depth_step is not None:
+            frame = self.get_resampled_frame(db, depth_min, depth_max, width, depth_step, pooling)
+        else:
+            pixels = self.get_pixels_by_depth_range(db, depth_min, depth_max)
+            if pixels is None:
+                if colormap != DEFAULT_COLORMAP:
+                    raise ValueError(
+                        f"No raw pixels stored within the depth range: {depth_min} - {depth_max}")
+                images = self.get_image_bytes_by_depth_range(db, depth_min, depth_max)
+                frame = decode_png_rows(image for _, image in images)
+                return encode_png(downsample_rows(frame, height))
+            frame = pixels[1]
+        with metrics.timer('downsample', len(frame)):
+            frame = downsample_rows(frame, height)
+        with metrics.timer('colormap', len(frame)):
+            color_mapped = self.apply_color_map_lut(frame, colormap)
+        with metrics.timer('encode', len(frame)):
+            return encode_png(color_mapped)
+
+    def get_pixels_by_depth_range(self, db: Session, depth_min: float, depth_max: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Retrieve the raw grayscale rows within a depth range as one array.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: The sorted depths and a uint8 array of
+            shape (depths, width), or None if any row in the range has no raw pixels.
+        """
+        if self.depth_index is not None:
+            if not self.depth_index.count(depth_min, depth_max):
+                raise ValueError(
+                    f"No images found within the depth range: {depth_min} - {depth_max}")
+            with metrics.timer('range_query'):
+                return self.depth_index.pixels_range(depth_min, depth_max)
+        with metrics.timer('range_query'):
+            rows = db.query(ImageModel.depth, ImageModel.pixels).filter(
+                ImageModel.dataset == self.dataset,
+                ImageModel.depth.between(depth_min, depth_max)).order_by(ImageModel.depth).all()
+        if not rows:
+            raise ValueError(
+                f"No images found within the depth range: {depth_min} - {depth_max}")
+        if any(pixels is None for _, pixels in rows):
+            return None
+        depths = np.fromiter((depth for depth, _ in rows), dtype=np.float64, count=len(rows))
+        frame = np.frombuffer(b''.join(pixels for _, pixels in rows), dtype=np.uint8)
+        return depths, frame.reshape((len(rows), -1))
+
+    def get_source_pixels_by_depth_range(self, db: Session, depth_min: float,
+                                         depth_max: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve the original-resolution grayscale rows within a depth range as one array.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted depths and a uint8 array of shape
+            (depths, columns). Both are empty if no rows are in the range.
+        """
+        with metrics.timer('range_query'):
+            rows = db.query(ImageModel.depth, ImageModel.source_pixels).filter(
+                ImageModel.dataset == self.dataset,
+                ImageModel.depth.between(depth_min, depth_max)).order_by(ImageModel.depth).all()
+        if any(pixels is None for _, pixels in rows):
+            raise ValueError(
+                f"No original-resolution rows stored within the depth range: {depth_min} - {depth_max}")
+        depths = np.fromiter((depth for depth, _ in rows), dtype=np.float64, count=len(rows))
+        frame = np.frombuffer(b''.join(pixels for _, pixels in rows), dtype=np.uint8)
+        return depths, frame.reshape((len(rows), -1))
+
+    def get_source_pixels_by_bins(self, db: Session, first_bin: int, stop_bin: int,
+                                  depth_step: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve the original-resolution rows whose ``depth_bins`` fall in a range of bins.
+
+        ``bin * depth_step`` is not exactly where ``depth_bins`` starts a bin,
+        so rows are read one step beyond either edge and kept by their bin
+        number. A row on an edge then lands in the same bin as everywhere else.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            first_bin (int): The first bin to include.
+            stop_bin (int): The first bin past the range.
+            depth_step (float): The bin size.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted depths and a uint8 array of shape
+            (depths, columns).
+        """
+        depths, frame = self.get_source_pixels_by_depth_range(
+            db, (first_bin - 1) * depth_step, (stop_bin + 1) * depth_step)
+        bins = depth_bins(depths, depth_step)
+        keep = (bins >= first_bin) & (bins < stop_bin)
+        return depths[keep], frame[keep]
+
+    def resample_frame(self, depths: np.ndarray, frame: np.ndarray, width: Optional[int] = None,
+                       depth_step: Optional[float] = None,
+                       pooling: str = PoolingMethod.mean.value) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pool rows along depth and resize them across, for the whole frame in one call each.
+
+        Args:
+            depths (np.ndarray): The sorted depth of every row.
+            frame (np.ndarray): A uint8 array of shape (depths, columns).
+            width (int, optional): Resize every row to this many pixels. Defaults to keeping the width.
+            depth_step (float, optional): Pool rows into bins of this much depth. Defaults to no pooling.
+            pooling (str, optional): 'mean' or 'max'. Defaults to 'mean'.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The bin number of every output row (the row
+            number without ``depth_step``) and the resampled uint8 frame.
+        """
+        if depth_step is None:
+            bins = np.arange(len(frame), dtype=np.int64)
+        else:
+            with metrics.timer('downsample', len(frame)):
+                bins, frame = pool_rows(frame, depth_bins(depths, depth_step), pooling)
+        if width is not None and len(frame):
+            with metrics.timer('resize', len(frame)):
+                frame = self.create_resized_frame(frame, width)
+        return bins, frame
+
+    def get_pyramid_tile(self, db: Session, tile: int, width: Optional[int], depth_step: float,
+                         pooling: str = PoolingMethod.mean.value) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve one tile of a resampled pyramid level, from the range cache when possible.
+
+        A level is one (``width``, ``depth_step``, ``pooling``) resolution, and
+        tile ``t`` holds its bins ``t * PYRAMID_TILE_ROWS`` up to the next tile.
+        Bins are aligned to multiples of ``depth_step``, so neighbouring and
+        overlapping requests at the same resolution share tiles.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            tile (int): The tile number.
+            width (int, optional): The width of the level's rows. Defaults to the original width.
+            depth_step (float): The level's bin size.
+            pooling (str, optional): 'mean' or 'max'. Defaults to 'mean'.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The bin numbers holding rows and the pooled rows.
+        """
+        key = (self.dataset, 'pyramid', width, float(depth_step), pooling, tile)
+        generation = self.cache_generation()
+        if self.range_cache is not None:
+            cached = self.range_cache.get(key)
+            if cached is not None:
+                return cached
+        first_bin = tile * self.PYRAMID_TILE_ROWS
+        depths, frame = self.get_source_pixels_by_bins(
+            db, first_bin, first_bin + self.PYRAMID_TILE_ROWS, depth_step)
+        level = self.resample_frame(depths, frame, width, depth_step, pooling)
+        if self.range_cache is not None:
+            self.range_cache.put(key, level, level[0].nbytes + level[1].nbytes, generation)
+        return level
+
+    def get_resampled_frame(self, db: Session, depth_min: float, depth_max: float, width: Optional[int] = None,
+                            depth_step: Optional[float] = None,
+                            pooling: str = PoolingMethod.mean.value) -> np.ndarray:
+        """
+        Resample the original-resolution rows within a depth range.
+
+        With a ``depth_step``, every bin of the aligned grid that overlaps the
+        range is pooled whole and empty bins are left out. The pooled rows are
+        assembled from cached pyramid tiles, so zoomed-out views of long
+        intervals only read the database once per tile.
+
+        Args:
+            db (Session): The database session to use for querying images.
+            depth_min (float): The minimum depth value.
+            depth_max (float): The maximum depth value.
+            width (int, optional): Resize every row to this many pixels. Defaults to the original width.
+            depth_step (float, optional): Pool rows into bins of this much depth. Defaults to no pooling.
+            pooling (str, optional): 'mean' or 'max'. Defaults to 'mean'.
+
+        Returns:
+            np.ndarray: A uint8 array of shape (rows, width).
+        """
+        if depth_step is None:
+            depths, frame = self.get_source_pixels_by_depth_range(db, depth_min, depth_max)
+            frame = self.resample_frame(depths, frame, width)[1]
+        else:
+            first_bin, last_bin = depth_bins(np.array([depth_min, depth_max]), depth_step)
+            first_tile = first_bin // self.PYRAMID_TILE_ROWS
+            last_tile = last_bin // self.PYRAMID_TILE_ROWS
+            if last_tile - first_tile + 1 > self.MAX_PYRAMID_TILES:
+                depths, frame = self.get_source_pixels_by_bins(db, first_bin, last_bin + 1, depth_step)
+                bins, frame = self.resample_frame(depths, frame, width, depth_step, pooling)
+            else:
+                tiles = [self.get_pyramid_tile(db, tile, width, depth_step, pooling)
+                         for tile in range(first_tile, last_tile + 1)]
+                bins = np.concatenate([tile_bins for tile_bins, _ in tiles])
+                frame = np.concatenate([tile_frame for _, tile_frame in tiles])
+            frame = frame[(bins >= first_bin) & (bins <= last_bin)]
+        if not len(frame):
+            raise ValueError(
+                f"No images found within the depth range: {depth_min} - {depth_max}")
+        return frame
+
     def save_image_to_file(self, image: PILImage.Image, depth: float) -> str:
         """
         Save an image to a file on disk.
@@ -208,6 +1458,8 @@ class ImageProcessor:
         Args:
             image (PILImage.Image): The image to be plotted.
         """
+        import matplotlib.pyplot as plt
+
         image_array = np.array(image)
         plt.imshow(image_array, cmap='viridis')
         plt.colorbar()
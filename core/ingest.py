@@ -0,0 +1,329 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from core.image_processor import ColumnStatistics, ImageProcessor
+from core.metrics import metrics
+from models import IngestState
+
+
+class IngestProgress:
+    """Thread-safe progress of an ingest, for readiness and status reporting."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.state = 'pending'
+        self.rows_done = 0
+        self.bytes_done = 0
+        self.total_bytes = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.state == 'running'
+
+    def start(self, total_bytes: int = 0) -> None:
+        """
+        Mark the ingest as running. Calling it again while running only updates the size.
+
+        Args:
+            total_bytes (int, optional): Size of the input file. Defaults to 0 when unknown.
+        """
+        with self._lock:
+            if self.state != 'running':
+                self.state = 'running'
+                self.rows_done = self.bytes_done = 0
+                self.started_at = time.monotonic()
+                self.finished_at = None
+                self.error = None
+            self.total_bytes = total_bytes or self.total_bytes
+
+    def advance(self, rows: int, nbytes: int) -> None:
+        """
+        Record rows that are committed or already up to date.
+
+        Args:
+            rows (int): Number of rows.
+            nbytes (int): Number of CSV bytes those rows span.
+        """
+        with self._lock:
+            self.rows_done += rows
+            self.bytes_done += nbytes
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """
+        Mark the ingest as completed, or as failed if an error is given.
+
+        Args:
+            error (str, optional): The error message of a failed ingest.
+        """
+        with self._lock:
+            self.state = 'failed' if error else 'completed'
+            self.error = error
+            self.finished_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Report progress, with the total row count and ETA estimated from bytes read.
+
+        Returns:
+            Dict[str, Any]: State, rows done, estimated total rows, rows/sec and ETA in seconds.
+        """
+        with self._lock:
+            if self.started_at is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            rows_per_sec = self.rows_done / elapsed if elapsed else 0.0
+            rows_total = eta = None
+            if self.state == 'completed':
+                rows_total, eta = self.rows_done, 0.0
+            elif self.bytes_done and self.total_bytes:
+                rows_total = round(self.rows_done * self.total_bytes / self.bytes_done)
+                bytes_per_sec = self.bytes_done / elapsed if elapsed else 0.0
+                if bytes_per_sec:
+                    eta = max(self.total_bytes - self.bytes_done, 0) / bytes_per_sec
+            return {
+                'state': self.state,
+                'rows_done': self.rows_done,
+                'rows_total': rows_total,
+                'rows_per_sec': round(rows_per_sec, 1),
+                'elapsed_seconds': round(elapsed, 3),
+                'eta_seconds': None if eta is None else round(eta, 3),
+                'error': self.error,
+            }
+
+
+class IngestManager:
+    # Seconds between aggregated progress log lines.
+    PROGRESS_LOG_SECONDS = 10
+
+    def __init__(self, image_processor: ImageProcessor, chunk_size: int = 10000,
+                 batch_size: int = 1000, workers: int = 1) -> None:
+        """
+        Initialize the IngestManager.
+
+        Args:
+            image_processor (ImageProcessor): The processor for the CSV file to ingest.
+            chunk_size (int, optional): Number of CSV rows per fingerprinted chunk. Defaults to 10000.
+            batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+            workers (int, optional): Number of rendering processes. Defaults to 1.
+        """
+        self.image_processor = image_processor
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.progress = IngestProgress()
+        # Byte offset just past the last complete line the latest ingest read,
+        # where a tail of the growing file picks up.
+        self.offset: Optional[int] = None
+        self._running = threading.Lock()
+        self.logger = logging.getLogger('IngestManager')
+
+    def run(self, db: Session) -> None:
+        """
+        Ingest the CSV file, skipping work that is already in the database.
+
+        The file size and mtime are checked first, so an unchanged file that was
+        fully ingested costs one query. Otherwise every chunk is hashed and only
+        chunks whose hash differs from the last committed one are processed. A
+        chunk's hash is committed together with its images, so an interrupted
+        ingest resumes after its last committed chunk. If the whole-file fill
+        values used for missing data change, every chunk is processed again.
+
+        Only one ingest runs per dataset at a time; a call made while another
+        is in progress returns without doing anything. Progress is reported
+        through ``self.progress``.
+
+        Args:
+            db (Session): The database session to use for saving images.
+        """
+        if not self._running.acquire(blocking=False):
+            self.logger.info(
+                f"An ingest of dataset {self.image_processor.dataset} is already running, skipping.")
+            return
+        try:
+            self.progress.start()
+            try:
+                self._run(db)
+            except Exception as e:
+                db.rollback()
+                self.logger.error(f"Error ingesting images: {e}")
+                self.progress.finish(str(e))
+            else:
+                self.progress.finish()
+        finally:
+            self._running.release()
+
+    def _run(self, db: Session) -> None:
+        processor = self.image_processor
+        source = processor.csv_file_path
+        file_stat = os.stat(source)
+        self.progress.start(file_stat.st_size)
+        state = db.get(IngestState, processor.dataset)
+        if state is not None and state.source != source:
+            self.logger.info(
+                f"Dataset {processor.dataset} now reads {source} instead of {state.source}.")
+            state.source, state.content_hash = source, None
+        same_file = state is not None and state.chunk_size == self.chunk_size \
+            and state.file_size == file_stat.st_size \
+            and state.file_mtime == file_stat.st_mtime
+
+        if same_file and state.content_hash:
+            self.logger.info(f"{source} is unchanged since the last ingest, skipping.")
+            self.offset = processor.complete_lines_end()
+            return
+
+        if state is None or state.chunk_size != self.chunk_size:
+            state = db.merge(IngestState(
+                dataset=processor.dataset, source=source,
+                chunk_size=self.chunk_size, chunk_hashes='[]'))
+        chunk_hashes = json.loads(state.chunk_hashes or '[]')
+
+        if same_file and state.statistics:
+            statistics = self.decode_statistics(state.statistics)
+        else:
+            statistics = processor.compute_column_statistics(self.chunk_size)
+            if state.statistics and self.fill_values_changed(
+                    self.decode_statistics(state.statistics), statistics):
+                self.logger.info(
+                    "Fill values for missing data changed, reprocessing every chunk.")
+                chunk_hashes = []
+
+        state.file_size = file_stat.st_size
+        state.file_mtime = file_stat.st_mtime
+        state.statistics = self.encode_statistics(statistics)
+        state.chunk_hashes = json.dumps(chunk_hashes)
+        state.content_hash = None
+        db.commit()
+
+        header = processor.read_csv_header()
+        offset = len(header)
+        render_chunk_size = max(1, self.chunk_size // max(self.workers, 1))
+        processed = skipped = chunk_count = 0
+        last_log = time.monotonic()
+        with processor.create_executor(self.workers) as executor:
+            # A last line without its line ending is still being written, so it
+            # is left for the next ingest or a tail to read once it is complete.
+            chunks = processor.iter_csv_chunks(self.chunk_size, complete_lines_only=True)
+            for index, (chunk_hash, raw) in enumerate(chunks):
+                chunk_count = index + 1
+                offset += len(raw)
+                if index < len(chunk_hashes) and chunk_hashes[index] == chunk_hash:
+                    skipped += 1
+                    self.progress.advance(raw.count(b'\n'), len(raw))
+                    continue
+
+                chunk = processor.parse_csv_chunk(header, raw)
+                with metrics.timer('preprocess', len(chunk)):
+                    chunk = processor.preprocess_chunk(chunk, statistics)
+                if index < len(chunk_hashes):
+                    chunk_hashes[index] = chunk_hash
+                else:
+                    chunk_hashes.append(chunk_hash)
+                # save_images_to_db commits the session, so the chunk's hash is
+                # recorded in the same transaction as its images.
+                state.chunk_hashes = json.dumps(chunk_hashes)
+                processor.save_images_to_db(db, processor.iter_frame_images(
+                    chunk, render_chunk_size, executor=executor,
+                    max_in_flight=2 * self.workers, include_pixels=True), self.batch_size)
+                processed += 1
+                self.progress.advance(len(chunk), len(raw))
+                if time.monotonic() - last_log >= self.PROGRESS_LOG_SECONDS:
+                    last_log = time.monotonic()
+                    self.log_progress()
+
+        if offset < file_stat.st_size:
+            self.logger.info(
+                f"The last line of {source} is incomplete, leaving it until it ends with a line break.")
+        self.offset = offset
+        chunk_hashes = chunk_hashes[:chunk_count]
+        state.chunk_hashes = json.dumps(chunk_hashes)
+        state.content_hash = hashlib.sha256(
+            ''.join(chunk_hashes).encode()).hexdigest()
+        db.commit()
+        self.logger.info(
+            f"Ingested {source}: {processed} chunks processed, {skipped} unchanged.")
+
+    def run_full(self, db: Session, streaming: bool = False) -> None:
+        """
+        Ingest the whole CSV file with the batched or streaming mode, without skipping unchanged chunks.
+
+        Progress is reported through ``self.progress`` as rows are written,
+        and the offset read up to is kept for a tail of the file.
+
+        Args:
+            db (Session): The database session to use for saving images.
+            streaming (bool, optional): Read the file chunk by chunk instead of in one go. Defaults to False.
+        """
+        processor = self.image_processor
+        self.progress.start(os.path.getsize(processor.csv_file_path))
+        ingest = processor.process_images_streaming if streaming else processor.process_images_batched
+        self.offset = ingest(db, self.chunk_size, self.batch_size, self.workers, progress=self.progress)
+
+    def log_progress(self) -> None:
+        """Log rows ingested so far, throughput and ETA in one line."""
+        progress = self.progress.snapshot()
+        eta = progress['eta_seconds']
+        self.logger.info(
+            f"Ingested {progress['rows_done']} of ~{progress['rows_total'] or '?'} rows "
+            f"({progress['rows_per_sec']} rows/s, ETA {'?' if eta is None else f'{eta:.0f}s'})")
+
+    def encode_statistics(self, statistics: Dict[str, ColumnStatistics]) -> str:
+        """
+        Serialize column statistics for the ingest state table.
+
+        Args:
+            statistics (Dict[str, ColumnStatistics]): Statistics for every column.
+
+        Returns:
+            str: A JSON document that round-trips the means exactly.
+        """
+        return json.dumps({column: [value.numeric, value.null_count, float(value.mean)]
+                           for column, value in statistics.items()})
+
+    def decode_statistics(self, encoded: str) -> Dict[str, ColumnStatistics]:
+        """
+        Deserialize column statistics stored by ``encode_statistics``.
+
+        Args:
+            encoded (str): The stored JSON document.
+
+        Returns:
+            Dict[str, ColumnStatistics]: Statistics for every column, in file order.
+        """
+        return {column: ColumnStatistics(numeric, null_count, np.float64(mean))
+                for column, (numeric, null_count, mean) in json.loads(encoded).items()}
+
+    def fill_values_changed(self, previous: Dict[str, ColumnStatistics],
+                            current: Dict[str, ColumnStatistics]) -> bool:
+        """
+        Check whether unchanged chunks would preprocess differently under new statistics.
+
+        Args:
+            previous (Dict[str, ColumnStatistics]): Statistics of the last ingest.
+            current (Dict[str, ColumnStatistics]): Statistics of the file on disk.
+
+        Returns:
+            bool: True if any column's type or fill value differs.
+        """
+        if list(previous) != list(current):
+            return True
+        for column, statistics in current.items():
+            old = previous[column]
+            if statistics.numeric != old.numeric:
+                return True
+            if (statistics.null_count or old.null_count) and not (
+                    statistics.mean == old.mean
+                    or (np.isnan(statistics.mean) and np.isnan(old.mean))):
+                return True
+        return False
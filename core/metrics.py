@@ -0,0 +1,234 @@
+"""
+In-process counters and histograms, rendered in the Prometheus text format.
+
+Stages are timed with ``metrics.timer('stage')``. The registry is per process,
+so work rendered in ingest worker processes is recorded with ``recording()``
+and replayed into the parent's registry with ``observe_stages``.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+NAMESPACE = 'image_frames'
+
+# Latency buckets in seconds, from sub-millisecond lookups to whole-file reads.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = 'stage_duration_seconds'
+REQUEST_SECONDS = 'http_request_duration_seconds'
+
+DESCRIPTIONS = {
+    STAGE_SECONDS: 'Time spent in each processing stage.',
+    REQUEST_SECONDS: 'HTTP request latency by route.',
+    'stage_items_total': 'Rows or images handled by each processing stage.',
+    'http_requests_total': 'HTTP requests by route and status code.',
+    'tail_rows_total': 'Rows ingested from lines appended to a followed CSV file.',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of counters and histograms."""
+
+    def __init__(self, namespace: str = NAMESPACE) -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name (str): The metric name, without the namespace.
+            value (float, optional): The amount to add. Defaults to 1.
+            **labels (str): Label values identifying the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record one observation in a histogram.
+
+        Args:
+            name (str): The metric name, without the namespace.
+            value (float): The observed value, in seconds for latencies.
+            **labels (str): Label values identifying the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def observe_stages(self, observations: Iterable[Tuple[str, float, int]]) -> None:
+        """
+        Record stage timings measured elsewhere, such as in a worker process.
+
+        Args:
+            observations (Iterable[Tuple[str, float, int]]): Stage name, seconds and item count.
+        """
+        for stage, seconds, items in observations:
+            self.observe(STAGE_SECONDS, seconds, stage=stage)
+            if items:
+                self.increment('stage_items_total', items, stage=stage)
+
+    @contextmanager
+    def timer(self, stage: str, items: int = 0) -> Iterator[None]:
+        """
+        Time a block as one observation of a processing stage.
+
+        Args:
+            stage (str): The stage name.
+            items (int, optional): Rows or images the block handles. Defaults to 0.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            observation = (stage, time.perf_counter() - start, items)
+            recorded = getattr(self._local, 'recorded', None)
+            if recorded is not None:
+                recorded.append(observation)
+            else:
+                self.observe_stages([observation])
+
+    def timed_iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Time how long each item of an iterable takes to produce.
+
+        Args:
+            stage (str): The stage name.
+            iterable (Iterable[T]): The iterable to time, such as a chunked CSV reader.
+
+        Yields:
+            T: The items of ``iterable``.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.timer(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    @contextmanager
+    def recording(self) -> Iterator[List[Tuple[str, float, int]]]:
+        """
+        Collect stage timings on this thread into a list instead of the registry.
+
+        Yields:
+            List[Tuple[str, float, int]]: The observations, for ``observe_stages``.
+        """
+        recorded: List[Tuple[str, float, int]] = []
+        previous = getattr(self._local, 'recorded', None)
+        self._local.recorded = recorded
+        try:
+            yield recorded
+        finally:
+            self._local.recorded = previous
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every stage.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Observation count and total seconds per stage.
+        """
+        with self._lock:
+            return {dict(key)['stage']: {'count': histogram.count, 'seconds': histogram.sum}
+                    for key, histogram in self._histograms.get(STAGE_SECONDS, {}).items()}
+
+    def reset(self) -> None:
+        """Drop every recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self, gauges: Optional[Dict[str, Union[float, Dict[Labels, float]]]] = None) -> str:
+        """
+        Render every series in the Prometheus text exposition format.
+
+        Args:
+            gauges (Dict[str, Union[float, Dict[Labels, float]]], optional): Point-in-time
+                values to include, by name, either unlabelled or by label set.
+
+        Returns:
+            str: The exposition document.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = self._header(lines, name, 'counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full_name}{format_labels(key)} {format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full_name = self._header(lines, name, 'histogram')
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{full_name}_bucket"
+                                     f"{format_labels(key + (('le', format_value(bound)),))} {cumulative}")
+                    lines.append(f"{full_name}_bucket{format_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{full_name}_sum{format_labels(key)} {format_value(histogram.sum)}")
+                    lines.append(f"{full_name}_count{format_labels(key)} {histogram.count}")
+        for name, value in sorted((gauges or {}).items()):
+            full_name = self._header(lines, name, 'gauge')
+            series = value if isinstance(value, dict) else {(): value}
+            for key, series_value in sorted(series.items()):
+                lines.append(f"{full_name}{format_labels(key)} {format_value(series_value)}")
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, lines: List[str], name: str, kind: str) -> str:
+        full_name = f"{self.namespace}_{name}"
+        if name in DESCRIPTIONS:
+            lines.append(f"# HELP {full_name} {DESCRIPTIONS[name]}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+
+def format_labels(key: Labels) -> str:
+    if not key:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+metrics = Metrics()
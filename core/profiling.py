@@ -0,0 +1,294 @@
+"""
+On-demand profiling for ingest and serving, written to files that can be read offline.
+
+``IngestProfile`` wraps an ingest in cProfile and tracemalloc and writes a
+``.pstats`` file (open with ``python -m pstats`` or snakeviz) next to a text
+report of the hottest functions and allocation sites in ``core/``.
+
+``SamplingProfiler`` samples the stacks of every thread at a fixed interval
+and writes them as collapsed stacks, one ``frame;frame;frame count`` line per
+distinct stack, the input format of flamegraph.pl and speedscope. Sampling
+installs no hooks in the profiled threads, so it is safe around live requests.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from enum import Enum
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+# Functions that only mean a thread is waiting for work; stacks ending in
+# them are left out of samples unless idle threads are asked for.
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+    ('base_events.py', '_run_once'),
+}
+
+# Functions and allocation sites under this directory are the processing stages.
+STAGE_PATH = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class ProfileFormat(str, Enum):
+    """Renderings of a sampled profile."""
+    collapsed = 'collapsed'
+    top = 'top'
+
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def profile_path(directory: str, label: str, suffix: str) -> str:
+    """
+    Build a unique, timestamped path for a profile file, creating the directory.
+
+    Args:
+        directory (str): The directory profiles are written to.
+        label (str): What was profiled, such as a dataset or route.
+        suffix (str): The file extension, including the dot.
+
+    Returns:
+        str: The path to write to.
+    """
+    os.makedirs(directory, exist_ok=True)
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label).strip('_') or 'profile'
+    return os.path.join(directory, f"{safe_label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                                   f"-{threading.get_ident() % 100000}{suffix}")
+
+
+def start_tracemalloc(frames: int) -> None:
+    """Start tracing allocations, shared by every profile that asks for it."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        _tracemalloc_users += 1
+
+
+def stop_tracemalloc() -> Tuple[Optional[tracemalloc.Snapshot], int]:
+    """
+    Take an allocation snapshot and stop tracing once no profile needs it.
+
+    Returns:
+        Tuple[Optional[tracemalloc.Snapshot], int]: The snapshot, or None if tracing was
+        stopped elsewhere, and the peak traced size in bytes.
+    """
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracemalloc_users = max(_tracemalloc_users - 1, 0)
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return snapshot, peak
+
+
+class IngestProfile:
+    """
+    Context manager that profiles the calling thread with cProfile and all allocations with tracemalloc.
+
+    cProfile only sees the thread that enters the context, so work rendered
+    by ingest workers shows up as time spent waiting on their futures.
+    """
+
+    def __init__(self, directory: str, label: str, top: int = 30, trace_frames: int = 10) -> None:
+        """
+        Initialize the IngestProfile.
+
+        Args:
+            directory (str): The directory to write the ``.pstats`` file and report to.
+            label (str): What is profiled, used in the file names.
+            top (int, optional): Entries listed per section of the report. Defaults to 30.
+            trace_frames (int, optional): Frames kept per allocation traceback. Defaults to 10.
+        """
+        self.directory = directory
+        self.label = label
+        self.top = top
+        self.trace_frames = trace_frames
+        self.profiler = cProfile.Profile()
+        self.stats_path: Optional[str] = None
+        self.report_path: Optional[str] = None
+        self.logger = logging.getLogger('IngestProfile')
+
+    def __enter__(self) -> 'IngestProfile':
+        start_tracemalloc(self.trace_frames)
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.disable()
+        snapshot, peak = stop_tracemalloc()
+        self.stats_path = profile_path(self.directory, self.label, '.pstats')
+        self.profiler.dump_stats(self.stats_path)
+        self.report_path = self.stats_path[:-len('.pstats')] + '.txt'
+        with open(self.report_path, 'w') as report:
+            report.write(self.report(snapshot, peak))
+        self.logger.info(f"Wrote the profile of {self.label} to {self.stats_path} and {self.report_path}.")
+
+    def report(self, snapshot: Optional[tracemalloc.Snapshot], peak: int = 0) -> str:
+        """
+        Summarize the hottest functions and largest allocation sites.
+
+        Args:
+            snapshot (tracemalloc.Snapshot, optional): The allocations still held at the end.
+            peak (int, optional): The peak traced size in bytes. Defaults to 0.
+
+        Returns:
+            str: The report text.
+        """
+        out = io.StringIO()
+        out.write(f"Peak traced memory: {peak / 1e6:.1f} MB\n\n")
+        stats = pstats.Stats(self.profiler, stream=out).strip_dirs().sort_stats('cumulative')
+        out.write(f"Top {self.top} functions by cumulative time:\n")
+        stats.print_stats(self.top)
+        out.write(f"Top {self.top} processing stage functions by own time:\n")
+        pstats.Stats(self.profiler, stream=out).sort_stats('tottime').print_stats(
+            re.escape(STAGE_PATH), self.top)
+        if snapshot is not None:
+            out.write(f"Top {self.top} allocation sites by size still held:\n")
+            for statistic in snapshot.statistics('lineno')[:self.top]:
+                out.write(f"{statistic}\n")
+            out.write(f"\nTop {self.top} processing stage allocation sites:\n")
+            stage = snapshot.filter_traces([tracemalloc.Filter(True, f'*{STAGE_PATH}*')])
+            for statistic in stage.statistics('traceback')[:self.top]:
+                out.write(f"{statistic}\n")
+                out.writelines(f"    {line}\n" for line in statistic.traceback.format())
+        return out.getvalue()
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of running threads from a background thread.
+
+    Use it as a context manager around the code to profile, then call
+    ``collapsed`` or ``dump`` for a flame-graph-ready profile.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False,
+                 thread_ids: Optional[List[int]] = None) -> None:
+        """
+        Initialize the SamplingProfiler.
+
+        Args:
+            interval (float, optional): Seconds between samples. Defaults to 0.005.
+            include_idle (bool, optional): Keep stacks of threads waiting for work. Defaults to False.
+            thread_ids (List[int], optional): Only sample these threads. Defaults to every thread.
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+        self.thread_ids = thread_ids
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start sampling on a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own)
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        """
+        Record the current stack of every sampled thread once.
+
+        Args:
+            skip (int, optional): A thread id to leave out, such as the sampler's own.
+        """
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            stack = self._stack(frame)
+            if stack is not None:
+                self.stacks[stack] += 1
+        self.samples += 1
+
+    def _stack(self, frame: FrameType) -> Optional[str]:
+        code = frame.f_code
+        if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def collapsed(self) -> str:
+        """
+        Render the samples as collapsed stacks, most frequent first.
+
+        Returns:
+            str: One ``outermost;...;innermost count`` line per distinct stack.
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 30) -> str:
+        """
+        Summarize the functions most often on top of a sampled stack.
+
+        Args:
+            limit (int, optional): Functions to list. Defaults to 30.
+
+        Returns:
+            str: One ``percent samples function`` line per function.
+        """
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return ''.join(f"{count / total:6.1%} {count:6d} {label}\n"
+                       for label, count in leaves.most_common(limit))
+
+    def dump(self, directory: str, label: str) -> str:
+        """
+        Write the collapsed stacks to a file.
+
+        Args:
+            directory (str): The directory to write to.
+            label (str): What was profiled, used in the file name.
+
+        Returns:
+            str: The path written.
+        """
+        path = profile_path(directory, label, '.collapsed')
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+        return path
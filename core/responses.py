@@ -0,0 +1,248 @@
+import asyncio
+import base64
+import hashlib
+import json
+from enum import Enum
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from core.events import FrameEvent, FrameEvents
+from core.metrics import metrics
+
+PNG_MEDIA_TYPE = 'image/png'
+MULTIPART_BOUNDARY = 'image-frame-boundary'
+EVENT_STREAM_MEDIA_TYPE = 'text/event-stream'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+class StreamFormat(str, Enum):
+    """Encodings of a streamed depth range."""
+    ndjson = 'ndjson'
+    multipart = 'multipart'
+
+
+def compute_etag(*chunks: bytes) -> str:
+    """
+    Compute a strong ETag for one or more byte strings.
+
+    Args:
+        *chunks (bytes): The response content, in order.
+
+    Returns:
+        str: A quoted entity tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk)
+    return f'"{digest.hexdigest()}"'
+
+
+def not_modified(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Check a request's If-None-Match header against an ETag.
+
+    Args:
+        etag (str): The current entity tag.
+        if_none_match (str, optional): The If-None-Match header value.
+
+    Returns:
+        bool: True if the client already has this representation.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def png_response(image: bytes, if_none_match: Optional[str] = None) -> Response:
+    """
+    Build a response that sends stored PNG bytes as they are.
+
+    Args:
+        image (bytes): The binary image data.
+        if_none_match (str, optional): The request's If-None-Match header.
+
+    Returns:
+        Response: A 200 image/png response, or 304 if the client's copy is current.
+    """
+    with metrics.timer('serialize', 1):
+        etag = compute_etag(image)
+    if not_modified(etag, if_none_match):
+        return Response(status_code=304, headers={'ETag': etag})
+    return Response(content=image, media_type=PNG_MEDIA_TYPE, headers={'ETag': etag})
+
+
+def multipart_png_response(images: Sequence[Tuple[float, bytes]], if_none_match: Optional[str] = None,
+                           url_prefix: str = '') -> Response:
+    """
+    Build a multipart/mixed response with one image/png part per depth.
+
+    Each part carries its own ETag and a Content-Location pointing at the
+    single-image route, and the whole body gets an ETag derived from them.
+
+    Args:
+        images (Sequence[Tuple[float, bytes]]): Pairs of depth and binary image data.
+        if_none_match (str, optional): The request's If-None-Match header.
+        url_prefix (str, optional): Path prepended to each part's Content-Location,
+            such as ``/datasets/well-2``. Defaults to the plain routes.
+
+    Returns:
+        Response: A 200 multipart/mixed response, or 304 if the client's copy is current.
+    """
+    with metrics.timer('serialize', len(images)):
+        parts = []
+        part_etags = []
+        for depth, image in images:
+            part_etag = compute_etag(image)
+            part_etags.append(f"{depth}:{part_etag}".encode())
+            parts.extend(multipart_png_part(depth, image, part_etag, url_prefix))
+        parts.append(f"--{MULTIPART_BOUNDARY}--\r\n".encode())
+
+        etag = compute_etag(*part_etags)
+    if not_modified(etag, if_none_match):
+        return Response(status_code=304, headers={'ETag': etag})
+    return Response(
+        content=b''.join(parts),
+        media_type=f'multipart/mixed; boundary={MULTIPART_BOUNDARY}',
+        headers={'ETag': etag})
+
+
+def multipart_png_part(depth: float, image: bytes, etag: str, url_prefix: str = '') -> Tuple[bytes, bytes, bytes]:
+    """
+    Build one image/png part of a multipart/mixed body.
+
+    Args:
+        depth (float): The depth of the image.
+        image (bytes): The binary image data.
+        etag (str): The image's entity tag.
+        url_prefix (str, optional): Path prepended to the Content-Location. Defaults to ''.
+
+    Returns:
+        Tuple[bytes, bytes, bytes]: The part headers, the image and the trailing line break.
+    """
+    headers = (
+        f"--{MULTIPART_BOUNDARY}\r\n"
+        f"Content-Type: {PNG_MEDIA_TYPE}\r\n"
+        f"Content-Location: {url_prefix}/images/{depth}.png\r\n"
+        f"ETag: {etag}\r\n"
+        f"Content-Length: {len(image)}\r\n\r\n").encode()
+    return headers, image, b"\r\n"
+
+
+def iter_multipart_png(pages: Iterable[List[Tuple[float, bytes]]], url_prefix: str = '') -> Iterator[bytes]:
+    """
+    Encode pages of images as a multipart/mixed body, one chunk per page.
+
+    Args:
+        pages (Iterable[List[Tuple[float, bytes]]]): Pages of depth and binary image data.
+        url_prefix (str, optional): Path prepended to each part's Content-Location. Defaults to ''.
+
+    Yields:
+        bytes: The body, page by page, ending with the closing boundary.
+    """
+    for page in pages:
+        with metrics.timer('serialize', len(page)):
+            chunk = b''.join(part for depth, image in page
+                             for part in multipart_png_part(depth, image, compute_etag(image), url_prefix))
+        yield chunk
+    yield f"--{MULTIPART_BOUNDARY}--\r\n".encode()
+
+
+def iter_ndjson(pages: Iterable[List[Tuple[float, bytes]]], url_prefix: str = '') -> Iterator[bytes]:
+    """
+    Encode pages of images as newline-delimited JSON, one chunk per page.
+
+    Each line holds a depth, the URL of its PNG and the PNG itself as base64.
+
+    Args:
+        pages (Iterable[List[Tuple[float, bytes]]]): Pages of depth and binary image data.
+        url_prefix (str, optional): Path prepended to each URL. Defaults to ''.
+
+    Yields:
+        bytes: The body, page by page.
+    """
+    for page in pages:
+        with metrics.timer('serialize', len(page)):
+            chunk = ''.join(json.dumps({
+                'depth': depth,
+                'url': f'{url_prefix}/images/{depth}.png',
+                'image': base64.b64encode(image).decode(),
+            }) + '\n' for depth, image in page).encode()
+        yield chunk
+
+
+def streaming_images_response(pages: Iterable[List[Tuple[float, bytes]]],
+                              stream_format: StreamFormat = StreamFormat.ndjson,
+                              url_prefix: str = '') -> StreamingResponse:
+    """
+    Build a response that sends a depth range page by page as it is read.
+
+    Args:
+        pages (Iterable[List[Tuple[float, bytes]]]): Pages of depth and binary image data,
+            typically a lazy ``ImageProcessor.iter_image_pages``.
+        stream_format (StreamFormat, optional): The body encoding. Defaults to NDJSON.
+        url_prefix (str, optional): Path prepended to image links. Defaults to ''.
+
+    Returns:
+        StreamingResponse: A 200 response whose body is produced while it is sent.
+    """
+    if stream_format == StreamFormat.multipart:
+        return StreamingResponse(iter_multipart_png(pages, url_prefix),
+                                 media_type=f'multipart/mixed; boundary={MULTIPART_BOUNDARY}')
+    return StreamingResponse(iter_ndjson(pages, url_prefix), media_type=NDJSON_MEDIA_TYPE)
+
+
+def format_frame_event(event: FrameEvent, include_images: bool = False) -> str:
+    """
+    Format committed frames as one server-sent event.
+
+    Args:
+        event (FrameEvent): The committed frames.
+        include_images (bool, optional): Embed the PNG strips as base64. Defaults to False.
+
+    Returns:
+        str: An ``images`` event whose id is the deepest depth it carries.
+    """
+    data = {
+        'dataset': event.dataset,
+        'depth_min': min(event.depths),
+        'depth_max': max(event.depths),
+        'depths': event.depths,
+    }
+    if include_images:
+        data['images'] = [base64.b64encode(image).decode() for image in event.images]
+    return f"id: {data['depth_max']}\nevent: images\ndata: {json.dumps(data)}\n\n"
+
+
+async def frame_event_stream(request: Request, events: FrameEvents, include_images: bool = False,
+                             keepalive_seconds: float = 15.0) -> AsyncIterator[str]:
+    """
+    Stream frames as they are committed until the client disconnects.
+
+    Args:
+        request (Request): The request, polled for a disconnect between events.
+        events (FrameEvents): The dataset's broadcaster.
+        include_images (bool, optional): Embed the PNG strips as base64. Defaults to False.
+        keepalive_seconds (float, optional): Idle time before a comment line keeps the
+            connection open. Defaults to 15.
+
+    Yields:
+        str: Server-sent event messages.
+    """
+    queue = events.subscribe()
+    try:
+        # Sent right away so clients and proxies see the stream open.
+        yield ": subscribed\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            with metrics.timer('serialize', len(event.depths)):
+                message = format_frame_event(event, include_images)
+            yield message
+    finally:
+        events.unsubscribe(queue)
@@ -0,0 +1,176 @@
+import logging
+import os
+import threading
+from typing import Callable, ContextManager, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from core.image_processor import ColumnStatistics
+from core.ingest import IngestManager
+from core.metrics import metrics
+from models import IngestState
+
+
+class TailIngest:
+    """
+    Follows a growing CSV file and ingests lines as they are appended.
+
+    The byte offset consumed so far is kept in memory, starting where the
+    dataset's last full ingest stopped. Each poll reads only the complete
+    lines appended since, and processes and upserts them in micro-batches, so
+    every batch reaches the depth index, range cache and event subscribers as
+    soon as it commits.
+    """
+
+    def __init__(self, manager: IngestManager, poll_interval: float = 0.5,
+                 batch_rows: int = 256, batch_size: int = 1000) -> None:
+        """
+        Initialize the TailIngest.
+
+        Args:
+            manager (IngestManager): The dataset's ingest manager, whose processor and offset to use.
+            poll_interval (float, optional): Seconds between checks for new lines. Defaults to 0.5.
+            batch_rows (int, optional): Lines processed and committed together. Defaults to 256.
+            batch_size (int, optional): Number of rows per upsert statement. Defaults to 1000.
+        """
+        self.manager = manager
+        self.processor = manager.image_processor
+        self.poll_interval = poll_interval
+        self.batch_rows = batch_rows
+        self.batch_size = batch_size
+        self.offset: Optional[int] = None
+        self.header: Optional[bytes] = None
+        self.statistics: Optional[Dict[str, ColumnStatistics]] = None
+        self.rows_done = 0
+        self._stop = threading.Event()
+        self.logger = logging.getLogger('TailIngest')
+
+    def start_offset(self) -> int:
+        """
+        Find where to start following the file.
+
+        Returns:
+            int: The offset the last ingest stopped at, or the end of the last complete
+            line if the file was not ingested incrementally.
+        """
+        if self.manager.offset is not None:
+            return self.manager.offset
+        return self.processor.complete_lines_end()
+
+    def load_statistics(self, db: Session) -> Dict[str, ColumnStatistics]:
+        """
+        Load the fill values appended rows are preprocessed with.
+
+        Rows are filled with the whole-file means of the last ingest, so a
+        column that had no gaps then is still filled if an appended row has one.
+
+        Args:
+            db (Session): The database session to read the ingest state from.
+
+        Returns:
+            Dict[str, ColumnStatistics]: Statistics for every column.
+        """
+        state = db.get(IngestState, self.processor.dataset)
+        if state is not None and state.statistics:
+            statistics = self.manager.decode_statistics(state.statistics)
+        else:
+            statistics = self.processor.compute_column_statistics(self.manager.chunk_size)
+        return {column: value._replace(null_count=max(value.null_count, 1))
+                for column, value in statistics.items()}
+
+    def poll(self, db: Session) -> int:
+        """
+        Ingest the complete lines appended since the last poll.
+
+        Args:
+            db (Session): The database session to use for saving images.
+
+        Returns:
+            int: The number of rows ingested.
+        """
+        processor = self.processor
+        if self.header is None:
+            self.header = processor.read_csv_header()
+            self.offset = max(self.start_offset(), len(self.header))
+        if self.statistics is None:
+            self.statistics = self.load_statistics(db)
+
+        size = os.path.getsize(processor.csv_file_path)
+        if size < self.offset:
+            self.logger.warning(
+                f"{processor.csv_file_path} shrank to {size} bytes, following it from the start.")
+            self.header = processor.read_csv_header()
+            self.offset = len(self.header)
+        if size == self.offset:
+            return 0
+        with open(processor.csv_file_path, 'rb') as csv_file:
+            csv_file.seek(self.offset)
+            raw = csv_file.read(size - self.offset)
+        # A line without its newline is still being written.
+        raw = raw[:raw.rfind(b'\n') + 1]
+        lines = raw.splitlines(keepends=True)
+
+        rows = 0
+        for start in range(0, len(lines), self.batch_rows):
+            block = b''.join(lines[start:start + self.batch_rows])
+            try:
+                chunk = processor.parse_csv_chunk(self.header, block)
+                with metrics.timer('preprocess', len(chunk)):
+                    chunk = processor.preprocess_chunk(chunk, self.statistics)
+            except Exception as e:
+                # Reading the same lines again would fail the same way and
+                # hold back every line after them.
+                self.logger.error(
+                    f"Skipping {len(block)} bytes of {processor.csv_file_path} at offset "
+                    f"{self.offset} that could not be parsed: {e}")
+                metrics.increment('tail_skipped_blocks_total', dataset=processor.dataset)
+                self.offset += len(block)
+                continue
+            processor.save_images_to_db(db, processor.iter_frame_images(
+                chunk, self.batch_rows, include_pixels=True), self.batch_size)
+            self.offset += len(block)
+            rows += len(chunk)
+        if rows:
+            self.rows_done += rows
+            metrics.increment('tail_rows_total', rows, dataset=processor.dataset)
+            self.logger.debug(f"Ingested {rows} appended rows of dataset {processor.dataset}.")
+        return rows
+
+    def follow(self, session_factory: Callable[[], ContextManager[Session]]) -> None:
+        """
+        Poll the file until ``stop`` is called. Errors are logged and retried on the next poll.
+
+        Args:
+            session_factory (Callable[[], ContextManager[Session]]): Opens a database session per poll,
+                such as ``Database.get_db``.
+        """
+        self.logger.info(f"Following {self.processor.csv_file_path} for dataset {self.processor.dataset}.")
+        while not self._stop.is_set():
+            rows = 0
+            try:
+                with session_factory() as session:
+                    rows = self.poll(session)
+            except Exception as e:
+                self.logger.error(f"Error following {self.processor.csv_file_path}: {e}")
+            if not rows:
+                self._stop.wait(self.poll_interval)
+
+    def start(self, session_factory: Callable[[], ContextManager[Session]]) -> threading.Thread:
+        """
+        Follow the file on a daemon thread.
+
+        Args:
+            session_factory (Callable[[], ContextManager[Session]]): Opens a database session per poll.
+
+        Returns:
+            threading.Thread: The started thread.
+        """
+        self._stop.clear()
+        thread = threading.Thread(target=self.follow, args=(session_factory,),
+                                  name=f'tail-{self.processor.dataset}', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Ask ``follow`` to return after its current poll."""
+        self._stop.set()
@@ -1,52 +1,407 @@
+import asyncio
+import io
 import logging
-import uvicorn
-from fastapi import FastAPI, Depends, HTTPException
+import logging.config
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+from typing import Optional
+from urllib.parse import quote
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from PIL import Image as PILImage
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.logger import LOGGING
 from settings import settings
 from core.image_processor import ImageProcessor
 from core.database import Database
+from core.cache import RangeCache
+from core.colormap import ColormapName
+from core.depth_index import DepthIndex
+from core.events import FrameEvents
+from core.frames import PoolingMethod
+from core.ingest import IngestManager
+from core.metrics import REQUEST_SECONDS, metrics
+from core.profiling import IngestProfile, ProfileFormat, SamplingProfiler
+from core.responses import (EVENT_STREAM_MEDIA_TYPE, StreamFormat, frame_event_stream, multipart_png_response,
+                            png_response, streaming_images_response)
+from core.tail import TailIngest
 
 logging.config.dictConfig(LOGGING)
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
-db = Database()
-image_processor = ImageProcessor('data/img.csv')
+db = Database(
+    database_url=settings.database_url,
+    pragmas={
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+        "busy_timeout": settings.sqlite_busy_timeout,
+    },
+    read_pool_size=settings.read_pool_size,
+    async_pool_size=settings.async_pool_size,
+    async_max_overflow=settings.async_max_overflow)
+range_cache = RangeCache(
+    settings.range_cache_max_bytes,
+    settings.range_cache_ttl_seconds or None) if settings.range_cache_max_bytes else None
+# One processor and ingest per dataset; they share the range cache, whose keys
+# start with the dataset so a write only invalidates its own dataset's ranges.
+# Image files are named by depth, so each extra dataset writes them to its own
+# directory; the default dataset keeps data/images.
+ingest_managers = {
+    dataset: IngestManager(
+        ImageProcessor(
+            csv_file_path,
+            image_directory="data/images" if dataset == settings.default_dataset else f"data/images/{dataset}",
+            depth_index=DepthIndex() if settings.depth_index_enabled else None,
+            range_cache=range_cache,
+            dataset=dataset,
+            events=FrameEvents()),
+        settings.ingest_chunk_size, settings.ingest_batch_size, settings.ingest_workers)
+    for dataset, csv_file_path in settings.datasets.items()
+}
+tails = {
+    dataset: TailIngest(manager, settings.ingest_follow_interval,
+                        settings.ingest_follow_batch_rows, settings.ingest_batch_size)
+    for dataset, manager in ingest_managers.items()
+}
+# The batched and streaming modes hold one SQLite write transaction while they
+# render a whole file or chunk, so only one of them writes at a time.
+full_ingest_lock = threading.Lock()
+ingest_manager = ingest_managers[settings.default_dataset]
+image_processor = ingest_manager.image_processor
+images_router = APIRouter()
 
 
 def get_db():
-    with db.get_db() as session:
+    with db.get_db(read_only=True) as session:
         yield session
 
 
+async def get_async_db():
+    try:
+        db.async_database_url()
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    async with db.get_async_db() as session:
+        yield session
+
+
+def get_ingest_manager(dataset: str = settings.default_dataset) -> IngestManager:
+    """Looks up the ingest manager, and with it the processor, of the requested dataset."""
+    manager = ingest_managers.get(dataset)
+    if manager is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    return manager
+
+
+def get_url_prefix(request: Request) -> str:
+    """Returns the path prefix that links to single images of the dataset a request chose by path or query."""
+    dataset = request.path_params.get("dataset") or request.query_params.get("dataset")
+    return f"/datasets/{quote(dataset, safe='')}" if dataset else ""
+
+
+def raise_not_found(e: Exception, manager: IngestManager):
+    """Raises 404, or 503 with Retry-After while the dataset's ingest may still write the rows."""
+    if manager.progress.running:
+        raise HTTPException(status_code=503, detail=str(e), headers={
+            "Retry-After": str(settings.ingest_retry_after)})
+    raise HTTPException(status_code=404, detail=str(e))
+
+
+def ingest_images(manager: IngestManager):
+    """Runs the configured ingest mode for one dataset in its own database session, then follows the file if enabled."""
+    try:
+        run_ingest(manager)
+    finally:
+        if settings.ingest_follow:
+            tails[manager.image_processor.dataset].start(db.get_db)
+
+
+def run_ingest(manager: IngestManager):
+    """Runs the configured ingest mode for one dataset in its own database session, profiled if `profile_ingest` is set."""
+    profile = (IngestProfile(settings.profile_dir, f"ingest-{manager.image_processor.dataset}")
+               if settings.profile_ingest else nullcontext())
+    with profile, db.get_db() as session:
+        if settings.ingest_incremental:
+            manager.run(session)
+            return
+        try:
+            with full_ingest_lock:
+                manager.run_full(session, settings.ingest_streaming)
+        finally:
+            manager.progress.finish()
+
+
+def ingest_datasets():
+    """Ingests every dataset, running at most `ingest_concurrency` ingests at once."""
+    with ThreadPoolExecutor(max_workers=max(settings.ingest_concurrency, 1),
+                            thread_name_prefix='ingest') as executor:
+        for future in [executor.submit(ingest_images, manager) for manager in ingest_managers.values()]:
+            future.result()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Records latency and status of every request, labelled by route template."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.observe(REQUEST_SECONDS, time.perf_counter() - start, route=path)
+    metrics.increment("http_requests_total", route=path, status=str(response.status_code))
+    return response
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Samples every thread while a request with an `X-Profile` header runs, and names the collapsed stacks file in `X-Profile-File`."""
+    if not settings.profiling_enabled or "x-profile" not in request.headers:
+        return await call_next(request)
+    with SamplingProfiler(settings.profile_sample_interval) as profiler:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    label = f"request-{route.path if route is not None else 'unmatched'}"
+    response.headers["X-Profile-File"] = await asyncio.to_thread(profiler.dump, settings.profile_dir, label)
+    return response
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Initializes the database and processes images on application startup."""
+    """Initializes the database and starts processing images on application startup."""
     db.init_db()
-    with db.get_db() as session:
-        image_processor.process_images(session)
+    for dataset, manager in ingest_managers.items():
+        if manager.image_processor.depth_index is not None:
+            with db.get_db(read_only=True) as session:
+                manager.image_processor.depth_index.load(session, dataset)
+    if not settings.ingest_on_startup:
+        if settings.ingest_follow:
+            for tail in tails.values():
+                tail.start(db.get_db)
+        return
+    for manager in ingest_managers.values():
+        manager.progress.start()
+    if settings.ingest_background:
+        threading.Thread(target=ingest_datasets, name='ingest', daemon=True).start()
+    else:
+        ingest_datasets()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stops following CSV files."""
+    for tail in tails.values():
+        tail.stop()
+
+
+@app.get("/health")
+def health():
+    """Reports that the process is up, whether or not ingest has finished."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """Reports ingest progress of the default dataset and of each dataset; returns 503 until every ingest has finished."""
+    datasets = {dataset: manager.progress.snapshot() for dataset, manager in ingest_managers.items()}
+    progress = {**datasets[settings.default_dataset], "datasets": datasets}
+    if any(manager.progress.running for manager in ingest_managers.values()):
+        return JSONResponse(progress, status_code=503, headers={
+            "Retry-After": str(settings.ingest_retry_after)})
+    return progress
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Reports hit, miss and eviction counts of the depth-range cache."""
+    if range_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **range_cache.stats()}
+
 
+@app.get("/admin/profile", response_class=PlainTextResponse)
+async def sample_profile(seconds: float = Query(default=5, gt=0, le=settings.profile_max_seconds),
+                         format: ProfileFormat = ProfileFormat.collapsed, include_idle: bool = False):
+    """Samples every thread for `seconds` and returns collapsed stacks for a flame graph, or the top functions."""
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled.")
+    with SamplingProfiler(settings.profile_sample_interval, include_idle) as profiler:
+        await asyncio.sleep(seconds)
+    path = await asyncio.to_thread(profiler.dump, settings.profile_dir, "sampled")
+    body = profiler.collapsed() if format == ProfileFormat.collapsed else profiler.top()
+    return PlainTextResponse(body, headers={"X-Profile-File": path})
 
-@app.get("/images/")
-def get_images(depth_min: float, depth_max: float, db: Session = Depends(get_db)):
-    """Fetches images within a specified depth range."""
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Exposes stage timings, request latencies, cache and ingest gauges in Prometheus text format."""
+    gauges = {}
+    for dataset, manager in ingest_managers.items():
+        labels = (("dataset", dataset),)
+        for key, value in manager.progress.snapshot().items():
+            if key in ("rows_done", "rows_per_sec", "elapsed_seconds"):
+                gauges.setdefault(f"ingest_{key}", {})[labels] = value
+        gauges.setdefault("ingest_running", {})[labels] = int(manager.progress.running)
+    if range_cache is not None:
+        gauges.update({f"range_cache_{key}": value
+                       for key, value in range_cache.stats().items()})
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
+@images_router.get("/images/")
+def get_images(depth_min: float, depth_max: float, request: Request, response: Response,
+               limit: Optional[int] = Query(default=None, gt=0, le=settings.page_max_limit),
+               after_depth: Optional[float] = None,
+               db: Session = Depends(get_db),
+               manager: IngestManager = Depends(get_ingest_manager)):
+    """Fetches images within a specified depth range, a page of `limit` depths after `after_depth` if given."""
     try:
-        images = image_processor.get_images_by_depth_range(
-            db, depth_min, depth_max)
-        image_urls = [
-            {"depth": depth, "url": image_processor.save_image_to_file(
-                image, depth)}
-            for depth, image in images
-        ]
+        if limit is None and after_depth is None:
+            images = manager.image_processor.get_images_by_depth_range(
+                db, depth_min, depth_max)
+        else:
+            images = read_image_page(request, response, depth_min, depth_max, limit, after_depth, db, manager)
+        with metrics.timer("serialize", len(images)):
+            image_urls = [
+                {"depth": depth, "url": manager.image_processor.save_image_to_file(
+                    image, depth)}
+                for depth, image in images
+            ]
         return image_urls
     except Exception as e:
         logger.error(f"Failed to get images: {e}")
-        raise HTTPException(status_code=404, detail=str(e))
+        raise_not_found(e, manager)
+
+
+def read_image_page(request: Request, response: Response, depth_min: float, depth_max: float,
+                   limit: Optional[int], after_depth: Optional[float], db: Session, manager: IngestManager):
+    """Reads one keyset page of decoded images and links the next page while this one is full."""
+    page = manager.image_processor.get_image_page(db, depth_min, depth_max, limit, after_depth)
+    if not page and after_depth is None:
+        raise ValueError(f"No images found within the depth range: {depth_min} - {depth_max}")
+    if page and len(page) == limit:
+        next_url = request.url.include_query_params(after_depth=page[-1][0])
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return [(depth, PILImage.open(io.BytesIO(image))) for depth, image in page]
+
+
+@images_router.get("/images/stream")
+def get_images_stream(depth_min: float, depth_max: float,
+                      format: StreamFormat = StreamFormat.ndjson,
+                      limit: Optional[int] = Query(default=None, gt=0),
+                      after_depth: Optional[float] = None,
+                      db: Session = Depends(get_db),
+                      manager: IngestManager = Depends(get_ingest_manager),
+                      url_prefix: str = Depends(get_url_prefix)):
+    """Streams the stored PNGs within a depth range page by page as NDJSON or multipart/mixed."""
+    pages = manager.image_processor.iter_image_pages(
+        db, depth_min, depth_max, settings.stream_page_size, after_depth, limit)
+    # The first page is read up front so an empty range still gets a 404.
+    first = next(pages, None)
+    if first is None and after_depth is None:
+        raise_not_found(ValueError(
+            f"No images found within the depth range: {depth_min} - {depth_max}"), manager)
+    return streaming_images_response(chain([first] if first else [], pages), format, url_prefix)
+
+
+@images_router.get("/images/batch")
+def get_images_batch(depth_min: float, depth_max: float,
+                     if_none_match: Optional[str] = Header(default=None),
+                     db: Session = Depends(get_db),
+                     manager: IngestManager = Depends(get_ingest_manager),
+                     url_prefix: str = Depends(get_url_prefix)):
+    """Returns the stored PNGs within a depth range as one multipart/mixed response."""
+    try:
+        images = manager.image_processor.get_image_bytes_by_depth_range(
+            db, depth_min, depth_max)
+    except ValueError as e:
+        raise_not_found(e, manager)
+    return multipart_png_response(images, if_none_match, url_prefix)
+
+
+@images_router.get("/images/composite.png")
+def get_composite_image(depth_min: float, depth_max: float,
+                        height: Optional[int] = Query(default=None, gt=0),
+                        colormap: ColormapName = ColormapName.viridis,
+                        width: Optional[int] = Query(default=None, gt=0, le=settings.resample_max_width),
+                        depth_step: Optional[float] = Query(default=None, gt=0),
+                        pooling: PoolingMethod = PoolingMethod.mean,
+                        if_none_match: Optional[str] = Header(default=None),
+                        db: Session = Depends(get_db),
+                        manager: IngestManager = Depends(get_ingest_manager)):
+    """Returns one PNG with a row per depth in the range, resampled to `width` and pooled per `depth_step` if given."""
+    try:
+        image = manager.image_processor.get_composite_image(
+            db, depth_min, depth_max, height, colormap.value, width, depth_step, pooling.value)
+    except ValueError as e:
+        raise_not_found(e, manager)
+    return png_response(image, if_none_match)
+
+
+@images_router.get("/images/events")
+async def get_image_events(request: Request, include_images: bool = False,
+                           manager: IngestManager = Depends(get_ingest_manager)):
+    """Streams the depths of newly committed images as server-sent events, with base64 PNGs if `include_images`."""
+    return StreamingResponse(
+        frame_event_stream(request, manager.image_processor.events, include_images,
+                           settings.events_keepalive_seconds),
+        media_type=EVENT_STREAM_MEDIA_TYPE, headers={"Cache-Control": "no-cache"})
+
+
+@images_router.get("/images/{depth}.png")
+def get_image_png(depth: float, colormap: ColormapName = ColormapName.viridis,
+                  if_none_match: Optional[str] = Header(default=None),
+                  db: Session = Depends(get_db),
+                  manager: IngestManager = Depends(get_ingest_manager)):
+    """Returns the stored PNG for a single depth, re-rendered only for a non-default colormap."""
+    try:
+        image = manager.image_processor.get_image_bytes(db, depth, colormap.value)
+    except ValueError as e:
+        raise_not_found(e, manager)
+    return png_response(image, if_none_match)
+
+
+@images_router.get("/async/images/batch")
+async def get_images_batch_async(depth_min: float, depth_max: float,
+                                 if_none_match: Optional[str] = Header(default=None),
+                                 db: AsyncSession = Depends(get_async_db),
+                                 manager: IngestManager = Depends(get_ingest_manager),
+                                 url_prefix: str = Depends(get_url_prefix)):
+    """Async version of /images/batch that runs on the event loop instead of the threadpool."""
+    try:
+        images = await manager.image_processor.get_image_bytes_by_depth_range_async(
+            db, depth_min, depth_max)
+    except ValueError as e:
+        raise_not_found(e, manager)
+    return multipart_png_response(images, if_none_match, url_prefix)
+
+
+@images_router.get("/async/images/{depth}.png")
+async def get_image_png_async(depth: float, if_none_match: Optional[str] = Header(default=None),
+                              db: AsyncSession = Depends(get_async_db),
+                              manager: IngestManager = Depends(get_ingest_manager)):
+    """Async version of /images/{depth}.png."""
+    try:
+        image = await manager.image_processor.get_image_bytes_async(db, depth)
+    except ValueError as e:
+        raise_not_found(e, manager)
+    return png_response(image, if_none_match)
+
+
+app.include_router(images_router)
+app.include_router(images_router, prefix="/datasets/{dataset}")
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host=settings.host,
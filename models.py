@@ -1,10 +1,30 @@
-from sqlalchemy import Column, Float, LargeBinary
+from sqlalchemy import Column, Float, Integer, LargeBinary, String, Text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+DEFAULT_DATASET = 'default'
+
 
 class Image(Base):
     __tablename__ = 'images'
+    # Rows are clustered by (dataset, depth), so a range query on one dataset
+    # is a single contiguous scan however many datasets share the table.
+    __table_args__ = {'sqlite_with_rowid': False}
+    dataset = Column(String, primary_key=True, server_default=DEFAULT_DATASET)
     depth = Column(Float, primary_key=True)
     image = Column(LargeBinary)
+    pixels = Column(LargeBinary)
+    source_pixels = Column(LargeBinary)
+
+
+class IngestState(Base):
+    __tablename__ = 'ingest_state'
+    dataset = Column(String, primary_key=True, server_default=DEFAULT_DATASET)
+    source = Column(String)
+    file_size = Column(Integer)
+    file_mtime = Column(Float)
+    chunk_size = Column(Integer)
+    statistics = Column(Text)
+    chunk_hashes = Column(Text)
+    content_hash = Column(String)
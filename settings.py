@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Dict
 
 from pydantic import BaseSettings, Field
 
@@ -8,6 +9,42 @@ class Settings(BaseSettings):
     port: int = Field()
     log_level: str = Field(default="INFO")
     debug_mode: str = Field(default=False)
+    ingest_chunk_size: int = Field(default=1024)
+    ingest_batch_size: int = Field(default=1000)
+    ingest_streaming: bool = Field(default=False)
+    ingest_incremental: bool = Field(default=True)
+    ingest_background: bool = Field(default=True)
+    ingest_retry_after: int = Field(default=5)
+    database_url: str = Field(default="sqlite:///./image_data.db")
+    sqlite_journal_mode: str = Field(default="WAL")
+    sqlite_synchronous: str = Field(default="NORMAL")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024)
+    sqlite_cache_size: int = Field(default=-64 * 1024)
+    sqlite_temp_store: str = Field(default="MEMORY")
+    sqlite_busy_timeout: int = Field(default=5000)
+    read_pool_size: int = Field(default=8)
+    async_pool_size: int = Field(default=20)
+    async_max_overflow: int = Field(default=80)
+    depth_index_enabled: bool = Field(default=False)
+    range_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    range_cache_ttl_seconds: float = Field(default=300)
+    ingest_workers: int = Field(default=1)
+    ingest_on_startup: bool = Field(default=True)
+    datasets: Dict[str, str] = Field(default={"default": "data/img.csv"})
+    default_dataset: str = Field(default="default")
+    ingest_concurrency: int = Field(default=2)
+    resample_max_width: int = Field(default=4096)
+    stream_page_size: int = Field(default=500)
+    page_max_limit: int = Field(default=10000)
+    ingest_follow: bool = Field(default=False)
+    ingest_follow_interval: float = Field(default=0.5)
+    ingest_follow_batch_rows: int = Field(default=256)
+    events_keepalive_seconds: float = Field(default=15)
+    profile_ingest: bool = Field(default=False)
+    profiling_enabled: bool = Field(default=False)
+    profile_dir: str = Field(default="data/profiles")
+    profile_sample_interval: float = Field(default=0.005)
+    profile_max_seconds: float = Field(default=60)
 
     class Config:
         env_file = '.env'
@@ -1,7 +1,11 @@
 import os
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from main import app, Database, ImageProcessor
+from models import Base
 
 test_db = Database()
 test_image_processor = ImageProcessor('tests/test_data/img.csv')
@@ -32,3 +36,35 @@ def test_image_processor_instance():
 @pytest.fixture(scope="module")
 def test_image_directory():
     return 'tests/test_data/images'
+
+
+@pytest.fixture
+def create_session(tmp_path):
+    """Opens sessions on new SQLite files in the test's directory, and closes them after the test."""
+    sessions = []
+
+    def create(name='test.db'):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=engine)
+        sessions.append(sessionmaker(bind=engine)())
+        return sessions[-1]
+
+    yield create
+    for session in sessions:
+        session.close()
+
+
+@pytest.fixture
+def session(create_session):
+    return create_session()
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    csv_file = tmp_path / 'img.csv'
+    pd.DataFrame({
+        'depth': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'col1': [10, None, 30, 40, 50],
+        'col2': [60, 70, 80, 90, 100],
+    }).to_csv(csv_file, index=False)
+    return csv_file
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from core.archive import FrameArchive, export_archive, import_archive
+from core.image_processor import ImageProcessor
+from core.ingest import IngestManager
+from models import Image as ImageModel
+
+
+def stored_rows(session):
+    return session.query(ImageModel.depth, ImageModel.image, ImageModel.pixels,
+                         ImageModel.source_pixels).order_by(ImageModel.depth).all()
+
+
+@pytest.fixture
+def exported(session, csv_file, tmp_path):
+    processor = ImageProcessor(str(csv_file))
+    IngestManager(processor, chunk_size=2).run(session)
+    export_archive(session, processor, str(tmp_path / 'frames.ifa'), tile_rows=2)
+    return session, csv_file, tmp_path / 'frames.ifa'
+
+
+class TestFrameArchive:
+
+    def test_import_restores_rows(self, exported, create_session):
+        session, csv_file, archive_path = exported
+        hydrated = create_session('hydrated.db')
+        assert import_archive(hydrated, ImageProcessor(str(csv_file)), str(archive_path)) == 5
+        assert stored_rows(hydrated) == stored_rows(session)
+
+    def test_import_with_stored_images(self, exported, create_session, tmp_path):
+        session, csv_file, _ = exported
+        processor = ImageProcessor(str(csv_file))
+        archive_path = str(tmp_path / 'with-images.ifa')
+        export_archive(session, processor, archive_path, tile_rows=2, include_images=True)
+        with FrameArchive(archive_path) as archive:
+            assert archive.read_tile(0).images == [image for _, image, _, _ in stored_rows(session)[:2]]
+
+        hydrated = create_session('hydrated.db')
+        import_archive(hydrated, processor, archive_path)
+        assert stored_rows(hydrated) == stored_rows(session)
+
+    def test_tiles_in_range(self, exported):
+        _, _, archive_path = exported
+        with FrameArchive(str(archive_path)) as archive:
+            assert len(archive) == 3
+            np.testing.assert_array_equal(archive.tiles_in_range(2.5, 3.0), [1])
+            np.testing.assert_array_equal(archive.tiles_in_range(0, 10), [0, 1, 2])
+            tile = archive.read_tile(2)
+            np.testing.assert_array_equal(tile.depths, [5.0])
+            assert tile.pixels.shape == (1, 150)
+            assert tile.source_pixels.shape == (1, 2)
+            assert tile.images is None
+
+    def test_ingest_after_import_skips_unchanged_chunks(self, exported, create_session, caplog):
+        _, csv_file, archive_path = exported
+        hydrated = create_session('hydrated.db')
+        processor = ImageProcessor(str(csv_file))
+        import_archive(hydrated, processor, str(archive_path))
+
+        IngestManager(processor, chunk_size=2).run(hydrated)
+        assert "unchanged since the last ingest" in caplog.text
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'not-an-archive'
+        path.write_bytes(b'depth,col1\n' * 10)
+        with pytest.raises(ValueError):
+            FrameArchive(str(path))
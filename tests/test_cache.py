@@ -0,0 +1,91 @@
+from core.cache import RangeCache
+from core.image_processor import ImageProcessor
+
+
+class TestRangeCache:
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = RangeCache(max_bytes=2 * (100 + RangeCache.ENTRY_OVERHEAD))
+        cache.put('a', 'A', 100)
+        cache.put('b', 'B', 100)
+        assert cache.get('a') == 'A'
+        cache.put('c', 'C', 100)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 'A'
+        assert cache.get('c') == 'C'
+        assert cache.stats()['evictions'] == 1
+
+    def test_skips_values_larger_than_cache(self):
+        cache = RangeCache(max_bytes=100)
+        cache.put('a', 'A', 1000)
+        assert cache.get('a') is None
+
+    def test_invalidate_starts_new_generation(self):
+        cache = RangeCache(max_bytes=10000)
+        cache.put('a', 'A', 10)
+        cache.invalidate()
+        assert cache.get('a') is None
+        assert cache.stats()['generation'] == 1
+        assert cache.stats()['bytes'] == 0
+
+    def test_invalidate_namespace_keeps_other_entries(self):
+        cache = RangeCache(max_bytes=10000)
+        cache.put(('well-a', 1.0), 'A', 10)
+        cache.put(('well-b', 1.0), 'B', 10)
+        cache.invalidate('well-a')
+        assert cache.get(('well-a', 1.0)) is None
+        assert cache.get(('well-b', 1.0)) == 'B'
+        assert cache.stats()['entries'] == 1
+
+    def test_put_drops_values_read_before_invalidate(self):
+        cache = RangeCache(max_bytes=10000)
+        generation = cache.current_generation('well-a')
+        cache.invalidate('well-a')
+        cache.put(('well-a', 1.0), 'stale', 10, generation)
+        assert cache.get(('well-a', 1.0)) is None
+        assert cache.stats()['stale_puts'] == 1
+
+        other = cache.current_generation('well-b')
+        cache.put(('well-b', 1.0), 'B', 10, other)
+        assert cache.get(('well-b', 1.0)) == 'B'
+        generation = cache.current_generation('well-a')
+        cache.invalidate()
+        cache.put(('well-a', 1.0), 'stale', 10, generation)
+        assert cache.get(('well-a', 1.0)) is None
+
+    def test_read_overlapping_write_is_not_cached(self, session):
+        processor = ImageProcessor('unused.csv', range_cache=RangeCache(10000))
+        processor.save_images_to_db(session, [(1.0, b'a')])
+
+        generation = processor.cache_generation()
+        rows = [(1.0, b'a')]
+        processor.save_images_to_db(session, [(2.0, b'b')])
+        processor.cache_range(0, 5, rows, generation)
+        assert processor.get_image_bytes_by_depth_range(session, 0, 5) == [(1.0, b'a'), (2.0, b'b')]
+
+    def test_ttl_expires_entries(self, monkeypatch):
+        clock = iter([0.0, 100.0])
+        monkeypatch.setattr('core.cache.time.monotonic', lambda: next(clock))
+        cache = RangeCache(max_bytes=10000, ttl_seconds=10)
+        cache.put('a', 'A', 10)
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_cached_rows_count_their_overhead(self):
+        processor = ImageProcessor('unused.csv', range_cache=RangeCache(10000))
+        processor.cache_range(0, 5, [(1.0, b'a'), (2.0, b'bc')])
+        assert processor.range_cache.stats()['bytes'] == \
+            3 + 2 * ImageProcessor.CACHED_ROW_OVERHEAD + RangeCache.ENTRY_OVERHEAD
+        assert ImageProcessor.CACHED_ROW_OVERHEAD > 100
+
+    def test_processor_invalidates_on_write(self, session):
+        processor = ImageProcessor('unused.csv', range_cache=RangeCache(10000))
+        processor.save_images_to_db(session, [(1.0, b'a')])
+
+        assert processor.get_image_bytes_by_depth_range(session, 0, 2) == [(1.0, b'a')]
+        assert processor.get_image_bytes_by_depth_range(session, 0, 2.0) == [(1.0, b'a')]
+        assert processor.range_cache.stats()['hits'] == 1
+
+        processor.save_images_to_db(session, [(1.0, b'b')])
+        assert processor.get_image_bytes_by_depth_range(session, 0, 2) == [(1.0, b'b')]
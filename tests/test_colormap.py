@@ -0,0 +1,50 @@
+import io
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image as PILImage
+
+from core.colormap import ColormapName, apply_colormap, get_lut
+from core.image_processor import ImageProcessor
+from core.ingest import IngestManager
+
+
+@pytest.fixture
+def ingested(session, tmp_path):
+    csv_file = tmp_path / 'img.csv'
+    pd.DataFrame({
+        'depth': [1.0, 2.0, 3.0],
+        'col1': [0, 128, 255],
+        'col2': [255, 64, 0],
+    }).to_csv(csv_file, index=False)
+    processor = ImageProcessor(str(csv_file))
+    IngestManager(processor, chunk_size=2).run(session)
+    return processor, session
+
+
+class TestColormap:
+
+    @pytest.mark.parametrize("name", [name.value for name in ColormapName])
+    def test_lut_matches_matplotlib(self, name):
+        gray = np.arange(256, dtype=np.uint8).reshape((16, 16))
+        expected = (matplotlib.colormaps[name](gray) * 255).astype(np.uint8)
+        np.testing.assert_array_equal(apply_colormap(gray, name), expected)
+
+    def test_unknown_colormap(self):
+        with pytest.raises(ValueError):
+            get_lut('unknown')
+
+    def test_composite_image_colormap(self, ingested):
+        processor, session = ingested
+        image = processor.get_composite_image(session, 1.0, 3.0, colormap='gray')
+        pixels = processor.get_pixels_by_depth_range(session, 1.0, 3.0)[1]
+        output = np.array(PILImage.open(io.BytesIO(image)))
+        np.testing.assert_array_equal(output, get_lut('gray')[pixels])
+
+    def test_image_bytes_colormap(self, ingested):
+        processor, session = ingested
+        assert processor.get_image_bytes(session, 2.0, 'viridis') == processor.get_image_bytes(session, 2.0)
+        image = PILImage.open(io.BytesIO(processor.get_image_bytes(session, 2.0, 'plasma')))
+        assert image.size == (150, 1)
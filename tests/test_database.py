@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from core.database import Database
+
+
+class TestDatabase:
+
+    def test_init_db_adds_missing_columns(self, tmp_path):
+        database = Database()
+        database.engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with database.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE images (depth FLOAT PRIMARY KEY, image BLOB)"))
+
+        database.init_db()
+
+        columns = {column['name']
+                   for column in inspect(database.engine).get_columns('images')}
+        assert 'pixels' in columns
+
+    def test_init_db_rebuilds_images_keyed_by_dataset(self, tmp_path):
+        database = Database()
+        database.engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with database.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE images (depth FLOAT PRIMARY KEY, image BLOB)"))
+            connection.execute(text(
+                "INSERT INTO images (depth, image) VALUES (1.5, x'00')"))
+
+        database.init_db()
+
+        inspector = inspect(database.engine)
+        assert inspector.get_pk_constraint('images')['constrained_columns'] == ['dataset', 'depth']
+        assert 'pixels' in {column['name'] for column in inspector.get_columns('images')}
+        with database.engine.connect() as connection:
+            assert connection.execute(text(
+                "SELECT dataset, depth, image FROM images")).all() == [('default', 1.5, b'\x00')]
+
+    def test_rebuild_with_new_image_columns_clears_ingest_state(self, tmp_path):
+        database = Database()
+        database.engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with database.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE images (depth FLOAT PRIMARY KEY, image BLOB, pixels BLOB)"))
+            connection.execute(text(
+                "CREATE TABLE ingest_state (source VARCHAR PRIMARY KEY, content_hash VARCHAR)"))
+            connection.execute(text(
+                "INSERT INTO ingest_state (source, content_hash) VALUES ('data/img.csv', 'abc')"))
+
+        database.init_db()
+
+        with database.engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM ingest_state")).scalar() == 0
+
+    def test_pragmas_applied_to_read_and_write_connections(self, tmp_path):
+        database = Database(database_url=f"sqlite:///{tmp_path / 'profile.db'}")
+        database.init_db()
+
+        for engine in (database.engine, database.read_engine):
+            with engine.connect() as connection:
+                assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+                assert connection.execute(text("PRAGMA temp_store")).scalar() == 2
+        assert database.read_engine is not database.engine
+
+    def test_read_session_sees_committed_writes(self, tmp_path):
+        database = Database(database_url=f"sqlite:///{tmp_path / 'split.db'}")
+        database.init_db()
+        with database.get_db() as session:
+            session.execute(text("INSERT INTO images (depth, image) VALUES (1.0, x'00')"))
+        with database.get_db(read_only=True) as session:
+            assert session.execute(text("SELECT COUNT(*) FROM images")).scalar() == 1
+
+    @pytest.mark.parametrize(
+        "database_url, expected_async_url",
+        [
+            ("sqlite:///./image_data.db", "sqlite+aiosqlite:///./image_data.db"),
+            ("sqlite:////dev/shm/image_data.db", "sqlite+aiosqlite:////dev/shm/image_data.db"),
+        ]
+    )
+    def test_async_database_url(self, database_url, expected_async_url):
+        assert Database(database_url=database_url).async_database_url() == expected_async_url
+
+    @pytest.mark.parametrize("database_url", ["sqlite://", "postgresql://user@host/images"])
+    def test_async_engine_needs_a_file_or_async_driver(self, tmp_path, database_url):
+        database = Database(database_url=f"sqlite:///{tmp_path / 'async.db'}")
+        database.database_url = database_url
+        with pytest.raises(ValueError):
+            database.async_engine
+        database.database_url = "postgresql+asyncpg://user@host/images"
+        assert database.async_database_url() == database.database_url
+
+    def test_memory_database_shares_engine(self):
+        database = Database(database_url="sqlite://")
+        assert database.read_engine is database.engine
+        assert database._async_engine is None
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from core.depth_index import DepthIndex
+from core.image_processor import ImageProcessor
+
+
+class TestDepthIndex:
+
+    @pytest.mark.parametrize(
+        "depth_min, depth_max, expected",
+        [
+            (1.0, 2.0, [(1.0, b'a'), (2.0, b'bb')]),  # Inclusive bounds
+            (1.5, 10.0, [(2.0, b'bb'), (3.0, b'ccc')]),
+            (4.0, 5.0, []),                           # Empty range
+        ]
+    )
+    def test_range(self, depth_min, depth_max, expected):
+        index = DepthIndex()
+        index.update([(3.0, b'ccc'), (1.0, b'a'), (2.0, b'bb')])
+        assert index.range(depth_min, depth_max) == expected
+        assert index.count(depth_min, depth_max) == len(expected)
+
+    @pytest.mark.parametrize(
+        "limit, after_depth, expected",
+        [
+            (2, None, [1.0, 2.0]),
+            (2, 2.0, [3.0]),
+            (None, 1.5, [2.0, 3.0]),   # The cursor need not be a stored depth
+            (5, 3.0, []),
+        ]
+    )
+    def test_page(self, limit, after_depth, expected):
+        index = DepthIndex()
+        index.update([(3.0, b'ccc'), (1.0, b'a'), (2.0, b'bb')])
+        assert [depth for depth, _ in index.page(0, 10, limit, after_depth)] == expected
+
+    def test_update_replaces_and_keeps_pixels(self):
+        index = DepthIndex()
+        index.update([(1.0, b'a', b'\x01\x01'), (2.0, b'b', b'\x02\x02')])
+        assert index.get(1.0) == b'a'
+        index.update([(1.0, b'A')])
+
+        assert index.get(1.0) == b'A'
+        assert index.get(1.5) is None
+        depths, frame = index.pixels_range(0, 3)
+        np.testing.assert_array_equal(depths, [1.0, 2.0])
+        np.testing.assert_array_equal(frame, [[1, 1], [2, 2]])
+
+    def test_pixels_range_missing_pixels(self):
+        index = DepthIndex()
+        index.update([(1.0, b'a', b'\x01'), (2.0, b'b')])
+        assert index.pixels_range(0, 3) is None
+        assert index.pixels_range(0, 1.5) is not None
+
+    def test_processor_keeps_index_in_sync(self, session):
+        index = DepthIndex()
+        processor = ImageProcessor('unused.csv', depth_index=index)
+        processor.save_images_to_db(session, [(1.0, b'a', b'\x01'), (2.0, b'b', b'\x02')])
+        processor.save_image_to_db(session, 3.0, b'c')
+
+        assert processor.get_image_bytes_by_depth_range(session, 0, 5) == [
+            (1.0, b'a'), (2.0, b'b'), (3.0, b'c')]
+
+        reloaded = DepthIndex()
+        reloaded.load(session)
+        assert reloaded.range(0, 5) == index.range(0, 5)
+
+    @pytest.mark.parametrize("indexed", [False, True])
+    def test_iter_image_pages(self, session, indexed):
+        processor = ImageProcessor('unused.csv', depth_index=DepthIndex() if indexed else None)
+        processor.save_images_to_db(session, [(float(depth), b'x') for depth in range(1, 8)])
+
+        pages = list(processor.iter_image_pages(session, 2, 7, page_size=2))
+        assert [[depth for depth, _ in page] for page in pages] == [[2.0, 3.0], [4.0, 5.0], [6.0, 7.0]]
+        pages = list(processor.iter_image_pages(session, 2, 7, page_size=2, after_depth=2.5, limit=3))
+        assert [[depth for depth, _ in page] for page in pages] == [[3.0, 4.0], [5.0]]
+        assert processor.get_image_page(session, 2, 7, 2, after_depth=7.0) == []
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from core.frames import depth_bins, downsample_rows, pool_rows
+
+
+class TestFrames:
+
+    @pytest.mark.parametrize(
+        "height, expected",
+        [
+            (None, [[0], [2], [4], [6]]),
+            (2, [[1], [5]]),
+            (1, [[3]]),
+        ]
+    )
+    def test_downsample_rows(self, height, expected):
+        frame = np.array([[0], [2], [4], [6]], dtype=np.uint8)
+        output = downsample_rows(frame, height)
+        np.testing.assert_array_equal(output, np.array(expected, dtype=np.uint8))
+        assert output.dtype == np.uint8
+
+    def test_depth_bins_align_to_step(self):
+        depths = np.round(9000.1 + np.arange(6) * 0.1, 1)
+        np.testing.assert_array_equal(depth_bins(depths, 0.1), np.arange(90001, 90007))
+        np.testing.assert_array_equal(depth_bins(depths, 0.5), [18000] * 4 + [18001] * 2)
+
+    @pytest.mark.parametrize(
+        "method, expected",
+        [
+            ("mean", [[1], [4], [8]]),
+            ("max", [[2], [4], [10]]),
+        ]
+    )
+    def test_pool_rows(self, method, expected):
+        frame = np.array([[0], [2], [4], [6], [8], [10]], dtype=np.uint8)
+        bins, output = pool_rows(frame, np.array([0, 0, 1, 3, 3, 3]), method)
+        np.testing.assert_array_equal(bins, [0, 1, 3])
+        np.testing.assert_array_equal(output, np.array(expected, dtype=np.uint8))
+        assert output.dtype == np.uint8
@@ -5,6 +5,10 @@ import numpy as np
 from PIL import Image as PILImage
 import imghdr
 
+from core.cache import RangeCache
+from core.depth_index import DepthIndex
+from core.events import FrameEvents
+from core.image_processor import ImageProcessor
 from models import Image as ImageModel
 
 
@@ -49,6 +53,57 @@ class TestImageProcessor:
             output, expected_output, check_dtype=False)
         assert [record.message for record in caplog.records] == expected_logs
 
+    def test_preprocess_data_matches_pandas_fill(self, test_image_processor_instance):
+        rng = np.random.default_rng(0)
+        values = rng.random((1000, 8)) * 255
+        values[rng.random(values.shape) < 0.1] = np.nan
+        data = pd.DataFrame(values, columns=[f"col{i}" for i in range(8)])
+        data.insert(0, 'depth', np.arange(1000, dtype=np.int64))
+        expected = data.fillna(data.mean())
+        output = test_image_processor_instance.preprocess_data(data.copy())
+        pd.testing.assert_frame_equal(output, expected)
+
+    def test_iter_frame_images_with_executor_matches_serial(self, test_image_processor_instance):
+        processor = test_image_processor_instance
+        data = processor.preprocess_data(processor.read_csv_data())
+        expected = list(processor.iter_frame_images(data, chunk_size=32))
+        with processor.create_executor(2) as executor:
+            output = list(processor.iter_frame_images(
+                data, chunk_size=32, executor=executor, max_in_flight=2))
+        assert output == expected
+
+    def test_executor_with_processor_wired_like_main(self, test_image_processor_instance, tmp_path):
+        processor = ImageProcessor(
+            test_image_processor_instance.csv_file_path, str(tmp_path / 'images'),
+            depth_index=DepthIndex(), range_cache=RangeCache(1024 * 1024), events=FrameEvents())
+        data = processor.preprocess_data(processor.read_csv_data())
+        expected = list(processor.iter_frame_images(data, chunk_size=32))
+        with processor.create_executor(2) as executor:
+            output = list(processor.iter_frame_images(data, chunk_size=32, executor=executor))
+        assert output == expected
+        assert processor.range_cache is not None and processor.events is not None
+
+    def test_iter_preprocessed_chunks_matches_preprocess_data(self, test_image_processor_instance):
+        processor = test_image_processor_instance
+        expected = processor.preprocess_data(processor.read_csv_data())
+        output = pd.concat(processor.iter_preprocessed_chunks(chunk_size=64))
+        pd.testing.assert_frame_equal(
+            output, expected, check_dtype=False)
+
+    def test_iter_preprocessed_chunks_non_numeric_in_later_chunk(self, tmp_path):
+        csv_file = tmp_path / 'img.csv'
+        pd.DataFrame({
+            'depth': [1, 2, 3, 4],
+            'col1': ['1', None, '3', 'x'],
+            'col2': [2, None, 4, 6],
+        }).to_csv(csv_file, index=False)
+        processor = ImageProcessor(str(csv_file))
+
+        output = pd.concat(processor.iter_preprocessed_chunks(chunk_size=2))
+        expected = processor.preprocess_data(pd.read_csv(csv_file))
+        pd.testing.assert_frame_equal(
+            output, expected, check_dtype=False)
+
     @pytest.mark.parametrize(
         "pixel_values, new_width, expected_size",
         [
@@ -88,6 +143,19 @@ class TestImageProcessor:
         color_mapped_array = np.array(color_mapped_image)
         np.testing.assert_array_equal(color_mapped_array[0, 0], expected_color)
 
+    def test_apply_color_map_lut_matches_apply_color_map(self, test_image_processor_instance):
+        gray = np.arange(256, dtype=np.uint8).reshape((1, -1))
+        expected = np.array(test_image_processor_instance.apply_color_map(
+            PILImage.fromarray(gray)))
+        np.testing.assert_array_equal(
+            test_image_processor_instance.apply_color_map_lut(gray), expected)
+
+    def test_iter_frame_images_matches_row_path(self, test_image_processor_instance):
+        processor = test_image_processor_instance
+        data = processor.preprocess_data(processor.read_csv_data())
+        expected = [processor.process_row(row) for _, row in data.iterrows()]
+        assert list(processor.iter_frame_images(data, chunk_size=7)) == expected
+
     @pytest.mark.parametrize(
         "input_image, expected_format",
         [
@@ -134,6 +202,17 @@ class TestImageProcessor:
                 assert saved_image is not None
                 assert saved_image.image == binary_image
 
+    def test_save_images_to_db(self, test_image_processor_instance, test_db_instance):
+        images = [(20.5, b'bulk_1'), (21.5, b'bulk_2'), (20.5, b'bulk_3')]
+        with test_db_instance.get_db() as session:
+            timings = test_image_processor_instance.save_images_to_db(
+                session, images, batch_size=2)
+            saved = dict(session.query(ImageModel.depth, ImageModel.image).filter(
+                ImageModel.depth.in_([20.5, 21.5])).all())
+
+        assert len(timings) == 2
+        assert saved == {20.5: b'bulk_3', 21.5: b'bulk_2'}
+
     def test_save_image_to_file(self, test_image_processor_instance):
         depth = 12.0
         image = PILImage.new('RGB', (10, 10))
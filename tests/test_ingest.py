@@ -0,0 +1,157 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image as PILImage
+
+from core.cache import RangeCache
+from core.image_processor import ImageProcessor
+from core.ingest import IngestManager, IngestProgress
+from models import DEFAULT_DATASET, Image as ImageModel, IngestState
+
+
+def saved_images(session):
+    return dict(session.query(ImageModel.depth, ImageModel.image).all())
+
+
+class TestIngestManager:
+
+    def test_run_matches_batched_ingest(self, session, csv_file, create_session):
+        processor = ImageProcessor(str(csv_file))
+        IngestManager(processor, chunk_size=2).run(session)
+
+        batched_session = create_session('batched.db')
+        processor.process_images_batched(batched_session)
+
+        assert saved_images(session) == saved_images(batched_session)
+        state = session.get(IngestState, DEFAULT_DATASET)
+        assert state.content_hash is not None
+
+    def test_run_skips_unchanged_file(self, session, csv_file, caplog):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        caplog.clear()
+        manager.run(session)
+        assert "unchanged since the last ingest" in caplog.text
+
+    def test_run_reprocesses_only_changed_chunks(self, session, csv_file, caplog):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+
+        data = pd.read_csv(csv_file)
+        data.loc[4, 'col2'] = 200
+        data.to_csv(csv_file, index=False)
+        caplog.clear()
+        manager.run(session)
+
+        assert "1 chunks processed, 2 unchanged" in caplog.text
+
+    def test_run_resumes_after_interruption(self, session, csv_file, caplog):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        state = session.get(IngestState, DEFAULT_DATASET)
+        state.content_hash = None
+        session.commit()
+
+        caplog.clear()
+        manager.run(session)
+        assert "0 chunks processed, 3 unchanged" in caplog.text
+
+    def test_run_stores_raw_pixels(self, session, csv_file):
+        processor = ImageProcessor(str(csv_file))
+        IngestManager(processor, chunk_size=2).run(session)
+
+        data = processor.preprocess_data(pd.read_csv(csv_file))
+        depths, frame = processor.get_pixels_by_depth_range(session, 0, 10)
+        np.testing.assert_array_equal(depths, data['depth'])
+        expected = processor.create_resized_frame(data.drop(columns='depth').to_numpy())
+        np.testing.assert_array_equal(frame, expected)
+
+        composite = PILImage.open(io.BytesIO(
+            processor.get_composite_image(session, 0, 10)))
+        assert composite.size == (150, 5)
+        np.testing.assert_array_equal(
+            np.asarray(composite), processor.apply_color_map_lut(expected))
+
+    def test_datasets_are_isolated(self, session, csv_file, tmp_path):
+        other_csv = tmp_path / 'other.csv'
+        pd.DataFrame({'depth': [2.0, 3.0], 'col1': [200, 210], 'col2': [220, 230]}).to_csv(
+            other_csv, index=False)
+        well = ImageProcessor(str(csv_file))
+        other_well = ImageProcessor(str(other_csv), dataset='other')
+        IngestManager(well, chunk_size=2).run(session)
+        IngestManager(other_well, chunk_size=2).run(session)
+
+        assert [depth for depth, _ in well.get_image_bytes_by_depth_range(session, 0, 10)] == \
+            [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert [depth for depth, _ in other_well.get_image_bytes_by_depth_range(session, 0, 10)] == \
+            [2.0, 3.0]
+        assert well.get_image_bytes(session, 2.0) != other_well.get_image_bytes(session, 2.0)
+        assert session.get(IngestState, 'other').source == str(other_csv)
+        assert session.get(IngestState, DEFAULT_DATASET).content_hash is not None
+
+    def test_resampled_composite(self, session, csv_file):
+        processor = ImageProcessor(str(csv_file), range_cache=RangeCache(1 << 20))
+        IngestManager(processor, chunk_size=2).run(session)
+
+        assert processor.get_composite_image(session, 0, 10, width=150) == \
+            processor.get_composite_image(session, 0, 10)
+        source = processor.preprocess_data(pd.read_csv(csv_file)).drop(columns='depth').to_numpy().astype(np.uint8)
+        frame = processor.get_resampled_frame(session, 0, 10, depth_step=2.0, pooling='max')
+        np.testing.assert_array_equal(frame, [source[0], source[1:3].max(axis=0), source[3:5].max(axis=0)])
+        frame = processor.get_resampled_frame(session, 2.0, 3.5, width=1, depth_step=2.0)
+        assert frame.shape == (1, 1)
+        assert frame[0, 0] == processor.create_resized_frame(
+            np.rint(source[1:3].mean(axis=0, keepdims=True)).astype(np.uint8), 1)[0, 0]
+
+        hits = processor.range_cache.stats()['hits']
+        processor.get_resampled_frame(session, 0, 10, depth_step=2.0, pooling='max')
+        assert processor.range_cache.stats()['hits'] == hits + 1
+
+    def test_resampled_bin_on_tile_edge(self, session):
+        # 9036.8 / 0.1 is bin 90368, the first bin of tile 353, although
+        # 90368 * 0.1 is slightly above 9036.8.
+        processor = ImageProcessor('unused.csv', range_cache=RangeCache(1 << 20))
+        processor.save_images_to_db(session, [
+            (depth, b'png', bytes([value]), bytes([value]))
+            for depth, value in ((9036.75, 5), (9036.8, 20), (9036.85, 30), (9036.9, 40))])
+        frame = processor.get_resampled_frame(session, 9036.7, 9036.9, depth_step=0.1)
+        np.testing.assert_array_equal(frame[:, 0], [5, 25, 40])
+
+
+class TestIngestProgress:
+
+    def test_snapshot_estimates_total_rows(self):
+        progress = IngestProgress()
+        progress.start(total_bytes=1000)
+        progress.advance(rows=10, nbytes=250)
+        snapshot = progress.snapshot()
+        assert snapshot['state'] == 'running'
+        assert snapshot['rows_done'] == 10
+        assert snapshot['rows_total'] == 40
+
+    def test_run_reports_completion(self, session, csv_file):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        snapshot = manager.progress.snapshot()
+        assert snapshot['state'] == 'completed'
+        assert snapshot['rows_done'] == 5
+
+    @pytest.mark.parametrize('streaming', [False, True])
+    def test_run_full_reports_progress(self, session, csv_file, monkeypatch, streaming):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        advances = []
+        advance = manager.progress.advance
+        monkeypatch.setattr(manager.progress, 'advance',
+                            lambda rows, nbytes: advances.append(rows) or advance(rows, nbytes))
+        manager.run_full(session, streaming)
+
+        assert advances == [2, 2, 1]
+        assert manager.offset == csv_file.stat().st_size
+        snapshot = manager.progress.snapshot()
+        assert snapshot['state'] == 'running'
+        assert snapshot['rows_done'] == 5
+        # The total is estimated from bytes read, and the header line is never read as rows.
+        assert snapshot['rows_total'] == 6
+        assert snapshot['eta_seconds'] is not None
@@ -1,6 +1,21 @@
+import base64
+import io
+import json
+import subprocess
+import sys
 import pytest
+from PIL import Image as PILImage
 from fastapi.testclient import TestClient
-from main import app
+import main
+from main import app, ingest_manager
+from settings import settings
+
+
+@pytest.fixture
+def running_ingest():
+    ingest_manager.progress.start()
+    yield ingest_manager.progress
+    ingest_manager.progress.finish()
 
 
 class TestMainEndpoints:
@@ -33,3 +48,195 @@ class TestMainEndpoints:
 
         if expect_error:
             assert "detail" in response.json()
+
+    def test_health(self, test_client: TestClient):
+        response = test_client.get("/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_ready_while_ingest_running(self, test_client: TestClient, running_ingest):
+        response = test_client.get("/ready")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert response.json()["state"] == "running"
+
+    def test_ready_after_ingest(self, test_client: TestClient):
+        ingest_manager.progress.finish()
+        response = test_client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["state"] == "completed"
+
+    def test_get_images_while_ingest_running(self, test_client: TestClient, running_ingest):
+        response = test_client.get("/images/?depth_min=10000&depth_max=11000")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+        response = test_client.get("/images/?depth_min=9040&depth_max=9041")
+        assert response.status_code == 200
+
+    def test_get_image_png(self, test_client: TestClient):
+        response = test_client.get("/images/9040.1.png")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content.startswith(b"\x89PNG")
+
+        etag = response.headers["etag"]
+        response = test_client.get(
+            "/images/9040.1.png", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_get_image_png_missing(self, test_client: TestClient):
+        response = test_client.get("/images/-1.0.png")
+        assert response.status_code == 404
+
+    def test_get_images_batch(self, test_client: TestClient):
+        response = test_client.get("/images/batch?depth_min=9040&depth_max=9041")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("multipart/mixed")
+        depth_count = len(test_client.get(
+            "/images/?depth_min=9040&depth_max=9041").json())
+        assert response.content.count(b"Content-Type: image/png") == depth_count
+        assert "etag" in response.headers
+
+    @pytest.mark.parametrize("height", [None, 1, 100000])
+    def test_get_composite_image(self, test_client: TestClient, height):
+        query = "depth_min=9040&depth_max=9041"
+        depth_count = len(test_client.get(f"/images/?{query}").json())
+        url = f"/images/composite.png?{query}"
+        if height:
+            url += f"&height={height}"
+        response = test_client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        expected_height = min(height or depth_count, depth_count)
+        assert PILImage.open(io.BytesIO(response.content)).size == (150, expected_height)
+
+    def test_get_images_pages(self, test_client: TestClient):
+        query = "depth_min=9040&depth_max=9041"
+        depths = [image["depth"] for image in test_client.get(f"/images/?{query}").json()]
+        response = test_client.get(f"/images/?{query}&limit=3")
+        assert response.status_code == 200
+        assert [image["depth"] for image in response.json()] == depths[:3]
+        next_url = response.headers["link"].split(">")[0][1:]
+        assert [image["depth"] for image in test_client.get(next_url).json()] == depths[3:6]
+        response = test_client.get(f"/images/?{query}&after_depth={depths[-1]}")
+        assert response.json() == []
+        assert "link" not in response.headers
+
+    @pytest.mark.parametrize("stream_format", ["ndjson", "multipart"])
+    def test_get_images_stream(self, test_client: TestClient, stream_format):
+        query = "depth_min=9040&depth_max=9041"
+        batch = test_client.get(f"/images/batch?{query}").content
+        response = test_client.get(f"/images/stream?{query}&format={stream_format}")
+        assert response.status_code == 200
+        if stream_format == "ndjson":
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert len(lines) == batch.count(b"Content-Type: image/png")
+            assert base64.b64decode(lines[0]["image"]) == test_client.get(lines[0]["url"]).content
+        else:
+            assert response.content == batch
+
+        response = test_client.get(f"/images/stream?{query}&limit=2&after_depth=9040.1")
+        assert [json.loads(line)["depth"] for line in response.text.splitlines()] == [9040.2, 9040.3]
+        assert test_client.get("/images/stream?depth_min=10000&depth_max=11000").status_code == 404
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_full_ingests_write_one_at_a_time(self, monkeypatch, streaming):
+        held = []
+        method = "process_images_streaming" if streaming else "process_images_batched"
+        monkeypatch.setattr(settings, "ingest_incremental", False)
+        monkeypatch.setattr(settings, "ingest_streaming", streaming)
+        monkeypatch.setattr(ingest_manager.image_processor, method,
+                            lambda *args, **kwargs: held.append(main.full_ingest_lock.locked()))
+        main.run_ingest(ingest_manager)
+        assert held == [True]
+        assert not main.full_ingest_lock.locked()
+
+    def test_profiling(self, test_client: TestClient, monkeypatch, tmp_path):
+        assert test_client.get("/admin/profile?seconds=0.01").status_code == 404
+        monkeypatch.setattr(settings, "profiling_enabled", True)
+        monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+
+        response = test_client.get("/admin/profile?seconds=0.05&format=top&include_idle=true")
+        assert response.status_code == 200
+        assert (tmp_path / response.headers["x-profile-file"].rsplit("/", 1)[-1]).exists()
+        response = test_client.get("/images/?depth_min=9040&depth_max=9041", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert response.headers["x-profile-file"].endswith(".collapsed")
+        assert "x-profile-file" not in test_client.get("/health").headers
+
+    def test_metrics(self, test_client: TestClient):
+        test_client.get("/images/?depth_min=9040&depth_max=9041")
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_request_duration_seconds_count{route="/images/"}' in response.text
+        assert 'stage_duration_seconds_count{stage="range_query"}' in response.text
+
+    def test_dataset_routes(self, test_client: TestClient):
+        query = "depth_min=9040&depth_max=9041"
+        response = test_client.get(f"/datasets/default/images/batch?{query}")
+        assert response.status_code == 200
+        assert response.content == test_client.get(f"/images/batch?{query}").content.replace(
+            b"Content-Location: /images/", b"Content-Location: /datasets/default/images/")
+        response = test_client.get(f"/datasets/default/images/stream?{query}&limit=1")
+        url = json.loads(response.text)["url"]
+        assert url.startswith("/datasets/default/images/")
+        assert test_client.get(url).status_code == 200
+        response = test_client.get(f"/images/stream?{query}&limit=1&dataset=default")
+        assert json.loads(response.text)["url"] == url
+        response = test_client.get(f"/datasets/unknown/images/batch?{query}")
+        assert response.status_code == 404
+        urls = [image["url"] for image in test_client.get(f"/datasets/default/images/?{query}").json()]
+        assert all(url.startswith("data/images/image_") for url in urls)
+
+    @pytest.mark.parametrize("query", ["width=0", "depth_step=0", "pooling=median"])
+    def test_invalid_resampling(self, test_client: TestClient, query):
+        response = test_client.get(
+            f"/images/composite.png?depth_min=9040&depth_max=9041&{query}")
+        assert response.status_code == 422
+
+    def test_async_routes_without_async_driver(self, test_client: TestClient, monkeypatch):
+        monkeypatch.setattr(main.db, "database_url", "postgresql://user@host/images")
+        response = test_client.get("/async/images/9040.1.png")
+        assert response.status_code == 501
+        assert "async driver" in response.json()["detail"]
+        assert test_client.get("/images/9040.1.png").status_code == 200
+
+    def test_invalid_colormap(self, test_client: TestClient):
+        response = test_client.get(
+            "/images/composite.png?depth_min=9040&depth_max=9041&colormap=rainbow")
+        assert response.status_code == 422
+
+    def test_cache_stats(self, test_client: TestClient):
+        test_client.get("/images/batch?depth_min=9040&depth_max=9041")
+        test_client.get("/images/batch?depth_min=9040&depth_max=9041")
+        response = test_client.get("/cache/stats")
+        assert response.status_code == 200
+        assert response.json()["enabled"] is True
+        assert response.json()["hits"] >= 1
+
+    def test_async_routes_match_sync_routes(self, test_client: TestClient):
+        query = "depth_min=9040&depth_max=9041"
+        sync_response = test_client.get(f"/images/batch?{query}")
+        async_response = test_client.get(f"/async/images/batch?{query}")
+        assert async_response.status_code == 200
+        assert async_response.content == sync_response.content
+
+        response = test_client.get("/async/images/9040.1.png")
+        assert response.status_code == 200
+        assert response.content == test_client.get("/images/9040.1.png").content
+
+        response = test_client.get("/async/images/10000.0.png")
+        assert response.status_code == 404
+
+
+class TestColdStart:
+
+    def test_import_skips_ingest_dependencies(self):
+        code = "import sys, main; print(','.join(sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        modules = set(output.stdout.strip().split(','))
+        assert 'pandas' not in modules
+        assert 'matplotlib' not in modules
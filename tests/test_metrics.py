@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from core.image_processor import ImageProcessor
+from core.metrics import STAGE_SECONDS, Metrics
+
+
+@pytest.fixture
+def registry():
+    return Metrics(namespace='test')
+
+
+class TestMetrics:
+
+    def test_render_histogram(self, registry):
+        registry.observe(STAGE_SECONDS, 0.002, stage='encode')
+        registry.observe(STAGE_SECONDS, 3.0, stage='encode')
+        output = registry.render()
+        assert '# TYPE test_stage_duration_seconds histogram' in output
+        assert 'test_stage_duration_seconds_bucket{stage="encode",le="0.001"} 0' in output
+        assert 'test_stage_duration_seconds_bucket{stage="encode",le="0.0025"} 1' in output
+        assert 'test_stage_duration_seconds_bucket{stage="encode",le="+Inf"} 2' in output
+        assert 'test_stage_duration_seconds_count{stage="encode"} 2' in output
+
+    def test_render_counters_and_gauges(self, registry):
+        registry.increment('http_requests_total', route='/images/', status='200')
+        registry.increment('http_requests_total', route='/images/', status='200')
+        output = registry.render({'ingest_rows_done': 5})
+        assert 'test_http_requests_total{route="/images/",status="200"} 2' in output
+        assert '# TYPE test_ingest_rows_done gauge\ntest_ingest_rows_done 5' in output
+
+    def test_timer_counts_items(self, registry):
+        with registry.timer('resize', 10):
+            pass
+        assert registry.stage_totals()['resize']['count'] == 1
+        assert 'test_stage_items_total{stage="resize"} 10' in registry.render()
+
+    def test_timed_iter(self, registry):
+        assert list(registry.timed_iter('read_csv', range(3))) == [0, 1, 2]
+        # One observation per item, plus the call that finds the iterator exhausted.
+        assert registry.stage_totals()['read_csv']['count'] == 4
+
+    def test_recording_defers_observations(self, registry):
+        with registry.recording() as observations:
+            with registry.timer('encode', 2):
+                pass
+        assert registry.stage_totals() == {}
+        registry.observe_stages(observations)
+        assert registry.stage_totals()['encode']['count'] == 1
+
+    def test_render_chunk_recorded_returns_stage_timings(self):
+        processor = ImageProcessor('unused.csv')
+        pixels = np.zeros((3, 4), dtype=np.uint8)
+        depths = np.array([1.0, 2.0, 3.0])
+        images, observations = processor.render_chunk_recorded(depths, pixels)
+        assert images == processor.render_chunk(depths, pixels)
+        assert [stage for stage, _, _ in observations] == ['resize', 'colormap', 'encode']
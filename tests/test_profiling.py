@@ -0,0 +1,63 @@
+import pstats
+import threading
+import time
+
+from core.image_processor import ImageProcessor
+from core.profiling import IngestProfile, SamplingProfiler
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestIngestProfile:
+
+    def test_writes_stats_and_report(self, session, csv_file, tmp_path):
+        with IngestProfile(str(tmp_path / 'profiles'), 'ingest-default') as profile:
+            ImageProcessor(str(csv_file)).process_images_batched(session)
+
+        stats = pstats.Stats(profile.stats_path)
+        assert any(name == 'process_images_batched' for _, _, name in stats.stats)
+        report = open(profile.report_path).read()
+        assert 'image_processor.py' in report
+        assert 'allocation sites' in report
+
+
+class TestSamplingProfiler:
+
+    def test_samples_busy_thread(self, tmp_path):
+        stop = threading.Event()
+        thread = threading.Thread(target=busy_loop, args=(stop,))
+        thread.start()
+        try:
+            with SamplingProfiler(interval=0.001) as profiler:
+                time.sleep(0.2)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert profiler.samples > 0
+        lines = profiler.collapsed().splitlines()
+        assert any('busy_loop (test_profiling.py' in line for line in lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        assert int(count) > 0 and ';' in stack
+        assert 'busy_loop' in profiler.top()
+        path = profiler.dump(str(tmp_path), 'request-/images/')
+        assert open(path).read() == profiler.collapsed()
+
+    def test_skips_idle_threads(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            profiler = SamplingProfiler(thread_ids=[thread.ident])
+            time.sleep(0.05)
+            profiler.sample()
+            assert profiler.collapsed() == ''
+            profiler.include_idle = True
+            profiler.sample()
+            assert 'wait (threading.py' in profiler.collapsed()
+        finally:
+            stop.set()
+            thread.join()
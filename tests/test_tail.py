@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from core.events import FrameEvent, FrameEvents
+from core.image_processor import ImageProcessor
+from core.ingest import IngestManager
+from core.responses import format_frame_event
+from core.tail import TailIngest
+from models import Image as ImageModel
+
+DEPTHS = [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def append(csv_file, text):
+    with open(csv_file, 'a') as f:
+        f.write(text)
+
+
+def saved_depths(session):
+    return [depth for depth, in session.query(ImageModel.depth).order_by(ImageModel.depth)]
+
+
+class TestTailIngest:
+
+    def test_poll_ingests_only_appended_lines(self, session, csv_file):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        assert manager.offset == csv_file.stat().st_size
+        tail = TailIngest(manager)
+        assert tail.poll(session) == 0
+
+        append(csv_file, "6.0,60,110\n7.0,,120\n")
+        assert tail.poll(session) == 2
+        assert saved_depths(session) == DEPTHS + [6.0, 7.0]
+        assert tail.poll(session) == 0
+
+    def test_partial_line_waits_for_newline(self, session, csv_file):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        tail = TailIngest(manager, batch_rows=1)
+
+        append(csv_file, "6.0,60,110\n7.0,7")
+        assert tail.poll(session) == 1
+        assert saved_depths(session)[-1] == 6.0
+        append(csv_file, "0,120\n")
+        assert tail.poll(session) == 1
+        assert saved_depths(session)[-1] == 7.0
+
+    def test_ingest_leaves_partial_last_line(self, session, csv_file):
+        append(csv_file, "10")
+        complete_size = csv_file.stat().st_size - 2
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        assert saved_depths(session) == DEPTHS
+        assert manager.offset == complete_size
+        manager.run(session)
+        assert manager.offset == complete_size
+
+        append(csv_file, "1.5,40,90\n")
+        assert TailIngest(manager).poll(session) == 1
+        assert saved_depths(session) == DEPTHS + [101.5]
+        manager.run(session)
+        assert saved_depths(session) == DEPTHS + [101.5]
+
+    def test_unparseable_values_do_not_stop_the_tail(self, session, csv_file):
+        manager = IngestManager(ImageProcessor(str(csv_file)), chunk_size=2)
+        manager.run(session)
+        tail = TailIngest(manager, batch_rows=1)
+
+        append(csv_file, "6.0,x,110\n7.0,70,120\n8.0,\"80\n9.0,,130\n")
+        assert tail.poll(session) == 3
+        assert tail.offset == csv_file.stat().st_size
+        assert saved_depths(session) == DEPTHS + [6.0, 7.0, 9.0]
+        source_pixels = session.query(ImageModel.source_pixels).filter(ImageModel.depth == 6.0).scalar()
+        assert source_pixels == bytes([0, 110])
+        append(csv_file, "10.0,100,140\n")
+        assert tail.poll(session) == 1
+
+    @pytest.mark.parametrize('method', ['process_images_batched', 'process_images_streaming'])
+    def test_continues_after_full_ingest(self, session, csv_file, method):
+        append(csv_file, "6.0,6")
+        manager = IngestManager(ImageProcessor(str(csv_file)))
+        manager.offset = getattr(manager.image_processor, method)(session, 2)
+        assert manager.offset == csv_file.stat().st_size - len("6.0,6")
+        assert saved_depths(session) == DEPTHS
+
+        tail = TailIngest(manager)
+        append(csv_file, "0,110\n7.0,70,120\n")
+        assert tail.poll(session) == 2
+        assert saved_depths(session) == DEPTHS + [6.0, 7.0]
+        source_pixels = session.query(ImageModel.source_pixels).filter(ImageModel.depth == 6.0).scalar()
+        assert source_pixels == bytes([60, 110])
+
+    def test_starts_at_last_line_without_incremental_ingest(self, session, csv_file):
+        manager = IngestManager(ImageProcessor(str(csv_file)))
+        tail = TailIngest(manager)
+        assert tail.poll(session) == 0
+        append(csv_file, "6.0,60,110\n")
+        assert tail.poll(session) == 1
+        assert saved_depths(session) == [6.0]
+
+    def test_appended_rows_are_published(self, session, csv_file):
+        events = FrameEvents()
+        manager = IngestManager(ImageProcessor(str(csv_file), events=events), chunk_size=2)
+        manager.run(session)
+        tail = TailIngest(manager)
+
+        async def receive():
+            queue = events.subscribe()
+            append(csv_file, "6.0,60,110\n")
+            await asyncio.get_running_loop().run_in_executor(None, tail.poll, session)
+            return await asyncio.wait_for(queue.get(), 5)
+
+        event = asyncio.run(receive())
+        assert event.depths == [6.0]
+        assert event.images[0].startswith(b'\x89PNG')
+
+
+class TestFrameEvents:
+
+    def test_publish_from_another_thread(self):
+        events = FrameEvents()
+
+        async def receive():
+            queue = events.subscribe()
+            thread = threading.Thread(target=events.publish, args=(FrameEvent('default', [1.0], [b'png']),))
+            thread.start()
+            thread.join()
+            event = await asyncio.wait_for(queue.get(), 5)
+            events.unsubscribe(queue)
+            return event
+
+        assert asyncio.run(receive()).depths == [1.0]
+        assert events.subscribers == 0
+
+    def test_slow_subscriber_drops_oldest(self):
+        events = FrameEvents(max_queued=2)
+
+        async def receive():
+            queue = events.subscribe()
+            for depth in (1.0, 2.0, 3.0):
+                events.publish(FrameEvent('default', [depth], [b'png']))
+            await asyncio.sleep(0)
+            return [queue.get_nowait().depths[0] for _ in range(queue.qsize())]
+
+        assert asyncio.run(receive()) == [2.0, 3.0]
+        assert events.dropped == 1
+
+    def test_format_frame_event(self):
+        message = format_frame_event(FrameEvent('default', [1.0, 2.0], [b'png', b'png']), include_images=True)
+        lines = message.split('\n')
+        assert lines[:2] == ['id: 2.0', 'event: images']
+        data = json.loads(lines[2][len('data: '):])
+        assert data['depth_min'] == 1.0 and data['depth_max'] == 2.0
+        assert data['images'] == ['cG5n', 'cG5n']
+        assert message.endswith('\n\n')